@@ -0,0 +1,203 @@
+import argparse
+import io
+import json
+import random
+import re
+import time
+import zipfile
+from pathlib import Path
+from xml.etree import ElementTree as ET
+
+from docx_engine import BODY_PART_RE, read_docx
+from docx_fill import PLACEHOLDER_RE, DocxFillPlan, placeholder_key, plan_part
+
+
+# Documents per second for docx_fill against a per-document tree fill, on a
+# tokenized copy of an IEHP template.
+#
+# The IEHP templates have no {{PLACEHOLDER}} tokens yet. So the bench inserts
+# one after each mapped label it finds (generate_iehp_mapping.py's keys), and
+# splits every token over two or three runs with a proofing mark between
+# them, the way Word saves edited text. Most of those w:t elements have no
+# xml:space="preserve", and the run holding the closing "}}" often goes on with
+# " (see chart)" or similar. The tree fill is the naive approach: parse each
+# body part with ElementTree, join each paragraph's w:t texts, replace,
+# serialize, and recompress every zip member. Both outputs must show the
+# expected text for every part (read with docx_engine), with no tokens left.
+# Spacing is checked exactly: no fill may add a w:t whose text starts or ends
+# with whitespace but lacks xml:space="preserve", since Word drops that
+# whitespace.
+
+
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+TEMPLATE_PATH = Path("docs/fill_docs/Updated FBA - IEHP.docx")
+MAPPING_PATH = Path("docs/fill_docs/iehp_fba_template_field_map.json")
+SAMPLE_VALUES = ["Jordan", "O'Neil & Sons <LLC>", "2026-05-13", "(909) 555-0101", "Line one\nLine two", "Reviewed\twith caregiver"]
+TRAILING_WORDS = [" (see chart)", " per caregiver", ""]
+XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+_TEXT_RE = re.compile(r"<w:t( [^>]*)?>([^<]*)</w:t>")
+# (part XML, {key: value}, filled part XML) for plan_part on its own
+PART_CASES = [
+    (
+        '<w:p><w:r><w:t>{{CLIENT_</w:t></w:r><w:r><w:t>NAME}} is 5</w:t></w:r></w:p>',
+        {"CLIENT_NAME": "John"},
+        '<w:p><w:r><w:t xml:space="preserve">John</w:t></w:r><w:r><w:t xml:space="preserve"> is 5</w:t></w:r></w:p>',
+    ),
+    (
+        '<w:p><w:r><w:t xml:space="preserve">A {{B</w:t></w:r><w:r><w:t>}}</w:t></w:r><w:r><w:t>{{C}} end</w:t></w:r></w:p>',
+        {"B": "X", "C": "Y"},
+        '<w:p><w:r><w:t xml:space="preserve">A X</w:t></w:r><w:r><w:t xml:space="preserve"></w:t></w:r>'
+        '<w:r><w:t xml:space="preserve">Y end</w:t></w:r></w:p>',
+    ),
+]
+
+
+def split_token(rng: random.Random, token: str) -> str:
+    cuts = sorted(rng.sample(range(1, len(token)), rng.choice((1, 2))))
+    pieces = [token[start:end] for start, end in zip([0, *cuts], [*cuts, len(token)])]
+    pieces[-1] += rng.choice(TRAILING_WORDS)
+    runs = []
+    for piece in pieces:
+        # as Word writes it: preserve only when the w:t's own text needs it
+        tag = '<w:t xml:space="preserve">' if piece != piece.strip() else "<w:t>"
+        runs.append(f"<w:r><w:rPr><w:b/></w:rPr>{tag}{piece}</w:t></w:r>")
+    return '<w:proofErr w:type="spellStart"/>'.join(runs)
+
+
+def tokenize_template(template: bytes, labels: dict[str, str], seed: int) -> tuple[bytes, int]:
+    """The template with a split {{KEY}} run after the first w:t holding each label."""
+    rng = random.Random(seed)
+    placed = 0
+    out = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(template)) as zin, zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zout:
+        for info in zin.infolist():
+            data = zin.read(info)
+            if BODY_PART_RE.match(info.filename):
+                xml = data.decode("utf-8")
+                for label, key in labels.items():
+                    match = re.search(r"<w:t(?: [^>]*)?>[^<]*" + re.escape(label) + r"[^<]*</w:t></w:r>", xml)
+                    if match is None:
+                        continue
+                    xml = xml[: match.end()] + split_token(rng, f"{{{{{key}}}}}") + xml[match.end() :]
+                    placed += 1
+                data = xml.encode("utf-8")
+            zout.writestr(info, data)
+    return out.getvalue(), placed
+
+
+def tree_fill(template: bytes, values: dict[str, str]) -> bytes:
+    def replace(match: re.Match[str]) -> str:
+        return values.get(placeholder_key(match.group()), match.group())
+
+    out = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(template)) as zin, zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zout:
+        for info in zin.infolist():
+            data = zin.read(info)
+            if BODY_PART_RE.match(info.filename):
+                root = ET.fromstring(data)
+                for paragraph in root.iter(f"{W_NS}p"):
+                    texts = list(paragraph.iter(f"{W_NS}t"))
+                    joined = "".join(node.text or "" for node in texts)
+                    if "{{" in joined:
+                        texts[0].text = PLACEHOLDER_RE.sub(replace, joined)
+                        texts[0].set(XML_SPACE, "preserve")
+                        for node in texts[1:]:
+                            node.text = ""
+                data = ET.tostring(root, encoding="UTF-8", xml_declaration=True)
+            zout.writestr(info, data)
+    return out.getvalue()
+
+
+def expected_texts(template: bytes, values: dict[str, str], breaks: bool = True) -> dict[str, str]:
+    """With ``breaks``, newlines and tabs are w:br / w:tab, which are not w:t text, so they drop out."""
+
+    def replace(match: re.Match[str]) -> str:
+        value = values[placeholder_key(match.group())]
+        return value.replace("\n", "").replace("\t", "") if breaks else value
+
+    document = read_docx(Path("template.docx"), BODY_PART_RE.match, data=template)
+    return {part.name: PLACEHOLDER_RE.sub(replace, part.text) for part in document.parts}
+
+
+def unpreserved_spaces(data: bytes) -> dict[str, int]:
+    """Per body part, the w:t elements whose text starts or ends with whitespace but is not preserved."""
+    counts: dict[str, int] = {}
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        for name in zf.namelist():
+            if BODY_PART_RE.match(name):
+                xml = zf.read(name).decode("utf-8")
+                counts[name] = sum(
+                    1
+                    for match in _TEXT_RE.finditer(xml)
+                    if match.group(2) != match.group(2).strip() and 'xml:space="preserve"' not in (match.group(1) or "")
+                )
+    return counts
+
+
+def check(label: str, data: bytes, expected: dict[str, str], template_spaces: dict[str, int]) -> None:
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        bad = zf.testzip()
+        if bad is not None:
+            raise SystemExit(f"{label}: bad CRC in {bad}")
+    document = read_docx(Path(f"{label}.docx"), BODY_PART_RE.match, data=data)
+    for part in document.parts:
+        if part.text != expected[part.name]:
+            raise SystemExit(f"{label}: {part.name} text differs from the expected fill")
+        if "{{" in part.text:
+            raise SystemExit(f"{label}: {part.name} still has tokens")
+    for name, count in unpreserved_spaces(data).items():
+        if count > template_spaces.get(name, 0):
+            raise SystemExit(f"{label}: {name} has {count - template_spaces.get(name, 0)} new w:t with unpreserved edge whitespace")
+
+
+def check_parts() -> None:
+    for xml, values, expected in PART_CASES:
+        part = plan_part("word/document.xml", xml.encode("utf-8"))
+        filled = part.fill({key: value.encode("utf-8") for key, value in values.items()}).decode("utf-8")
+        if filled != expected:
+            raise SystemExit(f"plan_part: {xml}\n  gave     {filled}\n  expected {expected}")
+
+
+def rate(fn, members: list[dict[str, str]]) -> float:
+    started = time.perf_counter()
+    for values in members:
+        fn(values)
+    return len(members) / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark plan-based DOCX filling against a per-document tree fill.")
+    parser.add_argument("--template", type=Path, default=TEMPLATE_PATH)
+    parser.add_argument("--mapping", type=Path, default=MAPPING_PATH)
+    parser.add_argument("--members", type=int, default=100)
+    parser.add_argument("--tree-members", type=int, default=10, help="members for the tree-fill row")
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    labels = {item["label"]: item["placeholder_key"] for item in json.loads(args.mapping.read_text(encoding="utf-8"))["FBA"]["labels"]}
+    template, placed = tokenize_template(args.template.read_bytes(), labels, args.seed)
+
+    started = time.perf_counter()
+    plan = DocxFillPlan.analyze(template)
+    analyze_seconds = time.perf_counter() - started
+    rng = random.Random(args.seed)
+    members = [{key: f"{rng.choice(SAMPLE_VALUES)} #{index}" for key in plan.keys} for index in range(args.members)]
+
+    check_parts()
+    spaces = unpreserved_spaces(template)
+    check("plan", plan.fill(members[0]).data, expected_texts(template, members[0]), spaces)
+    # the tree fill leaves newlines and tabs in the w:t text
+    check("tree", tree_fill(template, members[0]), expected_texts(template, members[0], breaks=False), spaces)
+    print(f"{args.template.name}: {placed} split tokens, {len(plan.keys)} keys; plan and tree fills give the expected text")
+
+    tree_rate = rate(lambda values: tree_fill(template, values), members[: args.tree_members])
+    plan_rate = rate(plan.fill, members)
+    fast_rate = rate(lambda values: plan.fill(values, 1), members)
+    print(f"{'analyze (once)':<26}{analyze_seconds * 1000:>10.1f}ms")
+    print(f"{'tree fill per document':<26}{tree_rate:>10.1f} docs/s  {1000 / tree_rate:>7.1f}ms/doc")
+    print(f"{'plan fill':<26}{plan_rate:>10.1f} docs/s  {1000 / plan_rate:>7.1f}ms/doc  ({plan_rate / tree_rate:.1f}x)")
+    print(f"{'plan fill, deflate -1':<26}{fast_rate:>10.1f} docs/s  {1000 / fast_rate:>7.1f}ms/doc  ({fast_rate / tree_rate:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import argparse
+import io
+import random
+import time
+from pathlib import Path
+
+from pdf_overlay import FONT, OverlayBox, PdfTemplate, RenderResult, load_render_map
+from render_fba_pdfs import RENDER_MAP_PATH, TEMPLATE_PATH
+from text_layout import font_metrics
+
+
+# Documents per second for the render-map PDF renderer on seeded synthetic
+# members. Four rows:
+# - "reparse per member": parse the template for every document, the way a
+#   one-shot fill does
+# - "shared template": parse once and render every member from it
+# - "+ continuation": the shared-template row, carrying overflow onto
+#   continuation pages instead of clipping it
+# - "+ write": the shared-template row plus writing each PDF to disk
+# A sample of the outputs is then re-read with pypdf in strict mode. The check
+# requires the same page count as the template and each member's name in the
+# text of page 1.
+
+
+WORDS = (
+    "client engaged in elopement during transitions and responded to visual schedules with prompting "
+    "caregiver reports tantrums at bedtime; replacement behavior taught through functional communication "
+    "training across home and community settings with data collected by the behavior technician"
+).split()
+DATES = ["01/15/2026", "05/13/2026", "11/02/2025"]
+AVERAGE_WORD_UNITS = sum(map(font_metrics(FONT).measure, WORDS)) / len(WORDS)
+PHONES = ["(714) 555-0134", "(951) 706-0028", "(562) 555-0199"]
+
+
+def synthetic_value(rng: random.Random, box: OverlayBox, member: int) -> str:
+    kind = box.placeholder_key
+    if kind.endswith("_MEMBER_NAME"):
+        return f"Member{member:04d} Example"
+    if "DATE" in kind or "DOB" in kind:
+        return rng.choice(DATES)
+    if "PHONE" in kind:
+        return rng.choice(PHONES)
+    if box.max_lines == 1:
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))).title()
+    # multi-line boxes: up to 1.5x what fits, so about a third of them overflow
+    max_units = box.max_width * box.text_layout.units_per_point
+    fits = box.max_lines * max_units / (AVERAGE_WORD_UNITS + font_metrics(FONT).space)
+    words = rng.randint(1, max(1, int(fits * 1.5)))
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def synthetic_members(boxes: list[OverlayBox], count: int, seed: int) -> list[dict[str, object]]:
+    rng = random.Random(seed)
+    return [{box.placeholder_key: synthetic_value(rng, box, member) for box in boxes} for member in range(count)]
+
+
+def check_outputs(outputs: list[tuple[dict[str, object], bytes]], boxes: list[OverlayBox], pages: int) -> None:
+    from pypdf import PdfReader
+
+    name_key = next(box.placeholder_key for box in boxes if box.placeholder_key.endswith("_MEMBER_NAME"))
+    for values, data in outputs:
+        reader = PdfReader(io.BytesIO(data), strict=True)
+        if len(reader.pages) != pages:
+            raise SystemExit(f"{values[name_key]}: {len(reader.pages)} pages, expected {pages}")
+        if str(values[name_key]) not in reader.pages[0].extract_text():
+            raise SystemExit(f"{values[name_key]}: name not found on page 1")
+    print(f"checked {len(outputs)} outputs with pypdf (strict): {pages} pages, member name on page 1")
+
+
+def check_continued(results: list[RenderResult], pages: int) -> None:
+    from pypdf import PdfReader
+
+    for result in results:
+        reader = PdfReader(io.BytesIO(result.data), strict=True)
+        starts = [warning["continuation_page"] for warning in result.layout_warnings]
+        if starts and not pages < max(starts) <= len(reader.pages):
+            raise SystemExit(f"continuation pages {starts} outside {pages + 1}-{len(reader.pages)}")
+    extra = [len(PdfReader(io.BytesIO(result.data)).pages) - pages for result in results]
+    print(f"checked {len(results)} continued outputs: {min(extra)}-{max(extra)} continuation pages each")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark render-map PDF filling in documents per second.")
+    parser.add_argument("--template", type=Path, default=TEMPLATE_PATH)
+    parser.add_argument("--render-map", type=Path, default=RENDER_MAP_PATH)
+    parser.add_argument("--members", type=int, default=300)
+    parser.add_argument("--reparse-members", type=int, default=30, help="members for the reparse-per-member row")
+    parser.add_argument("--check", type=int, default=10, help="outputs to re-read with pypdf")
+    parser.add_argument("--out-dir", type=Path, default=Path("tmp/fba_pdfs_bench"))
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    boxes = load_render_map(args.render_map)
+    members = synthetic_members(boxes, args.members, args.seed)
+    template_bytes = args.template.read_bytes()
+
+    started = time.perf_counter()
+    for values in members[: args.reparse_members]:
+        PdfTemplate(template_bytes).render(boxes, values)
+    reparse_rate = min(args.reparse_members, len(members)) / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    template = PdfTemplate(template_bytes)
+    setup_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    results = [template.render(boxes, values) for values in members]
+    shared_rate = len(members) / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    continued = [template.render(boxes, values, continuation=True) for values in members]
+    continuation_rate = len(members) / (time.perf_counter() - started)
+
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    for index, values in enumerate(members):
+        (args.out_dir / f"member_{index:04d}.pdf").write_bytes(template.render(boxes, values).data)
+    write_rate = len(members) / (time.perf_counter() - started)
+
+    warnings = sum(len(result.layout_warnings) for result in results)
+    added_kb = sum(len(result.data) - len(template.data) for result in results) / len(results) / 1024
+    print(f"{len(boxes)} boxes, {len(template.pages)} pages, {len(template.fields)} form fields; template parsed in {setup_seconds * 1000:.1f}ms")
+    print(f"{len(members)} members, {warnings} overflow warnings, {added_kb:.1f} KB appended per document")
+    print(f"{'reparse per member':<22}{reparse_rate:>10.1f} docs/s")
+    print(f"{'shared template':<22}{shared_rate:>10.1f} docs/s  ({shared_rate / reparse_rate:.1f}x)")
+    print(f"{'+ continuation':<22}{continuation_rate:>10.1f} docs/s")
+    print(f"{'+ write':<22}{write_rate:>10.1f} docs/s")
+    check_outputs(list(zip(members, (result.data for result in results)))[: args.check], boxes, len(template.pages))
+    check_continued(continued[: args.check], len(template.pages))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import argparse
+import random
+import re
+import time
+from pathlib import Path
+
+from pdf_overlay import FONT, load_render_map
+from render_fba_pdfs import RENDER_MAP_PATH
+from text_layout import TextLayout, font_metrics, text_layout
+
+
+# Time TextLayout.break_lines against a direct port of wrapOverlayText, which
+# measures every candidate line from scratch. Inputs are seeded clinical
+# narratives of several thousand words. They include paragraph breaks and
+# tokens too wide for a box (URLs, run-together IDs). Both run at every
+# multi-line box width in the render map, and must return the same lines.
+# The check also covers the spans: each span's text is its line, and
+# re-breaking the overflow text reproduces the lines cut from the box.
+
+
+VOCABULARY = (
+    "client demonstrated elopement during transitions between preferred and non-preferred activities; "
+    "caregiver reported tantrums at bedtime lasting 10-15 minutes. Functional communication training "
+    "was introduced across home, school and community settings, with data collected by the behavior "
+    "technician under BCBA supervision. Antecedent strategies included visual schedules, first/then "
+    "boards, priming and choice-making. Replacement behaviors: requesting a break (\"break please\"), "
+    "manding for attention, tolerating \"no\" and waiting 30 seconds. Goals target self-care (ADL), "
+    "social skills, safety awareness and parent training fidelity ≥ 80% across 3 consecutive sessions."
+).split()
+LONG_TOKENS = [
+    "https://www.caloptima.org/en/ForProviders/ResourcesForProviders/BehavioralHealth/ABAServices",
+    "CIN#000123456789-AUTH#2026051300017-REF#BHT-0042-0043-0044",
+]
+
+
+def narrative(rng: random.Random, words: int) -> str:
+    out: list[str] = []
+    for index in range(words):
+        if index and rng.random() < 0.012:
+            out.append("\n")
+        out.append(rng.choice(LONG_TOKENS) if rng.random() < 0.002 else rng.choice(VOCABULARY))
+    return " ".join(out).replace(" \n ", "\n")
+
+
+def reference_wrap(text: str, max_width: float, layout: TextLayout) -> list[str]:
+    """wrapOverlayText, measuring each candidate string like widthOfTextAtSize."""
+    width = layout.width
+
+    def split_long_word(word: str) -> list[tuple[str, bool]]:
+        if width(word) <= max_width:
+            return [(word, False)]
+        chunks: list[tuple[str, bool]] = []
+        current = ""
+        for character in word:
+            candidate = current + character
+            if current and width(candidate) > max_width:
+                chunks.append((current, bool(chunks)))
+                current = character
+            else:
+                current = candidate
+        if current:
+            chunks.append((current, bool(chunks)))
+        return chunks
+
+    lines: list[str] = []
+    for paragraph in re.split(r"\r?\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        words = [chunk for word in paragraph.split() for chunk in split_long_word(word)]
+        line = words[0][0]
+        for word, continues in words[1:]:
+            candidate = f"{line}{'' if continues else ' '}{word}"
+            if width(candidate) <= max_width:
+                line = candidate
+            else:
+                lines.append(line)
+                line = word
+        lines.append(line)
+    return lines
+
+
+def check(texts: list[str], boxes: list[tuple[float, float, int]]) -> None:
+    for text in texts:
+        for size, max_width, max_lines in boxes:
+            layout = text_layout(FONT, size)
+            breaks = layout.break_lines(text, max_width)
+            if breaks.lines != reference_wrap(text, max_width, layout):
+                raise SystemExit(f"line mismatch at {size}pt / {max_width}pt")
+            for line, (start, end) in zip(breaks.lines, breaks.spans):
+                if " ".join(text[start:end].split()) != line:
+                    raise SystemExit(f"span {start}:{end} does not hold {line!r}")
+            rest = layout.break_lines(breaks.overflow_text(max_lines), max_width).lines
+            if rest != breaks.lines[max_lines:]:
+                raise SystemExit(f"overflow text does not re-wrap to the cut lines at {size}pt / {max_width}pt")
+    print(f"{len(texts)} narratives x {len(boxes)} box widths: same lines as wrapOverlayText, spans and overflow agree")
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark cached-width line breaking against per-candidate measuring.")
+    parser.add_argument("--render-map", type=Path, default=RENDER_MAP_PATH)
+    parser.add_argument("--narratives", type=int, default=8)
+    parser.add_argument("--words", type=int, default=3000, help="words per narrative")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    texts = [narrative(rng, args.words) for _ in range(args.narratives)]
+    boxes = sorted({(box.font_size, box.max_width, box.max_lines) for box in load_render_map(args.render_map) if box.max_lines > 1})
+    check(texts, boxes)
+
+    metrics = font_metrics(FONT)
+    total_words = sum(len(text.split()) for text in texts) * len(boxes)
+
+    def reference() -> None:
+        for text in texts:
+            for size, max_width, _ in boxes:
+                reference_wrap(text, max_width, text_layout(FONT, size))
+
+    def cached() -> None:
+        for text in texts:
+            for size, max_width, _ in boxes:
+                text_layout(FONT, size).break_lines(text, max_width)
+
+    def cold() -> None:
+        metrics.word_units.clear()
+        cached()
+
+    rows = [("per-candidate measure", reference), ("break_lines, cold memo", cold), ("break_lines, warm memo", cached)]
+    print(f"{len(texts)} narratives of {args.words:,} words at {len(boxes)} box widths ({total_words:,} words laid out per run)")
+    baseline = None
+    for label, fn in rows:
+        seconds = best_of(fn, args.repeat)
+        baseline = baseline or seconds
+        print(f"{label:<24}{seconds * 1000:>10.1f}ms  {total_words / seconds / 1e6:>6.2f}M words/s  ({baseline / seconds:.1f}x)")
+    print(f"word memo: {len(metrics.word_units):,} distinct words")
+
+
+if __name__ == "__main__":
+    main()
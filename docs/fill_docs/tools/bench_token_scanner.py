@@ -0,0 +1,94 @@
+import argparse
+import random
+import re
+import time
+
+from docx_engine import BODY_PART_RE, DocxPart, expand_templates, read_docx
+from token_scanner import LABEL_RE, TEXT_KINDS, UNDERSCORE_RE, XML_KINDS, scan_text, scan_xml, values_by_kind
+
+
+# Time token_scanner against one findall per kind (the previous
+# extract_docx_fields / extract_docx_labels approach) on real templates, and
+# check that both find the same values in the same order. The "one regex" row
+# times only the trigger search of a single combined XML alternation. That is a
+# lower bound for an all-kinds-in-one-regex XML scan, and the reason
+# scan_xml keeps one literal-prefixed search per kind. A seeded random
+# check covers edge cases the templates may not contain: long label runs,
+# "{{{", tokens nested in tag values, and underscore runs next to colons.
+
+
+XML_ALTERNATION_RE = re.compile(r"\{\{|«|\[|<w:tag|<w:alias")
+TEXT_PATTERNS = {"label": LABEL_RE, "underscore": UNDERSCORE_RE}
+FRAGMENTS = [
+    "First Name", "IEHP Member ID#", ":", ": ", "::", "_____", "___", "________", " ", "(", ")", "/", "#", "-",
+    "{{", "}}", "{{{", "CLIENT_NAME", "«", "»", "[", "]", "[MM/DD/YYYY]", "[XX]", "a", "Z", "9", "é", "\n", "\t",
+    '<w:tag w:val="', '<w:alias w:val="', '"/>', "x" * 70,
+]
+
+
+def multi_pass(part: DocxPart) -> dict[str, list[str]]:
+    found = {kind: pattern.findall(part.xml) for kind, pattern in XML_KINDS.items()}
+    found.update({kind: pattern.findall(part.text) for kind, pattern in TEXT_PATTERNS.items()})
+    return found
+
+
+def single_pass(part: DocxPart) -> dict[str, list[str]]:
+    return values_by_kind(scan_xml(part.xml) + scan_text(part.text), (*XML_KINDS, *TEXT_KINDS))
+
+
+def random_check(cases: int, seed: int) -> None:
+    rng = random.Random(seed)
+    for _ in range(cases):
+        text = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 40)))
+        part = DocxPart("random", text, text, "")
+        expected, actual = multi_pass(part), single_pass(part)
+        if expected != actual:
+            raise SystemExit(f"mismatch on {text!r}:\n  findall {expected}\n  scanner {actual}")
+    print(f"random strings: {cases:,} agree")
+
+
+def best_of(fn, parts: list[DocxPart], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for part in parts:
+            fn(part)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the single-pass token scanner against per-kind findall passes.")
+    parser.add_argument("docx", nargs="*", default=["docs/fill_docs"], help="templates, directories or globs")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--cases", type=int, default=50_000, help="random strings for the equivalence check")
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    random_check(args.cases, args.seed)
+
+    parts = [part for path in expand_templates(args.docx) for part in read_docx(path, BODY_PART_RE.match).parts]
+    for part in parts:
+        if multi_pass(part) != single_pass(part):
+            raise SystemExit(f"mismatch in {part.name}")
+    xml_mb = sum(len(part.xml) for part in parts) / 1e6
+    text_mb = sum(len(part.text) for part in parts) / 1e6
+    print(f"{len(parts)} parts ({xml_mb:.2f} MB XML, {text_mb:.2f} MB text): scanner and findall agree")
+
+    xml_parts = [DocxPart(part.name, part.xml, "", "") for part in parts]
+    text_parts = [DocxPart(part.name, "", part.text, "") for part in parts]
+    rows = [
+        ("xml kinds", lambda p: [pattern.findall(p.xml) for pattern in XML_KINDS.values()], lambda p: scan_xml(p.xml), xml_parts),
+        ("text kinds", lambda p: [pattern.findall(p.text) for pattern in TEXT_PATTERNS.values()], lambda p: scan_text(p.text), text_parts),
+        ("all kinds", multi_pass, single_pass, parts),
+    ]
+    print(f"{'':<12}{'findall/kind':>14}{'scanner':>14}")
+    for label, multi, single, subset in rows:
+        multi_seconds, single_seconds = best_of(multi, subset, args.repeat), best_of(single, subset, args.repeat)
+        print(f"{label:<12}{multi_seconds * 1000:>12.1f}ms{single_seconds * 1000:>12.1f}ms  ({multi_seconds / single_seconds:.2f}x)")
+    alternation = best_of(lambda p: XML_ALTERNATION_RE.findall(p.xml), xml_parts, args.repeat)
+    print(f"{'one regex':<12}{'':>14}{alternation * 1000:>12.1f}ms  (XML trigger search alone)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+# Per-payer rule tables for generate_field_checklist.py. Every table is plain data;
+# the engine compiles it once per run (key -> section, key -> method, key -> rule
+# dicts and one regex per validation rule), so nothing here is scanned per row.
+#
+# A placeholder key must be placed in a section, either through ``section_keys``
+# or through the layout manifest. An unplaced key is an error. Nothing falls back
+# to a default section.
+
+
+@dataclass(frozen=True)
+class ChecklistRules:
+    name: str
+    title: str
+    mapping_path: Path
+    out_json_path: Path
+    # None when the Markdown checklist is maintained by hand
+    out_md_path: Path | None
+    section_order: list[str]
+    section_titles: dict[str, str]
+    # section -> placeholder keys; empty when the layout manifest supplies sections
+    section_keys: dict[str, set[str]] = field(default_factory=dict)
+    # the manifest's section_key, mode, required and source win over the mapping
+    layout_manifest_path: Path | None = None
+    # ordered (rule, regex); tested against "label placeholder_key" lowercased
+    validation_patterns: list[tuple[str, str]] = field(default_factory=list)
+    default_validation: str = "non_empty_text"
+    validation_keys: dict[str, set[str]] = field(default_factory=dict)
+    # applied when the patterns fall through to the default
+    validation_by_input_type: dict[str, str] = field(default_factory=dict)
+    # rule used instead when the row is not required
+    optional_validation: dict[str, str] = field(default_factory=dict)
+    method_by_mode: dict[str, str] = field(default_factory=dict)
+    method_keys: dict[str, set[str]] = field(default_factory=dict)
+    method_by_input_type: dict[str, str] = field(default_factory=dict)
+    owners_by_mode: dict[str, tuple[str, str]] = field(default_factory=dict)
+    # placeholder key -> row fields that no rule derives (curated wording)
+    row_overrides: dict[str, dict[str, object]] = field(default_factory=dict)
+    # checklist header fields that differ from the mapping file
+    header_overrides: dict[str, str] = field(default_factory=dict)
+    # mapping keys copied into each row after the core columns, in mapping order
+    copy_mapping_extras: bool = False
+    default_pdf_render: dict[str, object] | None = None
+    # extra bullets under "Checklist schema and workflow rules" in the Markdown
+    md_workflow_notes: list[str] = field(default_factory=list)
+
+
+VALIDATION_PATTERNS = [
+    ("date_mm_dd_yyyy_or_na", r"dob|date"),
+    ("phone_us_or_e164_or_na", r"phone|fax"),
+    ("non_empty_identifier", r"cin|member_id"),
+    ("checkbox_yes_no_or_na", r"consent|involvement|has_iep"),
+    ("structured_payload_required", r"table|rows|goals|blocks"),
+    ("signature_and_date_present", r"signature"),
+]
+
+METHOD_BY_MODE = {
+    "AUTO": "database_prefill",
+    "ASSISTED": "assisted_draft_plus_review",
+    "MANUAL": "clinician_manual_entry",
+}
+
+OWNERS_BY_MODE = {
+    "AUTO": ("IntakeCoordinator", "ClinicalReviewer"),
+    "ASSISTED": ("ClinicalAuthor", "BCBAReviewer"),
+    "MANUAL": ("ClinicalAuthor", "BCBAReviewer"),
+}
+
+
+CALOPTIMA_FBA = ChecklistRules(
+    name="caloptima_fba",
+    title="CalOptima FBA Field-Level Extraction Checklist",
+    mapping_path=Path("docs/fill_docs/caloptima_fba_template_field_map.json"),
+    out_json_path=Path("docs/fill_docs/caloptima_fba_field_extraction_checklist.json"),
+    out_md_path=Path("docs/fill_docs/CALOPTIMA_FBA_FIELD_EXTRACTION_CHECKLIST.md"),
+    section_order=[
+        "identification_admin",
+        "data_sources_interviews",
+        "background_school_history",
+        "coordination_adaptive_testing",
+        "diagnostic_behavior_analysis",
+        "goals_treatment_planning",
+        "summary_recommendations_signatures",
+    ],
+    section_titles={
+        "identification_admin": "Identification and Administrative Intake",
+        "data_sources_interviews": "Data Sources and Interviews",
+        "background_school_history": "Background, School, and Intervention History",
+        "coordination_adaptive_testing": "Coordination of Care and Adaptive Testing",
+        "diagnostic_behavior_analysis": "Diagnostic and Behavior Analysis",
+        "goals_treatment_planning": "Goals and Treatment Planning",
+        "summary_recommendations_signatures": "Summary, Recommendations, and Signatures",
+    },
+    section_keys={
+        "identification_admin": {
+            "CALOPTIMA_FBA_MEMBER_NAME",
+            "CALOPTIMA_FBA_MEMBER_DOB",
+            "CALOPTIMA_FBA_CIN",
+            "CALOPTIMA_FBA_DIAGNOSES_ICD",
+            "CALOPTIMA_FBA_GUARDIAN_NAME",
+            "CALOPTIMA_FBA_CONTACT_PHONE",
+            "CALOPTIMA_FBA_PCP",
+            "CALOPTIMA_FBA_KNOWN_ALLERGIES",
+            "CALOPTIMA_FBA_MEDICATIONS",
+            "CALOPTIMA_FBA_DIETARY_RESTRICTIONS",
+            "CALOPTIMA_FBA_SERVICE_INITIATION_DATE",
+            "CALOPTIMA_FBA_DATE_ABA_FIRST_BEGAN",
+            "CALOPTIMA_FBA_PRIOR_ABH_AGENCIES",
+            "CALOPTIMA_FBA_ADMIN_CONTACT_NAME_TITLE",
+            "CALOPTIMA_FBA_ADMIN_CONTACT_PHONE",
+            "CALOPTIMA_FBA_ADMIN_CONTACT_FAX",
+            "CALOPTIMA_FBA_CHIEF_COMPLAINT",
+        },
+        "data_sources_interviews": {
+            "CALOPTIMA_FBA_RECORDS_REVIEWED",
+            "CALOPTIMA_FBA_INITIAL_INTERVIEW_OBSERVATION",
+            "CALOPTIMA_FBA_SECOND_INTERVIEW_OBSERVATION",
+        },
+        "background_school_history": {
+            "CALOPTIMA_FBA_DAILY_ACTIVITY_SCHEDULE",
+            "CALOPTIMA_FBA_SCHOOL_SCHEDULE",
+            "CALOPTIMA_FBA_HAS_IEP",
+            "CALOPTIMA_FBA_IEP_DATE",
+            "CALOPTIMA_FBA_PREVIOUS_INTERVENTIONS",
+            "CALOPTIMA_FBA_LIVING_ARRANGEMENTS",
+            "CALOPTIMA_FBA_SIGNIFICANT_MEDICAL_HISTORY",
+            "CALOPTIMA_FBA_FUNCTIONAL_COMMUNICATION_SKILLS",
+            "CALOPTIMA_FBA_SELF_CARE_ADL_SKILLS",
+            "CALOPTIMA_FBA_SOCIAL_PLAY_SKILLS",
+            "CALOPTIMA_FBA_MOBILITY_FUNCTIONING_RESTRICTIONS",
+            "CALOPTIMA_FBA_IEP_SERVICES_TABLE",
+        },
+        "coordination_adaptive_testing": {
+            "CALOPTIMA_FBA_COORDINATION_OF_CARE",
+            "CALOPTIMA_FBA_VINELAND_DOMAIN_SCORES",
+            "CALOPTIMA_FBA_COGNITIVE_ASSESSMENT_SUMMARY",
+        },
+        "diagnostic_behavior_analysis": {
+            "CALOPTIMA_FBA_CURRENT_DIAGNOSIS_CODES",
+            "CALOPTIMA_FBA_TARGET_BEHAVIOR_BLOCKS",
+            "CALOPTIMA_FBA_BIP_BLOCKS",
+            "CALOPTIMA_FBA_CRISIS_PLAN",
+            "CALOPTIMA_FBA_MEDIATOR_ANALYSIS",
+            "CALOPTIMA_FBA_REINFORCER_ASSESSMENT",
+        },
+        "goals_treatment_planning": {
+            "CALOPTIMA_FBA_TARGET_REPLACEMENT_GOALS",
+            "CALOPTIMA_FBA_SKILL_ACQUISITION_GOALS",
+            "CALOPTIMA_FBA_PARENT_GOALS",
+            "CALOPTIMA_FBA_GENERALIZATION_MAINTENANCE_PLAN",
+            "CALOPTIMA_FBA_TRANSITION_PLAN",
+        },
+        "summary_recommendations_signatures": {
+            "CALOPTIMA_FBA_SUMMARY_RECOMMENDATIONS",
+            "CALOPTIMA_FBA_HCPCS_RECOMMENDATION_ROWS",
+            "CALOPTIMA_FBA_TELEHEALTH_CONSENT",
+            "CALOPTIMA_FBA_PARENT_INVOLVEMENT",
+            "CALOPTIMA_FBA_REPORT_WRITTEN_BY",
+            "CALOPTIMA_FBA_WRITER_CREDENTIALS",
+            "CALOPTIMA_FBA_REPORT_COMPLETED_DATE",
+            "CALOPTIMA_FBA_SIGNATURES",
+        },
+    },
+    validation_patterns=VALIDATION_PATTERNS,
+    validation_keys={
+        "non_empty_text": {
+            "CALOPTIMA_FBA_COORDINATION_OF_CARE",
+            "CALOPTIMA_FBA_PREVIOUS_INTERVENTIONS",
+        },
+    },
+    validation_by_input_type={"structured_section": "structured_payload_required"},
+    method_by_mode=METHOD_BY_MODE,
+    method_keys={
+        "clinician_manual_entry": {
+            "CALOPTIMA_FBA_RECORDS_REVIEWED",
+            "CALOPTIMA_FBA_PREVIOUS_INTERVENTIONS",
+        },
+    },
+    method_by_input_type={"structured_section": "deterministic_structured_extraction_plus_review"},
+    owners_by_mode=OWNERS_BY_MODE,
+    copy_mapping_extras=True,
+    default_pdf_render={"target": "caloptima_fba_pdf_render_map", "not_exported": False},
+    md_workflow_notes=[
+        "PDF uploads use Adobe PDF extraction when configured; DOCX uploads use local Word XML text decode.",
+        "Manual and assisted rows can receive deterministic extracted text or structured payloads, but they remain "
+        "clinician-review-required and must not be treated as confident AUTO values.",
+    ],
+)
+
+
+IEHP_FBA = ChecklistRules(
+    name="iehp_fba",
+    title="IEHP FBA Field-Level Extraction Checklist",
+    mapping_path=Path("docs/fill_docs/iehp_fba_template_field_map.json"),
+    out_json_path=Path("docs/fill_docs/iehp_fba_field_extraction_checklist.json"),
+    out_md_path=None,
+    section_order=[
+        "identification_admin",
+        "behavior_background_services",
+        "assessment_procedures_testing",
+        "treatment_coordination_recommendations",
+    ],
+    section_titles={
+        "identification_admin": "Identification and Administrative Intake",
+        "behavior_background_services": "Behavior, Background, and Services",
+        "assessment_procedures_testing": "Assessment Procedures and Testing",
+        "treatment_coordination_recommendations": "Treatment, Coordination, and Recommendations",
+    },
+    layout_manifest_path=Path("docs/fill_docs/iehp_fba_layout_manifest.json"),
+    validation_patterns=VALIDATION_PATTERNS,
+    validation_keys={
+        "structured_payload_required": {
+            "IEHP_FBA_HOUSEHOLD_MEMBERS",
+            "IEHP_FBA_SCHOOL_INFORMATION_BLOCK",
+            "IEHP_FBA_BHT_SCHOOL_HOURS_MATRIX",
+            "IEHP_FBA_CURRENT_SERVICES_ACTIVITIES",
+            "IEHP_FBA_INTERVENTION_HISTORY",
+            "IEHP_FBA_BHT_AVAILABILITY_GRID",
+            "IEHP_FBA_ENVIRONMENTAL_ANALYSIS",
+            "IEHP_FBA_ADAPTIVE_MEASURE_SUMMARIES",
+            "IEHP_FBA_BEHAVIOR_SKILL_TARGETS",
+        },
+        "non_empty_text": {
+            "IEHP_FBA_FAMILY_INVOLVEMENT",
+        },
+        "checkbox_yes_no_or_na": {
+            "IEHP_FBA_PCP_ASSISTANCE_REQUEST",
+        },
+    },
+    optional_validation={
+        "non_empty_text": "optional_text",
+        "checkbox_yes_no_or_na": "optional_yes_no",
+        "structured_payload_required": "optional_structured_payload",
+    },
+    method_by_mode=METHOD_BY_MODE,
+    method_keys={
+        "ai_structured_recommendation": {
+            "IEHP_FBA_BEHAVIOR_SKILL_TARGETS",
+            "IEHP_FBA_TARGET_BEHAVIOR_INTERVENTION_BLOCKS",
+            "IEHP_FBA_SKILL_AND_SCHOOL_GOAL_BLOCKS",
+        },
+        "deterministic_docx_or_pdf_structured_extract": {
+            "IEHP_FBA_ASSESSOR_CERTIFICATION",
+            "IEHP_FBA_BHT_SCHOOL_HOURS_MATRIX",
+            "IEHP_FBA_PCP_VISIT_SUMMARY",
+            "IEHP_FBA_PCP_ASSISTANCE_REQUEST",
+            "IEHP_FBA_HEALTH_MEDICAL_SUMMARY",
+            "IEHP_FBA_CURRENT_SERVICES_ACTIVITIES",
+            "IEHP_FBA_INTERVENTION_HISTORY",
+            "IEHP_FBA_ENVIRONMENTAL_ANALYSIS",
+            "IEHP_FBA_ASSESSMENT_PROCEDURES_TABLE",
+            "IEHP_FBA_CLINICAL_INTERVIEW_NARRATIVE",
+            "IEHP_FBA_FIRST_MEMBER_OBSERVATION",
+            "IEHP_FBA_SECOND_MEMBER_OBSERVATION",
+            "IEHP_FBA_RECORDS_REVIEWED_TABLE",
+            "IEHP_FBA_PREFERENCE_ASSESSMENT_SUMMARY",
+            "IEHP_FBA_PREFERENCE_REINFORCERS_TABLE",
+            "IEHP_FBA_ADAPTIVE_MEASURE_SUMMARIES",
+            "IEHP_FBA_SKILL_BASELINE_LOCATION_TABLE",
+            "IEHP_FBA_CRISIS_PLAN",
+            "IEHP_FBA_COORDINATION_OF_CARE",
+            "IEHP_FBA_DISCHARGE_TRANSITION_EXIT_PLAN",
+            "IEHP_FBA_TEACHING_INTERVENTION_STRATEGIES",
+            "IEHP_FBA_FAMILY_INVOLVEMENT",
+            "IEHP_FBA_SIGNATURE_BLOCK",
+        },
+        "manual_or_template_continuation": {
+            "IEHP_FBA_RECOMMENDATION_NOTES",
+            "IEHP_FBA_CAREGIVER_PARTICIPATION",
+            "IEHP_FBA_TREATMENT_PLAN_REVIEW",
+            "IEHP_FBA_ADDITIONAL_NOTES",
+            "IEHP_FBA_APPENDIX_SUPPORTING_INFORMATION",
+        },
+    },
+    owners_by_mode=OWNERS_BY_MODE,
+    row_overrides={
+        "IEHP_FBA_FIRST_NAME": {"review_notes": "Fallback split from full_name."},
+        "IEHP_FBA_LAST_NAME": {"review_notes": "Fallback split from full_name."},
+        "IEHP_FBA_MEMBER_ID": {"review_notes": "Prefer active member_id."},
+        "IEHP_FBA_PRESENT_ADDRESS": {"review_notes": "Concatenate components."},
+        "IEHP_FBA_PARENT_GUARDIAN": {"review_notes": "Include relationship if known."},
+        "IEHP_FBA_CONTACT_PHONE": {"review_notes": "Prefer guardian contact."},
+        "IEHP_FBA_LANGUAGE": {"review_notes": "Confirm preferred spoken language."},
+        "IEHP_FBA_ASSESSOR_CERTIFICATION": {
+            "review_notes": "Match payer credential format; do not auto-promote when provider credentials are unavailable."
+        },
+        "IEHP_FBA_ASSESSOR_PHONE": {
+            "review_notes": "Use snapshot therapist phone when present; otherwise accept only assessor-anchored document phone labels."
+        },
+        "IEHP_FBA_REFERRING_PROVIDER": {"source": "N/A", "review_notes": "Referral packet source."},
+        "IEHP_FBA_REASON_FOR_REFERRAL": {"source": "N/A", "review_notes": "Chief concern narrative."},
+        "IEHP_FBA_BEHAVIOR_SKILL_TARGETS": {
+            "review_notes": "AI-assisted extraction of behavior/skill targets and related data-point details."
+        },
+        "IEHP_FBA_SCHOOL_INFORMATION_BLOCK": {"review_notes": "School, district, placement, services, times."},
+        "IEHP_FBA_BHT_SCHOOL_HOURS_MATRIX": {
+            "review_notes": "Extract from BHT school-hours table when present; otherwise infer reviewable school hours from School Information narrative."
+        },
+        "IEHP_FBA_PCP_VISIT_SUMMARY": {
+            "review_notes": "Member's last PCP visit if the uploaded document includes the PCP table."
+        },
+        "IEHP_FBA_PCP_ASSISTANCE_REQUEST": {
+            "review_notes": "Yes/no request for IEHP assistance accessing PCP care when applicable."
+        },
+        "IEHP_FBA_HEALTH_MEDICAL_SUMMARY": {"review_notes": "Diagnosis and medical history narrative."},
+        "IEHP_FBA_CURRENT_SERVICES_ACTIVITIES": {"review_notes": "Service and extracurricular schedule."},
+        "IEHP_FBA_INTERVENTION_HISTORY": {"review_notes": "Prior therapies and duration."},
+        "IEHP_FBA_BHT_AVAILABILITY_GRID": {"review_notes": "Mon-Sun availability table."},
+        "IEHP_FBA_ENVIRONMENTAL_ANALYSIS": {"review_notes": "Yes/No checks and noise level."},
+        "IEHP_FBA_ASSESSMENT_PROCEDURES_TABLE": {"review_notes": "Procedure/date/location/person rows."},
+        "IEHP_FBA_CLINICAL_INTERVIEW_NARRATIVE": {
+            "review_notes": "Clinical interview narrative from the assessment procedures section."
+        },
+        "IEHP_FBA_FIRST_MEMBER_OBSERVATION": {"review_notes": "First member observation narrative."},
+        "IEHP_FBA_SECOND_MEMBER_OBSERVATION": {"review_notes": "Second member observation narrative."},
+        "IEHP_FBA_RECORDS_REVIEWED_TABLE": {"review_notes": "Report type/date/author."},
+        "IEHP_FBA_PREFERENCE_ASSESSMENT_SUMMARY": {"review_notes": "Preference areas and reinforcers."},
+        "IEHP_FBA_PREFERENCE_REINFORCERS_TABLE": {
+            "review_notes": "Structured preference area and potential reinforcer rows."
+        },
+        "IEHP_FBA_ADAPTIVE_MEASURE_SUMMARIES": {"review_notes": "VB-MAPP, Vineland, ABAS-3, AFLS."},
+        "IEHP_FBA_SKILL_BASELINE_LOCATION_TABLE": {
+            "review_notes": "Optional skill/data/baseline/location table when the source document includes it."
+        },
+        "IEHP_FBA_TARGET_BEHAVIOR_INTERVENTION_BLOCKS": {
+            "review_notes": "AI-assisted extraction of intervention blocks including baseline and measurement context."
+        },
+        "IEHP_FBA_SKILL_AND_SCHOOL_GOAL_BLOCKS": {
+            "review_notes": "AI-assisted extraction for school/skill goals with objective-level criteria and data settings."
+        },
+        "IEHP_FBA_CRISIS_PLAN": {"review_notes": "Preventative and response protocols."},
+        "IEHP_FBA_COORDINATION_OF_CARE": {"review_notes": "Guardian/school/program/provider coordination."},
+        "IEHP_FBA_DISCHARGE_TRANSITION_EXIT_PLAN": {"review_notes": "Exit criteria and transition actions."},
+        "IEHP_FBA_FAMILY_INVOLVEMENT": {
+            "review_notes": "Family involvement and caregiver participation narrative."
+        },
+        "IEHP_FBA_RECOMMENDATION_NOTES": {"review_notes": "Template page 24 continuation bucket."},
+        "IEHP_FBA_CAREGIVER_PARTICIPATION": {"review_notes": "Template page 25 continuation bucket."},
+        "IEHP_FBA_TREATMENT_PLAN_REVIEW": {"review_notes": "Template page 26 continuation bucket."},
+        "IEHP_FBA_ADDITIONAL_NOTES": {"review_notes": "Template page 27 continuation bucket."},
+        "IEHP_FBA_APPENDIX_SUPPORTING_INFORMATION": {"review_notes": "Template page 28 continuation bucket."},
+        "IEHP_FBA_SIGNATURE_BLOCK": {"review_notes": "Name/credentials/title/date/agency."},
+    },
+    header_overrides={"source_document": "Updated FBA -IEHP (2).docx"},
+)
+
+
+RULES: dict[str, ChecklistRules] = {rules.name: rules for rules in (CALOPTIMA_FBA, IEHP_FBA)}
@@ -0,0 +1,174 @@
+import glob
+import hashlib
+import io
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, TypeVar
+from xml.etree import ElementTree as ET
+
+from token_scanner import Token, scan_text, scan_xml
+
+
+# Read each DOCX once, and parse each XML part once with iterparse. One
+# traversal yields the plain text (w:t runs) and the structured text (tabs /
+# newlines around paragraphs, rows and cells). Fragments go into lists and are
+# joined at the end. Nothing is built up with +=.
+
+
+XML_PARTS = [
+    "word/document.xml",
+    "word/header1.xml",
+    "word/header2.xml",
+    "word/header3.xml",
+    "word/footer1.xml",
+    "word/footer2.xml",
+    "word/footer3.xml",
+]
+
+
+BODY_PART_RE = re.compile(r"^word/(document|header\d+|footer\d+)\.xml$")
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+_TRAILING_SPACE_RE = re.compile(r"[ \t]+\n")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+def strip_xml_text(text: str) -> str:
+    # Very lightweight XML entity decoding for common entities in WordprocessingML
+    return (
+        text.replace("&lt;", "<")
+        .replace("&gt;", ">")
+        .replace("&amp;", "&")
+        .replace("&quot;", '"')
+        .replace("&apos;", "'")
+    )
+
+
+@dataclass
+class DocxPart:
+    name: str
+    xml: str
+    text: str
+    structured: str
+    # from token_scanner: placeholders / tags / aliases in ``xml``, labels / blanks in ``text``
+    tokens: list[Token] = field(default_factory=list)
+
+
+@dataclass
+class DocxDocument:
+    path: Path
+    sha256: str
+    parts: list[DocxPart]
+
+    def part_names(self) -> list[str]:
+        return [part.name for part in self.parts]
+
+    def token_values(self, kinds: Iterable[str]) -> dict[str, list[str]]:
+        """Distinct values of each kind across all parts, sorted."""
+        merged: dict[str, set[str]] = {kind: set() for kind in kinds}
+        for part in self.parts:
+            for token in part.tokens:
+                if token.kind in merged:
+                    merged[token.kind].add(token.value)
+        return {kind: sorted(found) for kind, found in merged.items()}
+
+
+def extract_part(name: str, data: bytes, scan: bool = False) -> DocxPart:
+    text_parts: list[str] = []
+    structured_parts: list[str] = []
+
+    # "start" events give document order for the separators; a w:t has no
+    # children, so emitting its text on "end" keeps the same order.
+    for event, el in ET.iterparse(io.BytesIO(data), events=("start", "end")):
+        tag = el.tag.rsplit("}", 1)[-1]  # localname
+        if event == "end":
+            if tag == "t" and el.text is not None:
+                decoded = strip_xml_text(el.text)
+                text_parts.append(decoded)
+                if decoded:
+                    structured_parts.append(decoded)
+            elif tag == "p":
+                el.clear()
+        elif tag == "tab":
+            structured_parts.append("\t")
+        elif tag == "br":
+            structured_parts.append("\n")
+        elif tag in ("p", "tr"):
+            structured_parts.append("\n")
+        elif tag == "tc":
+            structured_parts.append("\t")
+
+    structured = "".join(structured_parts)
+    structured = _TRAILING_SPACE_RE.sub("\n", structured)
+    structured = _BLANK_LINES_RE.sub("\n\n", structured)
+
+    xml = data.decode("utf-8", errors="replace")
+    text = "".join(text_parts)
+    tokens = scan_xml(xml) + scan_text(text) if scan else []
+    return DocxPart(name, xml, text, structured.strip() + "\n", tokens)
+
+
+def file_sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def read_docx(
+    path: Path,
+    parts: Iterable[str] | Callable[[str], bool] = XML_PARTS,
+    scan: bool = False,
+    data: bytes | None = None,
+) -> DocxDocument:
+    """Extract the selected parts (a list of names, in that order, or a name predicate in archive order).
+
+    ``scan`` fills each part's tokens. Pass ``data`` when the file's bytes are already in hand (e.g. hashed for a cache lookup).
+    """
+    if data is None:
+        data = path.read_bytes()
+    with zipfile.ZipFile(io.BytesIO(data), "r") as zf:
+        names = zf.namelist()
+        if callable(parts):
+            selected = [name for name in names if parts(name)]
+        else:
+            present = set(names)
+            selected = [name for name in parts if name in present]
+        extracted = [extract_part(name, zf.read(name), scan) for name in selected]
+    return DocxDocument(path, file_sha256(data), extracted)
+
+
+def expand_templates(inputs: Iterable[str]) -> list[Path]:
+    """Template files, directories (every .docx inside) and glob patterns, in order, without repeats."""
+    paths: list[Path] = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            matches = sorted(path.glob("*.docx"))
+        elif path.exists():
+            matches = [path]
+        else:
+            matches = sorted(Path(match) for match in glob.glob(item, recursive=True))
+            if not matches:
+                raise FileNotFoundError(item)
+        # Word keeps "~$name.docx" lock files next to open documents
+        paths.extend(match for match in matches if not match.name.startswith("~$"))
+    return list(dict.fromkeys(paths))
+
+
+def default_workers() -> int:
+    return min(4, os.cpu_count() or 1)
+
+
+def map_templates(fn: Callable[[T], R], items: list[T], workers: int) -> Iterator[R]:
+    """``fn`` over ``items`` in input order; in a process pool when there is more than one of each."""
+    if workers > 1 and len(items) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(items))) as pool:
+            yield from pool.map(fn, items)
+    else:
+        yield from map(fn, items)
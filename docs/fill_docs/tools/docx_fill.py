@@ -0,0 +1,347 @@
+import io
+import json
+import re
+import struct
+import zipfile
+import zlib
+from bisect import bisect_right
+from dataclasses import dataclass
+from pathlib import Path
+
+from docx_engine import BODY_PART_RE, file_sha256
+from stage_cache import StageCache, stage_key, tool_version
+from token_scanner import TOKEN_PATTERNS
+
+
+# Fills {{PLACEHOLDER_KEY}} tokens in DOCX templates from a plan built once per
+# template.
+#
+# Word often splits a token over several runs ("{{CLIENT" in one w:t, "_NAME}}"
+# in the next, after a proofing mark or a formatting change), so a plain
+# replace on the XML misses it. analyze() joins the w:t texts of each paragraph
+# and finds the tokens in the joined text. Each token is then moved whole into
+# its first w:t, and the pieces in the following w:t elements are removed.
+# The first run's formatting wins, as it does when Word merges runs. That w:t
+# gets xml:space="preserve", and so does the last one, whose remaining text may
+# now start with a space. The normalized part is cut at every token into
+# literal byte segments. Filling a document is then a join of segments and
+# escaped values, with no XML parse.
+#
+# The output zip is written by hand. Every member without tokens is copied
+# through as its original local header and compressed bytes. Only the parts
+# that hold tokens are deflated again. The central directory is re-emitted
+# with the new offsets.
+#
+# save() writes the plan as the normalized part files plus plan.json, which
+# holds the byte offset of every token. build_plan() keeps plans in the
+# StageCache under the template's content hash.
+
+
+STAGE = "docx_fill_plan"
+PLAN_NAME = "plan.json"
+PLACEHOLDER_RE = TOKEN_PATTERNS["curly"]
+PRESERVE_TAG = '<w:t xml:space="preserve">'
+COMPRESS_LEVEL = 6
+
+# a paragraph boundary, or a w:t with its text in group 1
+_TEXT_NODE_RE = re.compile(r"<w:p[ >]|</w:p>|<w:t(?: [^>]*)?>([^<]*)</w:t>")
+_INVALID_XML_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_XML_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+_BREAK = "</w:t><w:br/>" + PRESERVE_TAG
+_TAB = "</w:t><w:tab/>" + PRESERVE_TAG
+
+_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+_CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+_END_RECORD = struct.Struct("<IHHHHIIH")
+_LOCAL_SIGNATURE = 0x04034B50
+_CENTRAL_SIGNATURE = 0x02014B50
+_END_SIGNATURE = 0x06054B50
+_UTF8_NAME_FLAG = 0x800
+
+
+def run_text(value: str) -> bytes:
+    """A value as w:t content; newlines and tabs become w:br / w:tab in the same run."""
+    text = _INVALID_XML_RE.sub("", value.translate(_XML_ESCAPES))
+    if "\n" in text or "\r" in text or "\t" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n").replace("\n", _BREAK).replace("\t", _TAB)
+    return text.encode("utf-8")
+
+
+def placeholder_key(token: str) -> str:
+    return token[2:-2].strip()
+
+
+@dataclass
+class PartPlan:
+    name: str
+    segments: list[bytes]  # len(keys) + 1 literal pieces around the tokens
+    keys: list[str]
+
+    def fill(self, values: dict[str, bytes]) -> bytes:
+        pieces = [self.segments[0]]
+        for key, segment in zip(self.keys, self.segments[1:]):
+            pieces.append(values[key])
+            pieces.append(segment)
+        return b"".join(pieces)
+
+    def normalized(self) -> tuple[bytes, list[tuple[int, int, str]]]:
+        """The part with "{{KEY}}" at every token, and each token's byte span."""
+        pieces = [self.segments[0]]
+        offset = len(self.segments[0])
+        spans: list[tuple[int, int, str]] = []
+        for key, segment in zip(self.keys, self.segments[1:]):
+            token = b"{{%s}}" % key.encode("utf-8")
+            spans.append((offset, offset + len(token), key))
+            pieces.extend((token, segment))
+            offset += len(token) + len(segment)
+        return b"".join(pieces), spans
+
+    @classmethod
+    def from_normalized(cls, name: str, data: bytes, spans: list[tuple[int, int, str]]) -> "PartPlan":
+        segments: list[bytes] = []
+        position = 0
+        for start, end, _ in spans:
+            segments.append(data[position:start])
+            position = end
+        segments.append(data[position:])
+        return cls(name, segments, [key for _, _, key in spans])
+
+
+def plan_part(name: str, data: bytes) -> PartPlan:
+    """Merge split tokens into their first w:t and cut the part at each."""
+    xml = data.decode("utf-8")
+    # (paragraph, tag start, text start, text end) per w:t, in document order
+    nodes: list[tuple[int, int, int, int]] = []
+    paragraph = 0
+    for match in _TEXT_NODE_RE.finditer(xml):
+        if match.group(1) is None:
+            paragraph += 1
+        elif match.end(1) > match.start(1):
+            nodes.append((paragraph, match.start(), match.start(1), match.end(1)))
+
+    # (start, end, replacement); a None replacement is a token slot with its key in keys
+    edits: list[tuple[int, int, str | None]] = []
+    keys: list[str] = []
+    preserved: set[int] = set()
+
+    def preserve(tag_start: int, text_start: int) -> None:
+        if tag_start not in preserved:
+            preserved.add(tag_start)
+            if 'xml:space="preserve"' not in xml[tag_start:text_start]:
+                edits.append((tag_start, text_start, PRESERVE_TAG))
+
+    index = 0
+    while index < len(nodes):
+        end_index = index
+        while end_index + 1 < len(nodes) and nodes[end_index + 1][0] == nodes[index][0]:
+            end_index += 1
+        group = nodes[index : end_index + 1]
+        index = end_index + 1
+        text = "".join(xml[start:end] for _, _, start, end in group)
+        if "{{" not in text:
+            continue
+        # text offset of each node's first character
+        starts: list[int] = []
+        length = 0
+        for _, _, start, end in group:
+            starts.append(length)
+            length += end - start
+        for token in PLACEHOLDER_RE.finditer(text):
+            first = bisect_right(starts, token.start()) - 1
+            last = bisect_right(starts, token.end() - 1) - 1
+            _, tag_start, text_start, text_end = group[first]
+            token_start = text_start + token.start() - starts[first]
+            if first == last:
+                edits.append((token_start, token_start + len(token.group()), None))
+            else:
+                edits.append((token_start, text_end, None))
+                for _, _, middle_start, middle_end in group[first + 1 : last]:
+                    edits.append((middle_start, middle_end, ""))
+                _, last_tag_start, last_start, _ = group[last]
+                edits.append((last_start, last_start + token.end() - starts[last], ""))
+                # what is left of the last w:t may now start with a space
+                preserve(last_tag_start, last_start)
+            keys.append(placeholder_key(token.group()))
+            preserve(tag_start, text_start)
+    if not keys:
+        return PartPlan(name, [data], [])
+
+    edits.sort(key=lambda edit: edit[0])
+    segments: list[bytes] = []
+    pieces: list[str] = []
+    position = 0
+    for start, end, replacement in edits:
+        pieces.append(xml[position:start])
+        if replacement is None:
+            segments.append("".join(pieces).encode("utf-8"))
+            pieces = []
+        else:
+            pieces.append(replacement)
+        position = end
+    pieces.append(xml[position:])
+    segments.append("".join(pieces).encode("utf-8"))
+    return PartPlan(name, segments, keys)
+
+
+@dataclass
+class ZipMember:
+    name: str
+    central: bytes  # central directory record; its local header offset is patched per document
+    local: bytes  # local header and data, copied through unless the part is replaced
+    time_date: tuple[int, int]
+    flags: int
+
+
+class ZipLayout:
+    """A template archive's members, ready to be re-emitted with some parts replaced."""
+
+    def __init__(self, data: bytes) -> None:
+        end = data.rfind(struct.pack("<I", _END_SIGNATURE), max(0, len(data) - 65_557))
+        if end < 0:
+            raise ValueError("not a zip archive (no end of central directory record)")
+        fields = _END_RECORD.unpack_from(data, end)
+        count, directory_size, directory_offset = fields[4], fields[5], fields[6]
+        if count == 0xFFFF or directory_offset == 0xFFFFFFFF:
+            raise ValueError("zip64 templates are not supported")
+        self.comment = data[end + _END_RECORD.size : end + _END_RECORD.size + fields[7]]
+
+        records: list[tuple[str, bytes, int, int, tuple[int, int]]] = []
+        position = directory_offset
+        for _ in range(count):
+            header = _CENTRAL_HEADER.unpack_from(data, position)
+            if header[0] != _CENTRAL_SIGNATURE:
+                raise ValueError(f"bad central directory record at {position}")
+            flags, name_length, extra_length, comment_length, local_offset = header[3], header[10], header[11], header[12], header[16]
+            size = _CENTRAL_HEADER.size + name_length + extra_length + comment_length
+            raw_name = data[position + _CENTRAL_HEADER.size : position + _CENTRAL_HEADER.size + name_length]
+            name = raw_name.decode("utf-8" if flags & _UTF8_NAME_FLAG else "cp437")
+            records.append((name, data[position : position + size], local_offset, flags, (header[5], header[6])))
+            position += size
+
+        # a member's local record runs to the next member (or the central directory)
+        boundaries = sorted({offset for _, _, offset, _, _ in records} | {directory_offset})
+        self.members: list[ZipMember] = []
+        for name, central, offset, flags, time_date in records:
+            following = boundaries[bisect_right(boundaries, offset)]
+            self.members.append(ZipMember(name, central, data[offset:following], time_date, flags))
+
+    def write(self, replaced: dict[str, bytes], compress_level: int = COMPRESS_LEVEL) -> bytes:
+        """The archive with ``replaced`` parts deflated anew and every other member copied as is."""
+        chunks: list[bytes] = []
+        directory: list[bytes] = []
+        offset = 0
+        for member in self.members:
+            content = replaced.get(member.name)
+            if content is None:
+                local = member.local
+                central = member.central[:42] + struct.pack("<I", offset) + member.central[46:]
+            else:
+                compressor = zlib.compressobj(compress_level, zlib.DEFLATED, -15)
+                compressed = compressor.compress(content) + compressor.flush()
+                crc = zlib.crc32(content)
+                name = member.name.encode("utf-8")
+                flags = member.flags & _UTF8_NAME_FLAG
+                time, date = member.time_date
+                local = _LOCAL_HEADER.pack(
+                    _LOCAL_SIGNATURE, 20, flags, zlib.DEFLATED, time, date, crc, len(compressed), len(content), len(name), 0
+                ) + name + compressed
+                # version made by, extra / comment lengths and attributes stay as they were
+                central = (
+                    member.central[:6]
+                    + struct.pack("<HHHHHIII", 20, flags, zlib.DEFLATED, time, date, crc, len(compressed), len(content))
+                    + member.central[28:42]
+                    + struct.pack("<I", offset)
+                    + member.central[46:]
+                )
+            chunks.append(local)
+            directory.append(central)
+            offset += len(local)
+        directory_bytes = b"".join(directory)
+        count = len(self.members)
+        end = _END_RECORD.pack(_END_SIGNATURE, 0, 0, count, count, len(directory_bytes), offset, len(self.comment))
+        return b"".join(chunks) + directory_bytes + end + self.comment
+
+
+@dataclass
+class FillResult:
+    data: bytes
+    filled: int
+    missing: list[str]  # keys with no value; their tokens stay in the document
+
+
+class DocxFillPlan:
+    def __init__(self, template: bytes, parts: list[PartPlan]) -> None:
+        """``parts`` covers every body part, including those without tokens."""
+        self.sha256 = file_sha256(template)
+        self.parts = parts
+        self.zip = ZipLayout(template)
+        self.keys = sorted({key for part in parts for key in part.keys})
+
+    @classmethod
+    def analyze(cls, template: bytes) -> "DocxFillPlan":
+        with zipfile.ZipFile(io.BytesIO(template)) as zf:
+            return cls(template, [plan_part(name, zf.read(name)) for name in body_parts(zf)])
+
+    def fill(self, values: dict[str, object], compress_level: int = COMPRESS_LEVEL) -> FillResult:
+        """One filled document. str / int / float values are used as text; keys without one keep their token."""
+        encoded: dict[str, bytes] = {}
+        missing: list[str] = []
+        for key in self.keys:
+            value = values.get(key)
+            if isinstance(value, str) or (isinstance(value, (int, float)) and not isinstance(value, bool)):
+                encoded[key] = run_text(str(value))
+            else:
+                encoded[key] = b"{{%s}}" % key.encode("utf-8")
+                missing.append(key)
+        replaced = {part.name: part.fill(encoded) for part in self.parts if part.keys}
+        return FillResult(self.zip.write(replaced, compress_level), len(self.keys) - len(missing), missing)
+
+    def save(self, plan_dir: Path) -> list[Path]:
+        """Write plan.json and the normalized parts; returns every file written."""
+        plan_dir.mkdir(parents=True, exist_ok=True)
+        written: list[Path] = []
+        parts_meta: list[dict[str, object]] = []
+        for part in self.parts:
+            data, spans = part.normalized()
+            path = plan_dir / part.name.replace("/", "__")
+            path.write_bytes(data)
+            written.append(path)
+            parts_meta.append({"name": part.name, "file": path.name, "tokens": [list(span) for span in spans]})
+        plan = {"template_sha256": self.sha256, "keys": self.keys, "parts": parts_meta}
+        plan_path = plan_dir / PLAN_NAME
+        plan_path.write_text(json.dumps(plan, indent=2), encoding="utf-8")
+        return written + [plan_path]
+
+    @classmethod
+    def load(cls, plan_dir: Path, template: bytes) -> "DocxFillPlan":
+        plan = json.loads((plan_dir / PLAN_NAME).read_text(encoding="utf-8"))
+        if plan["template_sha256"] != file_sha256(template):
+            raise ValueError(f"{plan_dir / PLAN_NAME} was built from a different template")
+        parts = [
+            PartPlan.from_normalized(part["name"], (plan_dir / part["file"]).read_bytes(), [tuple(span) for span in part["tokens"]])
+            for part in plan["parts"]
+        ]
+        return cls(template, parts)
+
+
+def body_parts(zf: zipfile.ZipFile) -> list[str]:
+    return [name for name in zf.namelist() if BODY_PART_RE.match(name)]
+
+
+def plan_outputs(template: bytes, plan_dir: Path) -> list[Path]:
+    with zipfile.ZipFile(io.BytesIO(template)) as zf:
+        names = body_parts(zf)
+    return [plan_dir / name.replace("/", "__") for name in names] + [plan_dir / PLAN_NAME]
+
+
+def build_plan(template_path: Path, plan_dir: Path, cache: StageCache) -> tuple[DocxFillPlan, bool]:
+    """The template's fill plan, from the cache when the template and tools are unchanged; True when rebuilt."""
+    template = template_path.read_bytes()
+    key = stage_key(STAGE, tool_version("docx_fill.py", "token_scanner.py"), [file_sha256(template)])
+    outputs = plan_outputs(template, plan_dir)
+    if cache.restore(STAGE, key, outputs) is not None:
+        return DocxFillPlan.load(plan_dir, template), False
+    plan = DocxFillPlan.analyze(template)
+    plan.save(plan_dir)
+    cache.store(STAGE, key, outputs, meta={"template": template_path.as_posix(), "keys": plan.keys})
+    return plan, True
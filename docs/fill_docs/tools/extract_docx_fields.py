@@ -1,8 +1,10 @@
+import argparse
 import json
-import re
-import zipfile
 from pathlib import Path
-from xml.etree import ElementTree as ET
+
+from docx_engine import XML_PARTS, default_workers, expand_templates, map_templates, read_docx
+from stage_cache import StageCache, sha256_bytes, stage_key, tool_version
+from token_scanner import TOKEN_PATTERNS
 
 
 DOCX_FILES = [
@@ -12,122 +14,94 @@ DOCX_FILES = [
 ]
 
 
-XML_PARTS = [
-    "word/document.xml",
-    "word/header1.xml",
-    "word/header2.xml",
-    "word/header3.xml",
-    "word/footer1.xml",
-    "word/footer2.xml",
-    "word/footer3.xml",
-]
+OUT_DIR = Path("tmp/docx_extracted")
+STAGE = "extract_docx_fields"
 
 
-TOKEN_PATTERNS: dict[str, re.Pattern[str]] = {
-    "curly": re.compile(r"\{\{[^}]+\}\}"),
-    "angle": re.compile(r"«[^»]+»"),
-    "bracket": re.compile(r"\[[A-Z0-9_ -]{2,}\]"),
-}
+def output_paths(out_dir: Path, stem: str) -> list[Path]:
+    return [out_dir / f"{stem}.xml.txt", out_dir / f"{stem}.text.txt", out_dir / f"{stem}.structured.txt"]
 
 
-def strip_xml_text(text: str) -> str:
-    # Very lightweight XML entity decoding for common entities in WordprocessingML
-    return (
-        text.replace("&lt;", "<")
-        .replace("&gt;", ">")
-        .replace("&amp;", "&")
-        .replace("&quot;", '"')
-        .replace("&apos;", "'")
-    )
+def extract(path: Path, data: bytes, out_dir: Path) -> dict[str, object]:
+    doc = read_docx(path, XML_PARTS, scan=True, data=data)
 
+    xml_parts: list[str] = []
+    text_parts: list[str] = []
+    structured_parts: list[str] = []
+    for part in doc.parts:
+        header = f"\n\n==== {part.name} ====\n"
+        xml_parts.extend((header, part.xml))
+        text_parts.extend((header, part.text))
+        structured_parts.extend((header, part.structured))
 
-def extract_text(xml: str) -> str:
-    root = ET.fromstring(xml)
-    parts: list[str] = []
-    for el in root.iter():
-        if el.tag.endswith("}t") and el.text is not None:
-            parts.append(strip_xml_text(el.text))
-    return "".join(parts)
+    tokens = doc.token_values(TOKEN_PATTERNS)
 
+    xml_path, text_path, structured_path = output_paths(out_dir, path.stem)
+    xml_path.write_text("".join(xml_parts), encoding="utf-8")
+    text_path.write_text("".join(text_parts), encoding="utf-8")
+    structured_path.write_text("".join(structured_parts), encoding="utf-8")
 
-def extract_structured_text(xml: str) -> str:
-    """
-    Best-effort readable text extraction from WordprocessingML.
-    Inserts newlines/tabs around paragraphs and table cells.
-    """
-    root = ET.fromstring(xml)
-    out: list[str] = []
-
-    def emit(s: str) -> None:
-        if not s:
-            return
-        out.append(s)
-
-    for el in root.iter():
-        tag = el.tag.split("}")[-1]  # localname
-
-        if tag == "t" and el.text:
-            emit(strip_xml_text(el.text))
-        elif tag == "tab":
-            emit("\t")
-        elif tag == "br":
-            emit("\n")
-        elif tag in ("p", "tr"):
-            emit("\n")
-        elif tag == "tc":
-            emit("\t")
-
-    text = "".join(out)
-    text = re.sub(r"[ \t]+\n", "\n", text)
-    text = re.sub(r"\n{3,}", "\n\n", text)
-    return text.strip() + "\n"
+    return {
+        "parts": doc.part_names(),
+        "token_counts": {k: len(v) for k, v in tokens.items()},
+        "tokens": tokens,
+    }
 
 
-def main() -> None:
-    out_dir = Path("tmp/docx_extracted")
+def _extract_task(task: tuple[str, str]) -> dict[str, object]:
+    filename, out_dir = task
+    path = Path(filename)
+    return extract(path, path.read_bytes(), Path(out_dir))
+
+
+def run(docx_files: list[str], out_dir: Path, cache: StageCache, workers: int = 1) -> dict[str, object]:
+    """Extract every template (files, directories or globs), restoring unchanged ones from the cache.
+
+    Cache misses fan out to ``workers`` processes; writes summary.json.
+    """
     out_dir.mkdir(parents=True, exist_ok=True)
+    version = tool_version("extract_docx_fields.py", "docx_engine.py", "token_scanner.py")
+    paths = expand_templates(docx_files)
+    stems: dict[str, Path] = {}
+    for p in paths:
+        if p.stem in stems:
+            raise ValueError(f"{p} and {stems[p.stem]} would write the same {out_dir}/{p.stem}.*.txt files")
+        stems[p.stem] = p
 
     summary: dict[str, object] = {}
-
-    for filename in DOCX_FILES:
-        p = Path(filename)
-        if not p.exists():
-            raise FileNotFoundError(filename)
-
-        with zipfile.ZipFile(p, "r") as zf:
-            present_parts = [name for name in XML_PARTS if name in zf.namelist()]
-            xml_concat = ""
-            text_concat = ""
-            for part in present_parts:
-                xml = zf.read(part).decode("utf-8", errors="replace")
-                xml_concat += f"\n\n==== {part} ====\n{xml}"
-                text_concat += f"\n\n==== {part} ====\n{extract_text(xml)}"
-
-        tokens: dict[str, list[str]] = {}
-        for key, pattern in TOKEN_PATTERNS.items():
-            tokens[key] = sorted(set(pattern.findall(xml_concat)))
-
-        summary[filename] = {
-            "parts": present_parts,
-            "token_counts": {k: len(v) for k, v in tokens.items()},
-            "tokens": tokens,
-        }
-
-        structured_concat = ""
-        with zipfile.ZipFile(p, "r") as zf:
-            present_parts = [name for name in XML_PARTS if name in zf.namelist()]
-            for part in present_parts:
-                xml = zf.read(part).decode("utf-8", errors="replace")
-                structured_concat += f"\n\n==== {part} ====\n{extract_structured_text(xml)}"
-
-        (out_dir / f"{p.stem}.xml.txt").write_text(xml_concat, encoding="utf-8")
-        (out_dir / f"{p.stem}.text.txt").write_text(text_concat, encoding="utf-8")
-        (out_dir / f"{p.stem}.structured.txt").write_text(structured_concat, encoding="utf-8")
+    pending: list[tuple[Path, str]] = []
+    for p in paths:
+        key = stage_key(STAGE, version, [sha256_bytes(p.read_bytes())])
+        entry = cache.restore(STAGE, key, output_paths(out_dir, p.stem))
+        summary[str(p)] = entry  # None until extracted below; keeps the input order
+        if entry is None:
+            pending.append((p, key))
+
+    results = map_templates(_extract_task, [(str(p), str(out_dir)) for p, _ in pending], workers)
+    for (p, key), entry in zip(pending, results):
+        cache.store(STAGE, key, output_paths(out_dir, p.stem), meta=entry)
+        summary[str(p)] = entry
 
     (out_dir / "summary.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
-    print(f"Wrote: {out_dir / 'summary.json'}")
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Extract text, structured text and tokens from DOCX templates.")
+    parser.add_argument(
+        "docx", nargs="*", default=DOCX_FILES, help="templates, directories or globs (default: the IEHP ER / FBA / PR set)"
+    )
+    parser.add_argument("--out-dir", type=Path, default=OUT_DIR)
+    parser.add_argument("--force", action="store_true", help="re-extract even when a template is unchanged")
+    parser.add_argument("--workers", type=int, default=default_workers(), help="extract templates in N processes")
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    cache = StageCache(args.out_dir / ".cache", refresh=args.force)
+    run(args.docx, args.out_dir, cache, args.workers)
+    print(f"Wrote: {args.out_dir / 'summary.json'} ({cache.summary()})")
 
 
 if __name__ == "__main__":
     main()
-
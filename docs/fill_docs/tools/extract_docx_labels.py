@@ -1,8 +1,11 @@
+import argparse
 import json
-import re
-import zipfile
+import time
 from pathlib import Path
-from xml.etree import ElementTree as ET
+
+from docx_engine import BODY_PART_RE, default_workers, expand_templates, map_templates, read_docx
+from stage_cache import StageCache, sha256_bytes, stage_key, tool_version
+from token_scanner import values_by_kind
 
 
 DOCX_FILES = [
@@ -12,83 +15,114 @@ DOCX_FILES = [
 ]
 
 
-PART_RE = re.compile(r"^word/(document|header\d+|footer\d+)\.xml$")
+OUT_DIR = Path("tmp/docx_extracted")
+STAGE = "extract_docx_labels"
 
-TAG_RE = re.compile(r"<w:tag[^>]*w:val=\"([^\"]+)\"")
-ALIAS_RE = re.compile(r"<w:alias[^>]*w:val=\"([^\"]+)\"")
 
-# colon labels like "First Name:" "IEHP Member ID#:" etc
-LABEL_RE = re.compile(r"([A-Za-z][A-Za-z0-9 /()#\-]{1,60}):")
+def uniq(items: list[str]) -> list[str]:
+    return sorted({item.strip() for item in items if item and item.strip()})
 
-# underscore blanks
-UNDERSCORE_RE = re.compile(r"_{5,}")
 
+def extract_labels(path: Path, data: bytes) -> dict[str, object]:
+    tags: list[str] = []
+    aliases: list[str] = []
+    labels: list[str] = []
+    underscore_count = 0
+    parts: list[str] = []
 
-def strip_xml_text(text: str) -> str:
-    return (
-        text.replace("&lt;", "<")
-        .replace("&gt;", ">")
-        .replace("&amp;", "&")
-        .replace("&quot;", '"')
-        .replace("&apos;", "'")
-    )
+    for part in read_docx(path, BODY_PART_RE.match, scan=True, data=data).parts:
+        parts.append(part.name)
+        found = values_by_kind(part.tokens, ("tag", "alias", "label", "underscore"))
+        tags.extend(found["tag"])
+        aliases.extend(found["alias"])
+        labels.extend(found["label"])
+        underscore_count += len(found["underscore"])
 
+    return {
+        "parts": sorted(parts),
+        "tags": uniq(tags),
+        "aliases": uniq(aliases),
+        "labels": uniq(labels),
+        "underscore_blank_count": underscore_count,
+    }
 
-def extract_text(xml: str) -> str:
-    root = ET.fromstring(xml)
-    parts: list[str] = []
-    for el in root.iter():
-        if el.tag.endswith("}t") and el.text is not None:
-            parts.append(strip_xml_text(el.text))
-    return "".join(parts)
 
+def _extract_labels_task(filename: str) -> tuple[dict[str, object], float]:
+    started = time.perf_counter()
+    path = Path(filename)
+    entry = extract_labels(path, path.read_bytes())
+    return entry, time.perf_counter() - started
 
-def uniq(items: list[str]) -> list[str]:
-    return sorted({item.strip() for item in items if item and item.strip()})
 
+def run(docx_files: list[str], out_dir: Path, cache: StageCache, workers: int = 1) -> dict[str, object]:
+    """Labels for every template (files, directories or globs); cache misses fan out to ``workers`` processes.
 
-def main() -> None:
-    out_dir = Path("tmp/docx_extracted")
+    Writes the merged labels.json and labels_timings.json (seconds per template, and whether it was cached).
+    """
     out_dir.mkdir(parents=True, exist_ok=True)
-
+    version = tool_version("extract_docx_labels.py", "docx_engine.py", "token_scanner.py")
     report: dict[str, object] = {}
-
-    for filename in DOCX_FILES:
-        p = Path(filename)
-        if not p.exists():
-            raise FileNotFoundError(filename)
-
-        tags: list[str] = []
-        aliases: list[str] = []
-        labels: list[str] = []
-        underscore_count = 0
-        parts: list[str] = []
-
-        with zipfile.ZipFile(p, "r") as zf:
-            for name in zf.namelist():
-                if not PART_RE.match(name):
-                    continue
-                parts.append(name)
-                xml = zf.read(name).decode("utf-8", errors="replace")
-                tags.extend(TAG_RE.findall(xml))
-                aliases.extend(ALIAS_RE.findall(xml))
-
-                text = extract_text(xml)
-                labels.extend(LABEL_RE.findall(text))
-                underscore_count += len(UNDERSCORE_RE.findall(text))
-
-        report[filename] = {
-            "parts": sorted(parts),
-            "tags": uniq(tags),
-            "aliases": uniq(aliases),
-            "labels": uniq(labels),
-            "underscore_blank_count": underscore_count,
-        }
+    timings: dict[str, dict[str, object]] = {}
+    pending: list[tuple[str, str]] = []
+
+    started = time.perf_counter()
+    for p in expand_templates(docx_files):
+        filename = str(p)
+        lookup_started = time.perf_counter()
+        key = stage_key(STAGE, version, [sha256_bytes(p.read_bytes())])
+        entry = cache.restore(STAGE, key, [])
+        if entry is None:
+            pending.append((filename, key))
+            report[filename] = None  # keeps the input order; filled in below
+            continue
+        report[filename] = entry
+        timings[filename] = {"seconds": round(time.perf_counter() - lookup_started, 4), "cached": True}
+
+    results = map_templates(_extract_labels_task, [filename for filename, _ in pending], workers)
+    for (filename, key), (entry, seconds) in zip(pending, results):
+        cache.store(STAGE, key, [], meta=entry)
+        report[filename] = entry
+        timings[filename] = {"seconds": round(seconds, 4), "cached": False}
 
     (out_dir / "labels.json").write_text(json.dumps(report, indent=2), encoding="utf-8")
-    print(f"Wrote: {out_dir / 'labels.json'}")
+    (out_dir / "labels_timings.json").write_text(
+        json.dumps(
+            {
+                "templates": len(report),
+                "extracted": len(pending),
+                "workers": workers,
+                "wall_seconds": round(time.perf_counter() - started, 4),
+                "per_template": {filename: timings[filename] for filename in report},
+            },
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Collect content-control tags, aliases and colon labels from DOCX templates.")
+    parser.add_argument(
+        "docx", nargs="*", default=DOCX_FILES, help="templates, directories or globs (default: the IEHP ER / FBA / PR set)"
+    )
+    parser.add_argument("--out-dir", type=Path, default=OUT_DIR)
+    parser.add_argument("--force", action="store_true", help="re-extract even when a template is unchanged")
+    parser.add_argument("--workers", type=int, default=default_workers(), help="extract templates in N processes")
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    cache = StageCache(args.out_dir / ".cache", refresh=args.force)
+    run(args.docx, args.out_dir, cache, args.workers)
+    timings = json.loads((args.out_dir / "labels_timings.json").read_text(encoding="utf-8"))
+    for filename, timing in timings["per_template"].items():
+        print(f"{timing['seconds']:8.3f}s {'cached' if timing['cached'] else '      '}  {filename}")
+    print(
+        f"Wrote: {args.out_dir / 'labels.json'} ({timings['templates']} templates, {timings['wall_seconds']:.3f}s "
+        f"with {args.workers} workers; {cache.summary()})"
+    )
 
 
 if __name__ == "__main__":
     main()
-
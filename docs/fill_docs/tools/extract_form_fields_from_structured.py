@@ -1,7 +1,10 @@
+import argparse
 import json
 import re
 from pathlib import Path
 
+from stage_cache import StageCache, sha256_file, stage_key, tool_version
+
 
 FILES = [
     ("ER", Path("tmp/docx_extracted/Updated ER - IEHP.structured.txt")),
@@ -10,6 +13,10 @@ FILES = [
 ]
 
 
+OUT_PATH = Path("tmp/docx_extracted/field_labels.json")
+STAGE = "extract_form_fields_from_structured"
+
+
 PLACEHOLDER_RE = re.compile(r"\[[^\]]+\]")  # [XX], [MM/DD/YYYY], etc
 
 
@@ -17,9 +24,9 @@ def normalize_label(label: str) -> str:
     return re.sub(r"\s+", " ", label.strip())
 
 
-def main() -> None:
+def build(files: list[tuple[str, Path]]) -> dict[str, object]:
     report: dict[str, object] = {}
-    for key, path in FILES:
+    for key, path in files:
         text = path.read_text(encoding="utf-8", errors="replace")
         lines = [line.rstrip() for line in text.splitlines()]
 
@@ -38,9 +45,26 @@ def main() -> None:
             "placeholders": placeholders,
         }
 
-    out = Path("tmp/docx_extracted/field_labels.json")
-    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
-    print(f"Wrote: {out}")
+    return report
+
+
+def run(cache: StageCache, files: list[tuple[str, Path]] = FILES, out: Path = OUT_PATH) -> None:
+    # keyed on the structured text contents, so an extraction rerun that changed nothing still hits
+    inputs = [f"{key}:{sha256_file(path)}" for key, path in files]
+    cache_key = stage_key(STAGE, tool_version("extract_form_fields_from_structured.py"), inputs)
+    if cache.restore(STAGE, cache_key, [out]) is None:
+        out.write_text(json.dumps(build(files), indent=2), encoding="utf-8")
+        cache.store(STAGE, cache_key, [out])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Collect colon field labels and [placeholders] from structured text.")
+    parser.add_argument("--force", action="store_true", help="rebuild even when the structured text is unchanged")
+    args = parser.parse_args()
+
+    cache = StageCache(refresh=args.force)
+    run(cache)
+    print(f"Wrote: {OUT_PATH} ({cache.summary()})")
 
 
 if __name__ == "__main__":
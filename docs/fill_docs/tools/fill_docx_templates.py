@@ -0,0 +1,66 @@
+import argparse
+import json
+import time
+from pathlib import Path
+
+from docx_fill import COMPRESS_LEVEL, build_plan
+from render_fba_pdfs import load_records, output_name
+from stage_cache import StageCache
+
+
+# Fill a batch of member records into a DOCX template with {{PLACEHOLDER_KEY}}
+# tokens, the keys generate_iehp_mapping.py recommends. Records are read like
+# render_fba_pdfs.py reads them: a JSON array or JSON Lines, each record either
+# a placeholder -> value object or one with "field_values". The fill plan is
+# built (or restored from the cache) once. fill_report.json lists, per
+# document, the keys that had no value and so kept their token.
+
+
+OUT_DIR = Path("tmp/docx_filled")
+PLAN_ROOT = Path("tmp/docx_extracted/fill_plans")
+REPORT_NAME = "fill_report.json"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fill a batch of member records into a DOCX template's {{PLACEHOLDER}} tokens.")
+    parser.add_argument("template", type=Path)
+    parser.add_argument("records", nargs="+", type=Path, help="JSON array or JSON Lines files of member records")
+    parser.add_argument("--out-dir", type=Path, default=OUT_DIR)
+    parser.add_argument("--plan-dir", type=Path, help=f"where the fill plan is written (default: {PLAN_ROOT}/<template name>)")
+    parser.add_argument("--id-key", default="id", help="record field used to name the output file")
+    parser.add_argument("--compress-level", type=int, default=COMPRESS_LEVEL, help="deflate level for the filled parts")
+    parser.add_argument("--force", action="store_true", help="re-analyze the template even when a cached plan exists")
+    args = parser.parse_args()
+
+    cache = StageCache(refresh=args.force)
+    started = time.perf_counter()
+    plan, rebuilt = build_plan(args.template, args.plan_dir or PLAN_ROOT / args.template.stem, cache)
+    plan_seconds = time.perf_counter() - started
+    if not plan.keys:
+        raise SystemExit(f"{args.template} has no {{{{PLACEHOLDER}}}} tokens to fill")
+    records = [record for path in args.records for record in load_records(path)]
+
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    report: list[dict[str, object]] = []
+    started = time.perf_counter()
+    for index, record in enumerate(records):
+        values = record.get("field_values", record)
+        result = plan.fill(values if isinstance(values, dict) else {}, args.compress_level)
+        name = output_name(record, index, args.id_key, ".docx")
+        (args.out_dir / name).write_bytes(result.data)
+        report.append({"file": name, "filled": result.filled, "missing": result.missing})
+    fill_seconds = time.perf_counter() - started
+    (args.out_dir / REPORT_NAME).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    tokens = sum(len(part.keys) for part in plan.parts)
+    filled_parts = ", ".join(part.name for part in plan.parts if part.keys)
+    incomplete = sum(1 for entry in report if entry["missing"])
+    rate = len(records) / fill_seconds if fill_seconds else 0.0
+    print(f"Plan: {tokens} tokens, {len(plan.keys)} keys in {filled_parts} ({'built' if rebuilt else 'cached'}, {plan_seconds * 1000:.1f}ms)")
+    print(f"Filled {len(records)} documents to {args.out_dir}; {incomplete} with missing values (see {args.out_dir / REPORT_NAME})")
+    print(f"{fill_seconds:.2f}s, {rate:.1f} docs/s, {fill_seconds / max(len(records), 1) * 1000:.1f}ms per document")
+    print(cache.summary())
+
+
+if __name__ == "__main__":
+    main()
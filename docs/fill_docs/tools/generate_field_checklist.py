@@ -0,0 +1,262 @@
+import argparse
+import json
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from checklist_rules import RULES, ChecklistRules
+from stage_cache import StageCache, sha256_file, stage_key, tool_version
+
+
+# One checklist engine for every payer. checklist_rules.py holds a rule table
+# per payer, and compile_rules() turns it into direct lookups:
+# - placeholder -> section (inverted from section_keys, or read from the layout manifest)
+# - placeholder -> extraction method and validation-rule overrides
+# - one compiled regex per validation rule, tried in priority order
+# Building a row is then a few dict hits, however many sections or keys a payer
+# defines. A key with no section stops the run with every such key listed.
+
+
+STAGE = "generate_field_checklist"
+STATUS_LIFECYCLE = ["not_started", "drafted", "verified", "approved"]
+REQUIREDNESS_RULES = {
+    "AUTO": "required when source exists",
+    "ASSISTED": "required, clinician verification required",
+    "MANUAL": "required clinician entry unless explicitly optional",
+}
+# mapping keys that become core checklist columns instead of being copied
+CORE_MAPPING_KEYS = {"label", "placeholder_key", "mode", "source", "notes"}
+
+
+@dataclass
+class CompiledRules:
+    rules: ChecklistRules
+    section_by_key: dict[str, str]
+    manifest_by_key: dict[str, dict[str, object]]
+    method_by_key: dict[str, str]
+    validation_by_key: dict[str, str]
+    validation_matchers: list[tuple[re.Pattern[str], str]]
+
+
+def invert(table: dict[str, set[str]], what: str) -> dict[str, str]:
+    inverted: dict[str, str] = {}
+    for value, keys in table.items():
+        for key in keys:
+            if inverted.setdefault(key, value) != value:
+                raise ValueError(f"{key} is listed under two {what}: {inverted[key]} and {value}")
+    return inverted
+
+
+def compile_rules(rules: ChecklistRules) -> CompiledRules:
+    manifest_by_key: dict[str, dict[str, object]] = {}
+    if rules.layout_manifest_path is not None:
+        manifest = json.loads(rules.layout_manifest_path.read_text(encoding="utf-8"))
+        manifest_by_key = {str(f["field_key"]): f for f in manifest.get("fields", [])}
+
+    section_by_key = invert(rules.section_keys, "sections")
+    for key, manifest_field in manifest_by_key.items():
+        section_by_key.setdefault(key, str(manifest_field["section_key"]))
+
+    return CompiledRules(
+        rules=rules,
+        section_by_key=section_by_key,
+        manifest_by_key=manifest_by_key,
+        method_by_key=invert(rules.method_keys, "extraction methods"),
+        validation_by_key=invert(rules.validation_keys, "validation rules"),
+        validation_matchers=[(re.compile(pattern), rule) for rule, pattern in rules.validation_patterns],
+    )
+
+
+def check_sections(compiled: CompiledRules, labels: list[dict[str, object]]) -> None:
+    rules = compiled.rules
+    problems: list[str] = []
+    for item in labels:
+        key = str(item["placeholder_key"])
+        section = compiled.section_by_key.get(key)
+        if section is None:
+            problems.append(f"{key}: no section")
+        elif section not in rules.section_titles:
+            problems.append(f"{key}: unknown section {section!r}")
+    if problems:
+        raise ValueError(f"{rules.name} rules do not cover {rules.mapping_path}:\n  " + "\n  ".join(problems))
+
+
+def validation_rule(compiled: CompiledRules, label: str, key: str, input_type: str, required: bool) -> str:
+    rules = compiled.rules
+    rule = compiled.validation_by_key.get(key)
+    if rule is None:
+        text = f"{label} {key}".lower()
+        rule = next((name for pattern, name in compiled.validation_matchers if pattern.search(text)), None)
+    if rule is None:
+        rule = rules.validation_by_input_type.get(input_type, rules.default_validation)
+    if not required:
+        rule = rules.optional_validation.get(rule, rule)
+    return rule
+
+
+def extraction_method(compiled: CompiledRules, key: str, mode: str, input_type: str) -> str:
+    rules = compiled.rules
+    method = compiled.method_by_key.get(key) or rules.method_by_input_type.get(input_type)
+    return method or rules.method_by_mode.get(mode, "clinician_manual_entry")
+
+
+def infer_required(mode: str, source: str) -> bool:
+    if mode in {"ASSISTED", "MANUAL"}:
+        return True
+    return source.strip().upper() != "N/A"
+
+
+def build_row(compiled: CompiledRules, item: dict[str, object]) -> dict[str, object]:
+    rules = compiled.rules
+    key = str(item["placeholder_key"])
+    label = str(item["label"])
+    overrides = rules.row_overrides.get(key, {})
+    manifest_field = compiled.manifest_by_key.get(key)
+    if manifest_field is not None:
+        mode = str(manifest_field["mode"])
+        source = str(overrides.get("source", manifest_field["source"]))
+        required = bool(manifest_field["required"])
+    else:
+        mode = str(item["mode"])
+        source = str(overrides.get("source", item["source"]))
+        required = infer_required(mode, source)
+    input_type = str(item.get("input_type", ""))
+    extraction_owner, review_owner = rules.owners_by_mode.get(mode, ("ClinicalAuthor", "BCBAReviewer"))
+
+    row: dict[str, object] = {
+        "section": compiled.section_by_key[key],
+        "label": label,
+        "placeholder_key": key,
+        "mode": mode,
+        "source": source,
+        "required": required,
+        "extraction_method": extraction_method(compiled, key, mode, input_type),
+        "validation_rule": validation_rule(compiled, label, key, input_type, required),
+        "status": "not_started",
+        "extraction_owner": extraction_owner,
+        "review_owner": review_owner,
+        "review_notes": overrides.get("review_notes", item.get("notes", "")),
+    }
+    if rules.copy_mapping_extras:
+        row.update((name, value) for name, value in item.items() if name not in CORE_MAPPING_KEYS)
+        if rules.default_pdf_render is not None:
+            row.setdefault("pdf_render", rules.default_pdf_render)
+    return row
+
+
+def build_checklist(rules: ChecklistRules) -> dict[str, object]:
+    fba = json.loads(rules.mapping_path.read_text(encoding="utf-8")).get("FBA", {})
+    labels: list[dict[str, object]] = fba.get("labels", [])
+    compiled = compile_rules(rules)
+    check_sections(compiled, labels)
+    return {
+        "template": fba.get("template", rules.title),
+        "source_mapping_file": rules.mapping_path.as_posix(),
+        "source_document": rules.header_overrides.get("source_document", fba.get("source_document", "")),
+        "status_lifecycle": STATUS_LIFECYCLE,
+        "requiredness_rules": REQUIREDNESS_RULES,
+        "rows": [build_row(compiled, item) for item in labels],
+    }
+
+
+def render_markdown(rules: ChecklistRules, checklist: dict[str, object]) -> str:
+    rows: list[dict[str, object]] = checklist["rows"]
+    lines: list[str] = []
+    lines.append(f"# {rules.title}")
+    lines.append("")
+    lines.append(f"Template: `{checklist['template']}`")
+    lines.append(f"")
+    lines.append(f"Source mapping: `{checklist['source_mapping_file']}`")
+    lines.append(f"Source document reviewed: `{checklist['source_document']}`")
+    lines.append("")
+    lines.append("## Checklist schema and workflow rules")
+    lines.append("")
+    lines.append("- `status` lifecycle: `not_started` -> `drafted` -> `verified` -> `approved`.")
+    lines.append("- Requiredness defaults:")
+    for mode, rule in REQUIREDNESS_RULES.items():
+        lines.append(f"  - `{mode}`: {rule}.")
+    lines.append("- Parity rule: every `placeholder_key` in mapping must appear exactly once in this checklist.")
+    lines.extend(f"- {note}" for note in rules.md_workflow_notes)
+    lines.append("")
+    lines.append("## How to use")
+    lines.append("")
+    lines.append("1. Extractor sets `status` to `drafted` after initial population.")
+    lines.append("2. Reviewer validates format/source and sets `status` to `verified`.")
+    lines.append("3. BCBA or final approver sets `status` to `approved` with any sign-off notes.")
+    lines.append("")
+
+    sectioned: dict[str, list[dict[str, object]]] = {section: [] for section in rules.section_order}
+    for row in rows:
+        sectioned[str(row["section"])].append(row)
+
+    for section_id in rules.section_order:
+        section_rows = sectioned[section_id]
+        if not section_rows:
+            continue
+
+        lines.append(f"## {rules.section_titles[section_id]}")
+        lines.append("")
+        lines.append(
+            "| Label | Placeholder key | Mode | Required | Extraction method | Validation rule | Extraction owner | Review owner | Status | Review notes |"
+        )
+        lines.append("| --- | --- | --- | --- | --- | --- | --- | --- | --- | --- |")
+        for row in section_rows:
+            lines.append(
+                f"| {row['label']} | `{row['placeholder_key']}` | {row['mode']} | {str(row['required']).lower()} | "
+                f"{row['extraction_method']} | {row['validation_rule']} | {row['extraction_owner']} | "
+                f"{row['review_owner']} | {row['status']} | {row['review_notes']} |"
+            )
+        lines.append("")
+
+    return "\n".join(lines) + "\n"
+
+
+def generate(rules: ChecklistRules) -> dict[str, object]:
+    checklist = build_checklist(rules)
+    rules.out_json_path.write_text(json.dumps(checklist, indent=2) + "\n", encoding="utf-8")
+    if rules.out_md_path is not None:
+        rules.out_md_path.write_text(render_markdown(rules, checklist), encoding="utf-8")
+    return checklist
+
+
+def output_paths(rules: ChecklistRules) -> list[Path]:
+    return [rules.out_json_path] + ([rules.out_md_path] if rules.out_md_path is not None else [])
+
+
+def run(rules: ChecklistRules, cache: StageCache) -> bool:
+    """Regenerate one payer's checklist unless its inputs and rules are unchanged; True when rebuilt."""
+    inputs = [sha256_file(rules.mapping_path)]
+    if rules.layout_manifest_path is not None:
+        inputs.append(sha256_file(rules.layout_manifest_path))
+    version = tool_version("generate_field_checklist.py", "checklist_rules.py")
+    key = stage_key(f"{STAGE}:{rules.name}", version, inputs)
+    outputs = output_paths(rules)
+    if cache.restore(STAGE, key, outputs) is not None:
+        return False
+    generate(rules)
+    cache.store(STAGE, key, outputs, meta={"payer": rules.name})
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate payer field extraction checklists from their mappings and rule tables.")
+    parser.add_argument("payer", nargs="*", default=list(RULES), help=f"any of {', '.join(RULES)} (default: all)")
+    parser.add_argument("--force", action="store_true", help="regenerate even when the mapping and rules are unchanged")
+    args = parser.parse_args()
+    unknown = [name for name in args.payer if name not in RULES]
+    if unknown:
+        parser.error(f"unknown payer: {', '.join(unknown)}")
+
+    cache = StageCache(refresh=args.force)
+    for name in args.payer:
+        rules = RULES[name]
+        started = time.perf_counter()
+        rebuilt = run(rules, cache)
+        paths = ", ".join(str(path) for path in output_paths(rules))
+        print(f"{name}: {'wrote' if rebuilt else 'unchanged'} {paths} ({(time.perf_counter() - started) * 1000:.1f}ms)")
+    print(cache.summary())
+
+
+if __name__ == "__main__":
+    main()
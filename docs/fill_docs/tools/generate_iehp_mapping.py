@@ -1,9 +1,16 @@
+import argparse
 import json
 import re
+import time
 from pathlib import Path
 
+from label_index import LabelIndex, Resolution
+from stage_cache import StageCache, sha256_file, stage_key, tool_version
+
 
 FIELD_LABELS_PATH = Path("tmp/docx_extracted/field_labels.json")
+OUT_DIR = Path("docs/fill_docs")
+STAGE = "generate_iehp_mapping"
 
 
 def slugify(label: str) -> str:
@@ -44,7 +51,6 @@ KNOWN_SOURCES: dict[str, dict[str, str]] = {
     "Date Referred": {"source": "NEW: clients.insurance_info.referral_date", "notes": "Not currently a dedicated column."},
     "Report Date": {"source": "today (server)", "notes": "Generated at time of report."},
     "Letter Date": {"source": "today (server)", "notes": "Generated at time of letter."},
-    "REPORT DATE": {"source": "today (server)", "notes": "Generated at time of report."},
     # Provider / org
     "Agency Name": {"source": "company_settings.company_name", "notes": ""},
     "Provider name/Certification": {
@@ -90,12 +96,50 @@ KNOWN_SOURCES: dict[str, dict[str, str]] = {
 }
 
 
-def main() -> None:
-    payload = json.loads(FIELD_LABELS_PATH.read_text(encoding="utf-8"))
+# Alternative wordings seen across template revisions, mapped to a KNOWN_SOURCES label.
+# Case, spacing, punctuation and apostrophe variants need no entry (see label_index.py).
+LABEL_SYNONYMS: dict[str, str] = {
+    "Date of Birth": "Birth Date",
+    "DOB": "Birth Date",
+    "Member ID": "IEHP Member ID#",
+    "IEHP ID": "IEHP Member ID#",
+    "Address": "Present Address",
+    "Home Address": "Present Address",
+    "Guardians": "Guardian(s)",
+    "Parent/Guardian Name": "Parent/Guardian",
+    "Primary Language": "Language",
+    "Preferred Language": "Language",
+    "Date of Referral": "Referral Date",
+    "Date of Report": "Report Date",
+    "Agency": "Agency Name",
+    "Provider Agency": "Agency Name",
+    "Teacher Name": "Teachers Name",
+    "Service Location": "Location of Service",
+    "Behavior Technicians": "Behavior Technician (s)",
+}
+
+
+UNMAPPED = {"source": "TBD (not yet mapped)", "notes": "Likely clinician-entered or requires new data capture."}
+
+
+def resolution_notes(resolution: Resolution[dict[str, str]]) -> str:
+    notes = (resolution.value or UNMAPPED).get("notes", "")
+    if resolution.method == "fuzzy":
+        return f"{notes} Matched to \"{resolution.matched_label}\" (similarity {resolution.score:.2f}).".strip()
+    return notes
 
-    out_dir = Path("docs/fill_docs")
+
+def generate(payload: dict[str, object], out_dir: Path) -> dict[str, dict[str, object]]:
+    """Write the map and return per-template resolution stats."""
     out_dir.mkdir(parents=True, exist_ok=True)
 
+    started = time.perf_counter()
+    index = LabelIndex(KNOWN_SOURCES, LABEL_SYNONYMS)
+    build_seconds = time.perf_counter() - started
+    # the templates share most labels; each distinct label is resolved once
+    resolved: dict[str, Resolution[dict[str, str]]] = {}
+    stats: dict[str, dict[str, object]] = {"index": {"keys": len(index.keys), "seconds": build_seconds}}
+
     mapping_json: dict[str, object] = {}
     md_lines: list[str] = []
     md_lines.append("# IEHP Template Field Map (ER / FBA / PR)")
@@ -126,23 +170,35 @@ def main() -> None:
         md_lines.append("| Template field label | Recommended placeholder_key | Source | Notes |")
         md_lines.append("| --- | --- | --- | --- |")
 
+        template_started = time.perf_counter()
+        methods: dict[str, int] = {}
         template_map: list[dict[str, str]] = []
         for label in labels:
-            source_info = KNOWN_SOURCES.get(
-                label,
-                {"source": "TBD (not yet mapped)", "notes": "Likely clinician-entered or requires new data capture."},
-            )
+            resolution = resolved.get(label)
+            if resolution is None:
+                resolution = resolved[label] = index.resolve(label)
+            methods[resolution.method] = methods.get(resolution.method, 0) + 1
+            source_info = resolution.value or UNMAPPED
+            notes = resolution_notes(resolution)
             placeholder_key = f"{template_key}_{slugify(label)}"
 
-            md_lines.append(f"| {label} | `{placeholder_key}` | {source_info['source']} | {source_info.get('notes','')} |")
-            template_map.append(
-                {
-                    "label": label,
-                    "placeholder_key": placeholder_key,
-                    "source": source_info["source"],
-                    "notes": source_info.get("notes", ""),
-                }
-            )
+            md_lines.append(f"| {label} | `{placeholder_key}` | {source_info['source']} | {notes} |")
+            entry = {
+                "label": label,
+                "placeholder_key": placeholder_key,
+                "source": source_info["source"],
+                "notes": notes,
+                "match": resolution.method,
+            }
+            if resolution.method in ("synonym", "fuzzy", "normalized"):
+                entry["matched_label"] = resolution.matched_label
+            template_map.append(entry)
+        stats[template_key] = {
+            "labels": len(labels),
+            "resolved": len(labels) - methods.get("unresolved", 0),
+            "methods": methods,
+            "seconds": time.perf_counter() - template_started,
+        }
 
         md_lines.append("")
         mapping_json[template_key] = {
@@ -152,7 +208,45 @@ def main() -> None:
 
     (out_dir / "IEHP_TEMPLATE_FIELD_MAP.md").write_text("\n".join(md_lines) + "\n", encoding="utf-8")
     (out_dir / "iehp_template_field_map.json").write_text(json.dumps(mapping_json, indent=2), encoding="utf-8")
-    print("Wrote docs/fill_docs/IEHP_TEMPLATE_FIELD_MAP.md and docs/fill_docs/iehp_template_field_map.json")
+    return stats
+
+
+def format_stats(stats: dict[str, dict[str, object]]) -> list[str]:
+    index = stats["index"]
+    lines = [f"index: {index['keys']} keys built in {index['seconds'] * 1000:.2f}ms"]
+    for template_key, entry in stats.items():
+        if template_key == "index":
+            continue
+        labels, resolved = entry["labels"], entry["resolved"]
+        rate = resolved / labels if labels else 0.0
+        methods = ", ".join(f"{method} {count}" for method, count in sorted(entry["methods"].items()))
+        lines.append(
+            f"{template_key:<4} {resolved}/{labels} labels resolved ({rate:.0%}) in {entry['seconds'] * 1000:.2f}ms [{methods}]"
+        )
+    return lines
+
+
+def run(cache: StageCache, out_dir: Path = OUT_DIR) -> dict[str, dict[str, object]]:
+    """Returns the resolution stats, from the cache (as first measured) when nothing changed."""
+    outputs = [out_dir / "IEHP_TEMPLATE_FIELD_MAP.md", out_dir / "iehp_template_field_map.json"]
+    version = tool_version("generate_iehp_mapping.py", "label_index.py")
+    key = stage_key(STAGE, version, [sha256_file(FIELD_LABELS_PATH)])
+    stats = cache.restore(STAGE, key, outputs)
+    if stats is None:
+        stats = generate(json.loads(FIELD_LABELS_PATH.read_text(encoding="utf-8")), out_dir)
+        cache.store(STAGE, key, outputs, meta=stats)
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate the IEHP template field map from the extracted field labels.")
+    parser.add_argument("--force", action="store_true", help="regenerate even when the field labels are unchanged")
+    args = parser.parse_args()
+
+    cache = StageCache(refresh=args.force)
+    for line in format_stats(run(cache)):
+        print(line)
+    print(f"Wrote docs/fill_docs/IEHP_TEMPLATE_FIELD_MAP.md and docs/fill_docs/iehp_template_field_map.json ({cache.summary()})")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,128 @@
+import re
+from collections import Counter
+from dataclasses import dataclass
+from itertools import chain
+from typing import Generic, TypeVar
+
+
+# Resolves template labels against a table of known labels without needing
+# the exact spelling.
+#
+# Every known label (and synonym) is reduced once to a key: casefolded, curly
+# quotes straightened, "&" read as "and", apostrophes dropped ("Assessor’s" ->
+# "assessors"), every other punctuation run treated as a word break, and single
+# tokens rewritten through TOKEN_SYNONYMS. An exact dict hit on that key covers
+# spacing, casing and punctuation variants.
+#
+# Labels that still miss fall back to character trigrams. The trigrams of every
+# key go into an inverted index (trigram -> keys). A lookup then only visits
+# keys that share a trigram with the label, counting the shared ones as it goes,
+# instead of scoring every known label. The score is the Dice coefficient of
+# the two trigram sets. A candidate is accepted only at or above
+# ``min_similarity``, and only when no other value comes within
+# ``ambiguity_margin`` of it.
+
+
+V = TypeVar("V")
+
+
+_QUOTES = str.maketrans({"’": "'", "‘": "'", "`": "'", "“": '"', "”": '"'})
+_APOSTROPHE_RE = re.compile(r"(?<=\w)'(?=\w)")
+_WORD_RE = re.compile(r"[^\W_]+")
+
+TOKEN_SYNONYMS: dict[str, str] = {
+    "tel": "phone",
+    "telephone": "phone",
+    "no": "number",
+    "num": "number",
+    "addr": "address",
+    "credential": "credentials",
+}
+
+
+def label_key(label: str) -> str:
+    text = label.translate(_QUOTES).casefold().replace("&", " and ")
+    text = _APOSTROPHE_RE.sub("", text)
+    return " ".join(TOKEN_SYNONYMS.get(token, token) for token in _WORD_RE.findall(text))
+
+
+def trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass(frozen=True)
+class Resolution(Generic[V]):
+    value: V | None
+    method: str  # exact, normalized, synonym, fuzzy, unresolved
+    matched_label: str = ""
+    score: float = 0.0
+
+
+class LabelIndex(Generic[V]):
+    def __init__(
+        self,
+        known: dict[str, V],
+        synonyms: dict[str, str] | None = None,
+        min_similarity: float = 0.85,
+        ambiguity_margin: float = 0.05,
+    ) -> None:
+        """``synonyms`` maps alternative labels to a label in ``known``."""
+        self.known = known
+        self.min_similarity = min_similarity
+        self.ambiguity_margin = ambiguity_margin
+        # key -> (label in known, method that reaches it)
+        self.by_key: dict[str, tuple[str, str]] = {}
+        for label in known:
+            self.by_key.setdefault(label_key(label), (label, "normalized"))
+        for alias, label in (synonyms or {}).items():
+            if label not in known:
+                raise KeyError(f"synonym {alias!r} points at unknown label {label!r}")
+            self.by_key.setdefault(label_key(alias), (label, "synonym"))
+
+        self.keys = list(self.by_key)
+        self.key_sizes: list[int] = []
+        self.postings: dict[str, list[int]] = {}
+        for key_id, key in enumerate(self.keys):
+            grams = trigrams(key)
+            self.key_sizes.append(len(grams))
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(key_id)
+        self.max_key_size = max(self.key_sizes, default=0)
+
+    def resolve(self, label: str) -> Resolution[V]:
+        if label in self.known:
+            return Resolution(self.known[label], "exact", label, 1.0)
+        key = label_key(label)
+        hit = self.by_key.get(key)
+        if hit is not None:
+            matched, method = hit
+            return Resolution(self.known[matched], method, matched, 1.0)
+        return self._fuzzy(key)
+
+    def _fuzzy(self, key: str) -> Resolution[V]:
+        grams = trigrams(key)
+        # Dice >= t needs the smaller set to be at least t / (2 - t) of the larger,
+        # so a long sentence-like label cannot reach any short key
+        if len(grams) * self.min_similarity > self.max_key_size * (2 - self.min_similarity):
+            return Resolution(None, "unresolved")
+        postings = self.postings
+        shared = Counter(chain.from_iterable(postings[gram] for gram in grams if gram in postings))
+
+        # best score per distinct known label; several keys can reach the same one
+        best: dict[str, float] = {}
+        for key_id, count in shared.items():
+            score = 2 * count / (len(grams) + self.key_sizes[key_id])
+            matched = self.by_key[self.keys[key_id]][0]
+            if score > best.get(matched, 0.0):
+                best[matched] = score
+        ranked = sorted(best.items(), key=lambda item: item[1], reverse=True)
+        if not ranked or ranked[0][1] < self.min_similarity:
+            return Resolution(None, "unresolved")
+        matched, score = ranked[0]
+        for other, other_score in ranked[1:]:
+            if score - other_score >= self.ambiguity_margin:
+                break
+            if self.known[other] != self.known[matched]:
+                return Resolution(None, "unresolved", matched, score)
+        return Resolution(self.known[matched], "fuzzy", matched, score)
@@ -0,0 +1,500 @@
+import io
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from text_layout import LineBreaks, TextLayout, text_layout
+
+
+# Batch renderer for PDF render maps such as caloptima_fba_pdf_render_map.json,
+# with the same fill rules as the generate-assessment-plan-pdf edge function:
+# - a placeholder whose form_field_candidates name an AcroForm text field or
+#   checkbox fills that field
+# - every other placeholder is drawn as Helvetica text in its fallback box,
+#   wrapped and clipped by layoutOverlayText's rules, with the same overflow
+#   warnings
+# With continuation=True, text that does not fit its box is carried onto
+# continuation pages appended after the template pages, instead of clipped.
+#
+# PdfTemplate parses the template once. It keeps the template bytes, the
+# serialized page and field dictionaries, and the trailer. Each document is then
+# written as an incremental update appended to the untouched template bytes.
+# The update holds only the objects that change:
+# - one Helvetica font object
+# - a "q" stream and one overlay stream per page that has overlay text
+# - the rewritten page dictionaries, whose /Contents arrays wrap the original
+#   streams in q ... Q before the overlay
+# - filled fields, plus /NeedAppearances so viewers draw their values
+# Nothing in the template is re-read, decompressed or re-serialized per member.
+#
+# Line breaking and measuring live in text_layout.py. Kerning is not applied,
+# which matches what Tj draws (pdf-lib measures with kerning pairs but draws
+# without them).
+
+
+FONT = "Helvetica"
+FONT_NAME = "/FOverlay"
+TEXT_COLOR = b"0.12 0.12 0.12 rg"
+DEFAULT_FIELD_HEIGHT_MULTIPLIER = 1.4
+FONT_OBJECT = b"<</Type/Font/Subtype/Type1/BaseFont/%s/Encoding/WinAnsiEncoding>>" % FONT.encode("ascii")
+CONTINUATION_MARGIN = 54
+CONTINUATION_HEADING_SIZE = 10
+CONTINUATION_FONT_SIZE = 9
+CONTINUATION_LINE_HEIGHT = 11
+
+# sanitizePdfText in supabase/functions/generate-assessment-plan-pdf/pdf-text.ts
+_PUNCTUATION = str.maketrans(
+    {
+        **dict.fromkeys("‘’‚‛", "'"),
+        **dict.fromkeys("“”„", '"'),
+        **dict.fromkeys("–—−•●○■", "-"),
+        "…": "...",
+    }
+)
+_DISALLOWED_RE = re.compile(r"[^\n\r\t\x20-\x7e\xa0-\xff]")
+_BLANKS_RE = re.compile(r"[ \t]+")
+_NEWLINE_RE = re.compile(r" *\n *")
+_LITERAL_SPECIAL_RE = re.compile(rb"[\\()]")
+_FIELD_FLAG_RADIO = 1 << 15
+_FIELD_FLAG_PUSHBUTTON = 1 << 16
+
+
+def sanitize_pdf_text(value: str) -> str:
+    text = _DISALLOWED_RE.sub(" ", value.translate(_PUNCTUATION))
+    return _NEWLINE_RE.sub("\n", _BLANKS_RE.sub(" ", text)).strip()
+
+
+def resolve_checkbox_value(raw: str) -> bool | None:
+    trimmed = raw.strip()
+    if not trimmed:
+        return None
+    return (sanitize_pdf_text(trimmed) or trimmed).strip().lower() in {"yes", "true", "checked", "1"}
+
+
+def is_checkbox_not_applicable(raw: str) -> bool:
+    return raw.strip().lower() in {"n/a", "na", "not applicable"}
+
+
+def pdf_literal(text: str) -> bytes:
+    """Sanitized text as a WinAnsi PDF string literal."""
+    data = _LITERAL_SPECIAL_RE.sub(rb"\\\g<0>", text.encode("latin-1"))
+    return b"(" + data.replace(b"\r", b"\\r") + b")"
+
+
+def pdf_text_string(text: str) -> bytes:
+    """A text string for /V: a literal when ASCII, UTF-16BE otherwise."""
+    if text.isascii():
+        return pdf_literal(text)
+    return b"<FEFF" + text.encode("utf-16-be").hex().upper().encode("ascii") + b">"
+
+
+def pdf_number(value: float) -> bytes:
+    return (b"%d" % value) if value == int(value) else (b"%.3f" % value).rstrip(b"0")
+
+
+@dataclass(frozen=True)
+class OverlayBox:
+    placeholder_key: str
+    form_field_candidates: tuple[str, ...]
+    page: int  # 1-based, as in the render map
+    font_size: float
+    line_height: float
+    max_lines: int
+    max_width: float
+    text_layout: TextLayout
+    text_prefix: bytes  # "BT /FOverlay <size> Tf <leading> TL <x> <y> Td "
+
+    @classmethod
+    def from_entry(cls, entry: dict[str, object]) -> "OverlayBox":
+        fallback: dict[str, float] = entry["fallback"]
+        font_size = fallback["font_size"]
+        line_height = fallback.get("line_height") or font_size + 2
+        height = fallback.get("height") or font_size * DEFAULT_FIELD_HEIGHT_MULTIPLIER
+        height_bound = max(1, int(height // line_height))
+        max_lines = max(1, min(fallback.get("max_lines") or height_bound, height_bound))
+        text_prefix = b"BT %s %s Tf %s TL %s %s Td " % (
+            FONT_NAME.encode("ascii"),
+            pdf_number(font_size),
+            pdf_number(line_height),
+            pdf_number(fallback["x"]),
+            pdf_number(fallback["y"]),
+        )
+        return cls(
+            placeholder_key=str(entry["placeholder_key"]),
+            form_field_candidates=tuple(entry.get("form_field_candidates", ())),
+            page=int(fallback["page"]),
+            font_size=font_size,
+            line_height=line_height,
+            max_lines=max_lines,
+            max_width=fallback["max_width"],
+            text_layout=text_layout(FONT, font_size),
+            text_prefix=text_prefix,
+        )
+
+    def wrap(self, text: str) -> list[str]:
+        """wrapOverlayText"""
+        return self.text_layout.break_lines(text, self.max_width).lines
+
+    def layout(self, text: str) -> tuple[LineBreaks, dict[str, object] | None]:
+        """layoutOverlayText: the line breaks, and an overflow warning if more than max_lines."""
+        breaks = self.text_layout.break_lines(text, self.max_width)
+        if len(breaks.lines) <= self.max_lines:
+            return breaks, None
+        warning = {
+            "placeholder_key": self.placeholder_key,
+            "page": self.page,
+            "reason": "overflow",
+            "rendered_line_count": self.max_lines,
+            "total_line_count": len(breaks.lines),
+            "max_lines": self.max_lines,
+        }
+        return breaks, warning
+
+    def text_operators(self, lines: list[str]) -> bytes:
+        return self.text_prefix + b" Tj T* ".join(map(pdf_literal, lines)) + b" Tj ET\n"
+
+
+def load_render_map(path: Path) -> list[OverlayBox]:
+    render_map = json.loads(path.read_text(encoding="utf-8"))
+    return [OverlayBox.from_entry(entry) for entry in render_map["entries"] if not entry.get("not_exported")]
+
+
+def _require_pypdf():
+    try:
+        import pypdf
+    except ImportError as exc:  # pragma: no cover - depends on the environment
+        raise RuntimeError("Rendering PDF templates requires pypdf (pip install pypdf).") from exc
+    return pypdf
+
+
+def _serialize(obj) -> bytes:
+    buffer = io.BytesIO()
+    obj.write_to_stream(buffer)
+    return buffer.getvalue()
+
+
+def _dict_prefix(obj, drop: set[str]) -> bytes:
+    """A dictionary serialized without ``drop`` and without its closing ">>"."""
+    from pypdf.generic import DictionaryObject
+
+    data = _serialize(DictionaryObject({key: value for key, value in obj.items() if key not in drop}))
+    assert data.endswith(b">>")
+    return data[:-2]
+
+
+def _ref(indirect) -> tuple[int, int]:
+    return indirect.idnum, indirect.generation
+
+
+@dataclass
+class TemplatePage:
+    ref: tuple[int, int]
+    prefix: bytes  # page dictionary without /Contents, the overlay font added to /Resources
+    contents: bytes  # the original content stream references, space separated
+
+
+@dataclass
+class FormWidget:
+    ref: tuple[int, int]
+    prefix: bytes  # without /AS
+    on_state: bytes
+
+
+@dataclass
+class FormField:
+    name: str
+    kind: str  # text, checkbox
+    ref: tuple[int, int]
+    prefix: bytes  # without /V (and /AS when the field is its own widget)
+    widgets: list[FormWidget] = field(default_factory=list)
+
+
+@dataclass
+class RenderResult:
+    data: bytes
+    fill_mode: str  # acroform, overlay, mixed
+    acroform_filled: int
+    overlay_filled: int
+    layout_warnings: list[dict[str, object]]
+
+
+class PdfTemplate:
+    """A template parsed once and filled any number of times."""
+
+    def __init__(self, data: bytes) -> None:
+        pypdf = _require_pypdf()
+        from pypdf.generic import DictionaryObject, IndirectObject, NameObject
+
+        reader = pypdf.PdfReader(io.BytesIO(data))
+        if reader.is_encrypted:
+            raise ValueError("encrypted PDF templates are not supported")
+        self.data = data if data.endswith(b"\n") else data + b"\n"
+        startxref = re.search(rb"startxref\s+(\d+)\s+%%EOF\s*$", data[-1024:])
+        if startxref is None:
+            raise ValueError("template has no trailing startxref")
+        self.prev_xref = int(startxref.group(1))
+        trailer = reader.trailer
+        self.size = int(trailer["/Size"])
+        self.font_ref = (self.size, 0)
+        self.trailer_entries = b"/Root " + _serialize(trailer.raw_get("/Root"))
+        for key in ("/Info", "/ID"):
+            if key in trailer:
+                self.trailer_entries += key.encode("ascii") + b" " + _serialize(trailer.raw_get(key))
+
+        root_ref = trailer.raw_get("/Root")
+        root = root_ref.get_object()
+        pages_ref = root.raw_get("/Pages")
+        pages_root = pages_ref.get_object()
+        self.pages_root_ref = _ref(pages_ref)
+        self.pages_root_prefix = _dict_prefix(pages_root, {"/Kids", "/Count"})
+        self.pages_root_kids = b" ".join(_serialize(kid) for kid in pages_root.raw_get("/Kids"))
+        self.pages_root_count = int(pages_root["/Count"])
+        first_box = reader.pages[0].mediabox
+        self.media_box = (float(first_box.left), float(first_box.bottom), float(first_box.right), float(first_box.top))
+
+        font = IndirectObject(self.size, 0, reader)
+        self.pages: list[TemplatePage] = []
+        for page in reader.pages:
+            resources = DictionaryObject(page.get("/Resources", DictionaryObject()))
+            fonts = DictionaryObject(resources.get("/Font", DictionaryObject()))
+            fonts[NameObject(FONT_NAME)] = font
+            resources[NameObject("/Font")] = fonts
+            page_dict = DictionaryObject(page)
+            page_dict[NameObject("/Resources")] = resources
+            contents = page.raw_get("/Contents") if "/Contents" in page else None
+            if contents is None:
+                refs = b""
+            elif isinstance(contents, IndirectObject) and not isinstance(contents.get_object(), list):
+                refs = _serialize(contents)
+            else:
+                refs = b" ".join(_serialize(item) for item in contents.get_object())
+            self.pages.append(TemplatePage(_ref(page.indirect_reference), _dict_prefix(page_dict, {"/Contents"}), refs))
+
+        self.fields: dict[str, FormField] = {}
+        self.need_appearances: tuple[tuple[int, int], bytes] | None = None
+        if "/AcroForm" in root:
+            acroform_ref = root.raw_get("/AcroForm")
+            acroform = acroform_ref.get_object()
+            self._collect_fields(acroform.get("/Fields", []), "", None, 0)
+            patched = _dict_prefix(acroform, {"/NeedAppearances"}) + b"/NeedAppearances true>>"
+            if isinstance(acroform_ref, IndirectObject):
+                self.need_appearances = (_ref(acroform_ref), patched)
+            else:
+                self.need_appearances = (_ref(root_ref), _dict_prefix(root, {"/AcroForm"}) + b"/AcroForm " + patched + b">>")
+
+    def _collect_fields(self, refs, parent: str, field_type: str | None, flags: int) -> None:
+        for ref in refs:
+            node = ref.get_object()
+            partial = node.get("/T")
+            name = f"{parent}.{partial}" if parent and partial else str(partial or parent)
+            node_type = node.get("/FT", field_type)
+            node_flags = int(node.get("/Ff", flags))
+            kids = node.get("/Kids", [])
+            if any("/T" in kid.get_object() for kid in kids):
+                self._collect_fields(kids, name, node_type, node_flags)
+                continue
+            if node_type == "/Tx":
+                kind = "text"
+            elif node_type == "/Btn" and not node_flags & (_FIELD_FLAG_RADIO | _FIELD_FLAG_PUSHBUTTON):
+                kind = "checkbox"
+            else:
+                continue
+            widgets = [] if kids else [ref]
+            widgets.extend(kids)
+            form_field = FormField(name, kind, _ref(ref), _dict_prefix(node, {"/V", "/AS"} if not kids else {"/V"}))
+            if kind == "checkbox":
+                for widget_ref in widgets:
+                    widget = widget_ref.get_object()
+                    states = [state for state in widget.get("/AP", {}).get("/N", {}) if state != "/Off"]
+                    on_state = states[0] if states else "/Yes"
+                    prefix = form_field.prefix if widget_ref is ref else _dict_prefix(widget, {"/AS"})
+                    form_field.widgets.append(FormWidget(_ref(widget_ref), prefix, on_state.encode("ascii")))
+            self.fields.setdefault(name, form_field)
+
+    @classmethod
+    def from_path(cls, path: Path) -> "PdfTemplate":
+        return cls(path.read_bytes())
+
+    def render(self, boxes: list[OverlayBox], values: dict[str, object], continuation: bool = False) -> RenderResult:
+        """Fill one member's values. Non-string values are treated as empty, like the edge function.
+
+        With ``continuation``, text past a box's max_lines goes onto pages appended
+        after the template, and its warning records where ("continuation_page").
+        """
+        objects: dict[tuple[int, int], bytes] = {}
+        acroform_keys: set[str] = set()
+        acroform_filled = 0
+        if self.fields:
+            for box in boxes:
+                raw = values.get(box.placeholder_key)
+                raw = raw if isinstance(raw, str) else ""
+                match = next((self.fields[name] for name in box.form_field_candidates if name in self.fields), None)
+                if match is None:
+                    continue
+                if match.kind == "checkbox":
+                    if is_checkbox_not_applicable(raw):
+                        self._set_checkbox(objects, match, False)
+                        continue
+                    checked = resolve_checkbox_value(raw)
+                    if checked is None:
+                        continue
+                    self._set_checkbox(objects, match, checked)
+                else:
+                    value = sanitize_pdf_text(raw)
+                    if not value:
+                        continue
+                    objects[match.ref] = match.prefix + b"/V " + pdf_text_string(value) + b">>"
+                acroform_filled += 1
+                acroform_keys.add(box.placeholder_key)
+            if objects and self.need_appearances is not None:
+                ref, body = self.need_appearances
+                objects[ref] = body
+
+        overlay: dict[int, list[bytes]] = {}
+        carried: list[tuple[OverlayBox, str, dict[str, object]]] = []
+        warnings: list[dict[str, object]] = []
+        overlay_filled = 0
+        page_count = len(self.pages)
+        for box in boxes:
+            if box.placeholder_key in acroform_keys:
+                continue
+            raw = values.get(box.placeholder_key)
+            value = sanitize_pdf_text(raw) if isinstance(raw, str) else ""
+            if not value or not 1 <= box.page <= page_count:
+                continue
+            breaks, warning = box.layout(value)
+            if warning is not None:
+                warnings.append(warning)
+                if continuation:
+                    carried.append((box, breaks.overflow_text(box.max_lines), warning))
+            if breaks.lines:
+                overlay_filled += 1
+                overlay.setdefault(box.page - 1, []).append(box.text_operators(breaks.lines[: box.max_lines]))
+
+        new_objects: list[tuple[tuple[int, int], bytes]] = []
+        next_id = self.size + 1
+        if overlay or carried:
+            new_objects.append((self.font_ref, FONT_OBJECT))
+        if overlay:
+            q_id = next_id
+            new_objects.append(((q_id, 0), _stream(b"q\n")))
+            next_id += 1
+            for page_index, operators in sorted(overlay.items()):
+                page = self.pages[page_index]
+                content = b"Q\n" + TEXT_COLOR + b"\n" + b"".join(operators)
+                new_objects.append(((next_id, 0), _stream(content)))
+                objects[page.ref] = b"%s/Contents [%d 0 R %s %d 0 R]>>" % (page.prefix, q_id, page.contents, next_id)
+                next_id += 1
+        if carried:
+            page_refs: list[bytes] = []
+            for content in self._continuation_pages(carried):
+                new_objects.append(((next_id, 0), _stream(content)))
+                new_objects.append(((next_id + 1, 0), self._continuation_page(next_id)))
+                page_refs.append(b"%d 0 R" % (next_id + 1))
+                next_id += 2
+            root_ref = self.pages_root_ref
+            kids = b" ".join([self.pages_root_kids, *page_refs])
+            count = self.pages_root_count + len(page_refs)
+            objects[root_ref] = b"%s/Kids [%s]/Count %d>>" % (self.pages_root_prefix, kids, count)
+
+        if acroform_filled and (overlay_filled or carried):
+            fill_mode = "mixed"
+        elif acroform_filled:
+            fill_mode = "acroform"
+        else:
+            fill_mode = "overlay"
+        data = self._incremental_update(list(objects.items()) + new_objects)
+        return RenderResult(data, fill_mode, acroform_filled, overlay_filled, warnings)
+
+    def _continuation_page(self, content_id: int) -> bytes:
+        return b"<</Type/Page/Parent %d %d R/MediaBox [%s]/Resources <</Font <<%s %d 0 R>>>>/Contents %d 0 R>>" % (
+            *self.pages_root_ref,
+            b" ".join(map(pdf_number, self.media_box)),
+            FONT_NAME.encode("ascii"),
+            self.font_ref[0],
+            content_id,
+        )
+
+    def _continuation_pages(self, carried: list[tuple[OverlayBox, str, dict[str, object]]]) -> list[bytes]:
+        """Content streams for the carried-over text, one per page; sets each warning's continuation_page."""
+        left, bottom, right, top = self.media_box
+        x = left + CONTINUATION_MARGIN
+        text_width = right - left - 2 * CONTINUATION_MARGIN
+        heading_layout = text_layout(FONT, CONTINUATION_HEADING_SIZE)
+        body_layout = text_layout(FONT, CONTINUATION_FONT_SIZE)
+        heading_font = b"BT %s %d Tf " % (FONT_NAME.encode("ascii"), CONTINUATION_HEADING_SIZE)
+        body_font = b"BT %s %d Tf " % (FONT_NAME.encode("ascii"), CONTINUATION_FONT_SIZE)
+        first_y = top - CONTINUATION_MARGIN - CONTINUATION_HEADING_SIZE
+        last_y = bottom + CONTINUATION_MARGIN
+
+        pages: list[bytes] = []
+        operators: list[bytes] = [TEXT_COLOR + b"\n"]
+        y = first_y
+        for box, text, warning in carried:
+            heading = heading_layout.break_lines(f"{box.placeholder_key} (continued from page {box.page})", text_width)
+            lines = body_layout.break_lines(text, text_width).lines
+            # keep a heading together with the first line under it
+            if len(operators) > 1 and y - len(heading.lines) * (CONTINUATION_LINE_HEIGHT + 2) < last_y:
+                pages.append(b"".join(operators))
+                operators = [TEXT_COLOR + b"\n"]
+                y = first_y
+            warning["continuation_page"] = len(self.pages) + len(pages) + 1
+            for line in heading.lines:
+                operators.append(b"%s%s %s Td %s Tj ET\n" % (heading_font, pdf_number(x), pdf_number(y), pdf_literal(line)))
+                y -= CONTINUATION_LINE_HEIGHT + 2
+            for line in lines:
+                if y < last_y:
+                    pages.append(b"".join(operators))
+                    operators = [TEXT_COLOR + b"\n"]
+                    y = first_y
+                operators.append(b"%s%s %s Td %s Tj ET\n" % (body_font, pdf_number(x), pdf_number(y), pdf_literal(line)))
+                y -= CONTINUATION_LINE_HEIGHT
+            y -= CONTINUATION_LINE_HEIGHT
+        if len(operators) > 1:
+            pages.append(b"".join(operators))
+        return pages
+
+    @staticmethod
+    def _set_checkbox(objects: dict[tuple[int, int], bytes], form_field: FormField, checked: bool) -> None:
+        for widget in form_field.widgets:
+            state = widget.on_state if checked else b"/Off"
+            if widget.ref == form_field.ref:
+                objects[widget.ref] = widget.prefix + b"/V " + state + b"/AS " + state + b">>"
+            else:
+                objects[widget.ref] = widget.prefix + b"/AS " + state + b">>"
+        if form_field.ref not in objects:
+            state = form_field.widgets[0].on_state if checked and form_field.widgets else b"/Off"
+            objects[form_field.ref] = form_field.prefix + b"/V " + state + b">>"
+
+    def _incremental_update(self, objects: list[tuple[tuple[int, int], bytes]]) -> bytes:
+        if not objects:
+            return self.data
+        chunks = [self.data]
+        offset = len(self.data)
+        offsets: dict[int, tuple[int, int]] = {}
+        for (number, generation), body in objects:
+            chunk = b"%d %d obj\n%s\nendobj\n" % (number, generation, body)
+            offsets[number] = (offset, generation)
+            chunks.append(chunk)
+            offset += len(chunk)
+
+        # the free-list head keeps the section zero-indexed for strict readers
+        xref = [b"xref\n0 1\n0000000000 65535 f\r\n"]
+        numbers = sorted(offsets)
+        start = 0
+        while start < len(numbers):
+            end = start + 1
+            while end < len(numbers) and numbers[end] == numbers[end - 1] + 1:
+                end += 1
+            xref.append(b"%d %d\n" % (numbers[start], end - start))
+            xref.extend(b"%010d %05d n\r\n" % offsets[number] for number in numbers[start:end])
+            start = end
+        size = max(self.size, numbers[-1] + 1)
+        xref.append(b"trailer\n<</Size %d %s/Prev %d>>\nstartxref\n%d\n%%%%EOF\n" % (size, self.trailer_entries, self.prev_xref, offset))
+        chunks.extend(xref)
+        return b"".join(chunks)
+
+
+def _stream(content: bytes) -> bytes:
+    return b"<</Length %d>>\nstream\n%s\nendstream" % (len(content), content)
@@ -0,0 +1,91 @@
+import argparse
+import json
+import re
+import time
+from pathlib import Path
+
+from pdf_overlay import PdfTemplate, load_render_map
+
+
+# Fill a batch of member records into the CalOptima FBA PDF (or any template
+# with a render map). Records are a JSON array or JSON Lines. Each record is
+# either a placeholder -> value object or an object with a "field_values" one,
+# the edge function's request shape. The map and template are parsed once for
+# the whole batch. render_report.json lists each document's fill mode and
+# overflow warnings. --continuation carries overflowing text onto pages after
+# the template instead of clipping it.
+
+
+TEMPLATE_PATH = Path("CalOptima Health FBA Template (2).pdf")
+RENDER_MAP_PATH = Path("docs/fill_docs/caloptima_fba_pdf_render_map.json")
+OUT_DIR = Path("tmp/fba_pdfs")
+REPORT_NAME = "render_report.json"
+_UNSAFE_NAME_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def load_records(path: Path) -> list[dict[str, object]]:
+    text = path.read_text(encoding="utf-8")
+    if text.lstrip().startswith("["):
+        records = json.loads(text)
+    else:
+        records = [json.loads(line) for line in text.splitlines() if line.strip()]
+    for index, record in enumerate(records):
+        if not isinstance(record, dict):
+            raise ValueError(f"{path}: record {index} is not an object")
+    return records
+
+
+def output_name(record: dict[str, object], index: int, id_key: str, suffix: str = ".pdf") -> str:
+    record_id = _UNSAFE_NAME_RE.sub("_", str(record.get(id_key) or "")).strip("._")
+    return f"{record_id or f'member_{index:04d}'}{suffix}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Render a batch of member records into a PDF template from its render map.")
+    parser.add_argument("records", nargs="+", type=Path, help="JSON array or JSON Lines files of member records")
+    parser.add_argument("--template", type=Path, default=TEMPLATE_PATH)
+    parser.add_argument("--render-map", type=Path, default=RENDER_MAP_PATH)
+    parser.add_argument("--out-dir", type=Path, default=OUT_DIR)
+    parser.add_argument("--id-key", default="id", help="record field used to name the output file")
+    parser.add_argument("--continuation", action="store_true", help="carry text that overflows a box onto continuation pages")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    boxes = load_render_map(args.render_map)
+    template = PdfTemplate.from_path(args.template)
+    setup_seconds = time.perf_counter() - started
+    records = [record for path in args.records for record in load_records(path)]
+
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    report: list[dict[str, object]] = []
+    modes: dict[str, int] = {}
+    warning_count = 0
+    started = time.perf_counter()
+    for index, record in enumerate(records):
+        values = record.get("field_values", record)
+        result = template.render(boxes, values if isinstance(values, dict) else {}, args.continuation)
+        name = output_name(record, index, args.id_key)
+        (args.out_dir / name).write_bytes(result.data)
+        modes[result.fill_mode] = modes.get(result.fill_mode, 0) + 1
+        warning_count += len(result.layout_warnings)
+        report.append(
+            {
+                "file": name,
+                "fill_mode": result.fill_mode,
+                "acroform_filled": result.acroform_filled,
+                "overlay_filled": result.overlay_filled,
+                "layout_warnings": result.layout_warnings,
+            }
+        )
+    render_seconds = time.perf_counter() - started
+    (args.out_dir / REPORT_NAME).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    rate = len(records) / render_seconds if render_seconds else 0.0
+    print(f"Template: {args.template} ({len(template.pages)} pages, {len(template.fields)} form fields, {len(boxes)} boxes)")
+    print(f"Rendered {len(records)} documents to {args.out_dir} ({', '.join(f'{mode}: {count}' for mode, count in sorted(modes.items()))})")
+    print(f"Overflow warnings: {warning_count} (see {args.out_dir / REPORT_NAME})")
+    print(f"Setup {setup_seconds * 1000:.1f}ms, render {render_seconds:.2f}s, {rate:.1f} docs/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import argparse
+import time
+from pathlib import Path
+
+import extract_docx_fields
+import extract_docx_labels
+import extract_form_fields_from_structured
+import generate_iehp_mapping
+from docx_engine import default_workers
+from stage_cache import StageCache
+
+
+# Runs extract_docx_fields -> extract_docx_labels -> extract_form_fields_from_structured
+# -> generate_iehp_mapping against one shared content-addressed cache. A stage
+# whose inputs (templates or upstream artifacts) and tool source are unchanged
+# restores its outputs instead of recomputing them.
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the IEHP template extraction chain with cached stages.")
+    parser.add_argument(
+        "docx", nargs="*", default=extract_docx_fields.DOCX_FILES, help="templates, directories or globs (default: the IEHP ER / FBA / PR set)"
+    )
+    parser.add_argument("--force", action="store_true", help="recompute every stage (the cache is refreshed)")
+    parser.add_argument("--workers", type=int, default=default_workers(), help="extract templates in N processes")
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    out_dir = Path("tmp/docx_extracted")
+    cache = StageCache(out_dir / ".cache", refresh=args.force)
+    stages = [
+        ("extract_docx_fields", lambda: extract_docx_fields.run(args.docx, out_dir, cache, args.workers)),
+        ("extract_docx_labels", lambda: extract_docx_labels.run(args.docx, out_dir, cache, args.workers)),
+        ("extract_form_fields_from_structured", lambda: extract_form_fields_from_structured.run(cache)),
+        ("generate_iehp_mapping", lambda: generate_iehp_mapping.run(cache)),
+    ]
+
+    started = time.perf_counter()
+    for name, stage in stages:
+        hits, misses = cache.hits, cache.misses
+        stage_started = time.perf_counter()
+        stage()
+        print(
+            f"{name:<38} {time.perf_counter() - stage_started:7.3f}s  "
+            f"reused {cache.hits - hits}, rebuilt {cache.misses - misses}"
+        )
+    print(f"chain: {time.perf_counter() - started:.3f}s ({cache.summary()})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import shutil
+from pathlib import Path
+from typing import Iterable
+
+
+# Content-addressed artifact cache for the docs/fill_docs/tools chain.
+#
+# A stage's key is the SHA-256 of three things: the stage name, the content
+# hashes of its inputs (templates or upstream artifacts), and the source of the
+# tool files that produce it (the tool version). The artifacts are stored under
+# that key, so:
+# - a rerun with nothing changed restores the outputs without recomputing
+# - editing a tool invalidates only the stages built from it
+# - switching between template versions (the layout manifests record the same
+#   ``source_sha256``) finds each version's artifacts already built
+#
+# Like a build system, each stage consumes its upstream stage's outputs by
+# content. When an upstream stage reruns but produces identical bytes, the
+# stages downstream of it still hit.
+
+
+CACHE_DIR = Path("tmp/docx_extracted/.cache")
+TOOLS_DIR = Path(__file__).resolve().parent
+
+
+def sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as src:
+        for chunk in iter(lambda: src.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def tool_version(*tool_files: str) -> str:
+    """Hash of the named tool sources (relative to this directory)."""
+    digest = hashlib.sha256()
+    for name in tool_files:
+        digest.update(name.encode("utf-8"))
+        digest.update((TOOLS_DIR / name).read_bytes())
+    return digest.hexdigest()
+
+
+def stage_key(stage: str, version: str, input_hashes: Iterable[str]) -> str:
+    digest = hashlib.sha256()
+    for piece in (stage, version, *input_hashes):
+        digest.update(piece.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class StageCache:
+    META_NAME = "meta.json"
+
+    def __init__(self, root: Path = CACHE_DIR, refresh: bool = False) -> None:
+        """``refresh`` recomputes every stage (and re-stores the results) instead of restoring."""
+        self.root = root
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_dir(self, stage: str, key: str) -> Path:
+        return self.root / stage / key[:2] / key
+
+    def restore(self, stage: str, key: str, outputs: list[Path]) -> object | None:
+        """Put the cached artifacts for ``key`` at ``outputs`` and return the stored metadata; None on a miss."""
+        entry = self._entry_dir(stage, key)
+        meta_path = entry / self.META_NAME
+        cached = [entry / output.name for output in outputs]
+        if self.refresh or not meta_path.exists() or not all(path.exists() for path in cached):
+            self.misses += 1
+            return None
+        for source, output in zip(cached, outputs):
+            # leave an identical output untouched so its mtime stays put
+            if output.exists() and output.stat().st_size == source.stat().st_size and sha256_file(output) == sha256_file(source):
+                continue
+            output.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(source, output)
+        self.hits += 1
+        return json.loads(meta_path.read_text(encoding="utf-8"))
+
+    def store(self, stage: str, key: str, outputs: list[Path], meta: object = None) -> None:
+        """Record ``outputs`` (already written) and a JSON-able ``meta`` under ``key``."""
+        entry = self._entry_dir(stage, key)
+        tmp_entry = entry.with_name(f"{entry.name}.tmp")
+        shutil.rmtree(tmp_entry, ignore_errors=True)
+        tmp_entry.mkdir(parents=True)
+        for output in outputs:
+            shutil.copyfile(output, tmp_entry / output.name)
+        # written last: an entry without meta.json is incomplete and never restored
+        (tmp_entry / self.META_NAME).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        shutil.rmtree(entry, ignore_errors=True)
+        tmp_entry.replace(entry)
+
+    def summary(self) -> str:
+        return f"cache hits: {self.hits}, misses: {self.misses}"
@@ -0,0 +1,170 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+
+# Greedy line breaking for overlay boxes, with the same rules as
+# wrapOverlayText (supabase/functions/generate-assessment-plan-pdf):
+# - paragraphs split on newlines, and empty ones are dropped
+# - words split on whitespace and re-joined with single spaces
+# - a word wider than the box is broken by character
+# - words are added to a line while the line still fits
+#
+# Measuring is the hot loop of an overlay fill. The TS version measures every
+# candidate line again, one word longer each time. Here each word is measured
+# once, from a per-font array of glyph advance widths (1/1000 em). The result
+# goes into a per-font memo, so the recurring words of clinical narratives cost
+# a dict hit. A line's width is then a running sum, and one pass over the text
+# places every word. Widths are kept in font units, so the memo is shared by
+# every size of a font. A TextLayout (one per font and size) only converts the
+# box width.
+#
+# break_lines() also returns each line's span in the source text. The text
+# past a box's last line is therefore one slice, ready for a continuation page.
+
+
+# Helvetica advance widths (1/1000 em) for WinAnsi 0x20-0x7E and 0xA0-0xFF
+HELVETICA_ASCII_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+HELVETICA_LATIN1_WIDTHS = [
+    278, 333, 556, 556, 556, 556, 260, 556, 333, 737, 370, 556, 584, 333, 737, 333,
+    400, 584, 333, 333, 333, 556, 537, 278, 333, 333, 365, 556, 834, 834, 834, 611,
+    667, 667, 667, 667, 667, 667, 1000, 722, 667, 667, 667, 667, 278, 278, 278, 278,
+    722, 722, 778, 778, 778, 778, 778, 584, 778, 722, 722, 722, 722, 667, 667, 611,
+    556, 556, 556, 556, 556, 556, 889, 500, 556, 556, 556, 556, 278, 278, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 584, 611, 556, 556, 556, 556, 500, 556, 500,
+]
+DEFAULT_GLYPH_WIDTH = 556
+HELVETICA_WIDTHS = [DEFAULT_GLYPH_WIDTH] * 256
+HELVETICA_WIDTHS[0x20:0x7F] = HELVETICA_ASCII_WIDTHS
+HELVETICA_WIDTHS[0xA0:0x100] = HELVETICA_LATIN1_WIDTHS
+
+FONT_WIDTHS: dict[str, list[int]] = {"Helvetica": HELVETICA_WIDTHS}
+WORD_CACHE_LIMIT = 1 << 16
+
+_TOKEN_RE = re.compile(r"\n|\S+")
+
+
+class FontMetrics:
+    def __init__(self, name: str, widths: list[int]) -> None:
+        self.name = name
+        self.widths = widths
+        self.space = widths[0x20]
+        self.word_units: dict[str, int] = {}
+
+    def measure(self, text: str) -> int:
+        """Width in 1/1000 em; characters outside WinAnsi count as "?"."""
+        return sum(map(self.widths.__getitem__, text.encode("latin-1", "replace")))
+
+    def measure_word(self, word: str) -> int:
+        units = self.word_units.get(word)
+        if units is None:
+            if len(self.word_units) >= WORD_CACHE_LIMIT:
+                self.word_units.clear()
+            units = self.word_units[word] = self.measure(word)
+        return units
+
+
+@lru_cache(maxsize=None)
+def font_metrics(font: str) -> FontMetrics:
+    if font not in FONT_WIDTHS:
+        raise ValueError(f"no glyph widths for font {font!r}; known: {', '.join(FONT_WIDTHS)}")
+    return FontMetrics(font, FONT_WIDTHS[font])
+
+
+@dataclass(frozen=True)
+class LineBreaks:
+    text: str
+    lines: list[str]
+    spans: list[tuple[int, int]]  # [start, end) of each line in text
+
+    def overflow_span(self, max_lines: int) -> tuple[int, int] | None:
+        """The source text that does not fit in max_lines, if any."""
+        if len(self.lines) <= max_lines:
+            return None
+        return self.spans[max_lines][0], len(self.text)
+
+    def overflow_text(self, max_lines: int) -> str:
+        span = self.overflow_span(max_lines)
+        return self.text[span[0] : span[1]] if span else ""
+
+
+class TextLayout:
+    def __init__(self, metrics: FontMetrics, size: float) -> None:
+        self.metrics = metrics
+        self.size = size
+        self.units_per_point = 1000 / size
+
+    def width(self, text: str) -> float:
+        """Width in points."""
+        return self.metrics.measure(text) / self.units_per_point
+
+    def break_lines(self, text: str, max_width: float) -> LineBreaks:
+        max_units = max_width * self.units_per_point
+        space = self.metrics.space
+        word_units = self.metrics.word_units
+        measure_word = self.metrics.measure_word
+        lines: list[str] = []
+        spans: list[tuple[int, int]] = []
+        pieces: list[str] = []
+        line_units = line_start = line_end = 0
+
+        for match in _TOKEN_RE.finditer(text):
+            word = match.group()
+            if word == "\n":
+                if pieces:
+                    lines.append("".join(pieces))
+                    spans.append((line_start, line_end))
+                    pieces = []
+                continue
+            units = word_units.get(word)
+            if units is None:
+                units = measure_word(word)
+            if units <= max_units:
+                chunks = [(word, match.start(), units, False)]
+            else:
+                chunks = self._split_word(word, match.start(), max_units)
+            for chunk, start, chunk_units, continues in chunks:
+                if pieces:
+                    gap = 0 if continues else space
+                    if line_units + gap + chunk_units <= max_units:
+                        if not continues:
+                            pieces.append(" ")
+                        pieces.append(chunk)
+                        line_units += gap + chunk_units
+                        line_end = start + len(chunk)
+                        continue
+                    lines.append("".join(pieces))
+                    spans.append((line_start, line_end))
+                pieces = [chunk]
+                line_units = chunk_units
+                line_start, line_end = start, start + len(chunk)
+
+        if pieces:
+            lines.append("".join(pieces))
+            spans.append((line_start, line_end))
+        return LineBreaks(text, lines, spans)
+
+    def _split_word(self, word: str, offset: int, max_units: float) -> list[tuple[str, int, int, bool]]:
+        widths = self.metrics.widths
+        chunks: list[tuple[str, int, int, bool]] = []
+        start = current = 0
+        for index, byte in enumerate(word.encode("latin-1", "replace")):
+            width = widths[byte]
+            if index > start and current + width > max_units:
+                chunks.append((word[start:index], offset + start, current, bool(chunks)))
+                start, current = index, 0
+            current += width
+        chunks.append((word[start:], offset + start, current, bool(chunks)))
+        return chunks
+
+
+@lru_cache(maxsize=None)
+def text_layout(font: str, size: float) -> TextLayout:
+    return TextLayout(font_metrics(font), size)
@@ -0,0 +1,113 @@
+import argparse
+import json
+import re
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+
+# Finds every placeholder token and label kind in a template part, with offsets, in one call.
+#
+# Raw XML: curly / angle / bracket placeholders, plus content-control tags and
+# aliases. Each kind gets its own finditer, and the matches are merged by
+# offset. Every one of these patterns starts with a literal, so CPython can
+# jump straight to the candidates with its fast substring search. A single
+# combined alternation loses that and measured about 2x slower on the IEHP
+# templates (see bench_token_scanner.py).
+#
+# Extracted text: colon labels and underscore blanks in one pass. LABEL_RE's
+# repeated class excludes ":", so a label can only end at a colon directly after
+# a run of class characters. The scan jumps from colon to colon and walks back
+# at most 61 characters. A findall instead retries the 60-character
+# backtracking at every letter.
+
+
+TOKEN_PATTERNS: dict[str, re.Pattern[str]] = {
+    "curly": re.compile(r"\{\{[^}]+\}\}"),
+    "angle": re.compile(r"«[^»]+»"),
+    "bracket": re.compile(r"\[[A-Z0-9_ -]{2,}\]"),
+}
+
+TAG_RE = re.compile(r"<w:tag[^>]*w:val=\"([^\"]+)\"")
+ALIAS_RE = re.compile(r"<w:alias[^>]*w:val=\"([^\"]+)\"")
+
+# colon labels like "First Name:" "IEHP Member ID#:" etc
+LABEL_RE = re.compile(r"([A-Za-z][A-Za-z0-9 /()#\-]{1,60}):")
+
+# underscore blanks
+UNDERSCORE_RE = re.compile(r"_{5,}")
+
+
+XML_KINDS: dict[str, re.Pattern[str]] = {**TOKEN_PATTERNS, "tag": TAG_RE, "alias": ALIAS_RE}
+TEXT_KINDS = ("label", "underscore")
+
+_TEXT_TRIGGER_RE = re.compile(r":|_{5,}")
+_LABEL_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789 /()#-")
+_LABEL_STARTS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz")
+_LABEL_MAX = 61  # the first letter plus {1,60}
+
+
+@dataclass(frozen=True)
+class Token:
+    kind: str
+    start: int
+    end: int
+    value: str
+
+
+def scan_xml(xml: str) -> list[Token]:
+    """Placeholders, tags and aliases in document order; a tag/alias value is its w:val."""
+    tokens: list[Token] = []
+    for kind, pattern in XML_KINDS.items():
+        group = 1 if pattern.groups else 0
+        tokens.extend(
+            Token(kind, match.start(group), match.end(group), match.group(group)) for match in pattern.finditer(xml)
+        )
+    tokens.sort(key=lambda token: token.start)
+    return tokens
+
+
+def scan_text(text: str) -> list[Token]:
+    """Colon labels (without the colon) and underscore blanks in text order."""
+    tokens: list[Token] = []
+    for trigger in _TEXT_TRIGGER_RE.finditer(text):
+        colon = trigger.start()
+        if text[colon] == "_":
+            tokens.append(Token("underscore", colon, trigger.end(), trigger.group()))
+            continue
+        floor = max(0, colon - _LABEL_MAX)
+        start = colon
+        while start > floor and text[start - 1] in _LABEL_CHARS:
+            start -= 1
+        while start < colon - 1 and text[start] not in _LABEL_STARTS:
+            start += 1
+        if start < colon - 1:
+            tokens.append(Token("label", start, colon, text[start:colon]))
+    return tokens
+
+
+def values_by_kind(tokens: list[Token], kinds: tuple[str, ...] | list[str]) -> dict[str, list[str]]:
+    grouped: dict[str, list[str]] = {kind: [] for kind in kinds}
+    for token in tokens:
+        if token.kind in grouped:
+            grouped[token.kind].append(token.value)
+    return grouped
+
+
+def main() -> None:
+    from docx_engine import BODY_PART_RE, read_docx
+
+    parser = argparse.ArgumentParser(description="List every placeholder, tag, alias, label and blank in a template, with offsets.")
+    parser.add_argument("docx", type=Path)
+    args = parser.parse_args()
+
+    report: dict[str, object] = {}
+    for part in read_docx(args.docx, BODY_PART_RE.match).parts:
+        report[part.name] = {
+            "xml": [asdict(token) for token in scan_xml(part.xml)],
+            "text": [asdict(token) for token in scan_text(part.text)],
+        }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""Split normalized authorization records into upload batches, with a resumable manifest.
+
+Batches are capped by record count and by serialized size, so each one fits
+under RPC / edge-function payload limits. Each record is serialized once, and
+the bytes go straight into the open batch file and its running SHA-256. The
+size is known before the record is written, so a batch closes before it would
+cross the cap.
+
+``manifest.json`` lists every batch's file, record range (``start``
+inclusive, ``end`` exclusive), size and checksum. It is written after the
+last batch, so an interrupted split leaves no manifest. Uploaders use
+``load_manifest`` / ``verify_batch`` to skip finished batches and to detect
+edited ones.
+
+Usage:
+    python scripts/auth_batches.py data/client_authorizations.json \\
+        [--out-dir data/auth_batches] [--format json|jsonl] [--max-records 500] [--max-bytes 1048576]
+"""
+
+import argparse
+import hashlib
+import json
+import math
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional
+
+OUT_DIR = Path("data/auth_batches")
+MANIFEST_NAME = "manifest.json"
+BATCH_FORMATS = ("json", "jsonl")
+DEFAULT_MAX_RECORDS = 500
+# Well under the request body limits of the edge functions and PostgREST RPCs.
+DEFAULT_MAX_BYTES = 1 << 20
+
+
+@dataclass
+class BatchEntry:
+    file: str
+    start: int
+    end: int
+    bytes: int
+    sha256: str
+
+    @property
+    def records(self) -> int:
+        return self.end - self.start
+
+
+def iter_records(path: Path) -> Iterator[Dict[str, object]]:
+    """Records from a JSON array file or a JSON Lines file (read line by line)."""
+    with path.open("r", encoding="utf-8") as src:
+        head = src.read(1)
+        while head and head.isspace():
+            head = src.read(1)
+        if head == "[":
+            src.seek(0)
+            yield from json.load(src)
+            return
+        src.seek(0)
+        for line in src:
+            if line.strip():
+                yield json.loads(line)
+
+
+def encode_record(record: Dict[str, object]) -> bytes:
+    return json.dumps(record, ensure_ascii=True, separators=(",", ":")).encode("ascii")
+
+
+class _BatchWriter:
+    """One open batch file; framing bytes are counted and hashed like the records."""
+
+    def __init__(self, path: Path, fmt: str, start: int) -> None:
+        self.path = path
+        self.start = start
+        self.count = 0
+        self.size = 0
+        self._jsonl = fmt == "jsonl"
+        self._digest = hashlib.sha256()
+        self._dst: BinaryIO = path.open("wb")
+        if not self._jsonl:
+            self._write(b"[")
+
+    def _write(self, data: bytes) -> None:
+        self._dst.write(data)
+        self._digest.update(data)
+        self.size += len(data)
+
+    def cost(self, encoded: bytes) -> int:
+        """Bytes the batch grows by when ``encoded`` is added, closing bracket included."""
+        if self._jsonl:
+            return len(encoded) + 1
+        return len(encoded) + (1 if self.count else 0) + 1
+
+    def add(self, encoded: bytes) -> None:
+        if self._jsonl:
+            self._write(encoded)
+            self._write(b"\n")
+        else:
+            if self.count:
+                self._write(b",")
+            self._write(encoded)
+        self.count += 1
+
+    def close(self) -> BatchEntry:
+        if not self._jsonl:
+            self._write(b"]")
+        self._dst.close()
+        return BatchEntry(self.path.name, self.start, self.start + self.count, self.size, self._digest.hexdigest())
+
+
+def split_batches(
+    records: Iterator[Dict[str, object]],
+    out_dir: Path,
+    fmt: str = "json",
+    max_records: int = DEFAULT_MAX_RECORDS,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> List[BatchEntry]:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    entries: List[BatchEntry] = []
+    writer: Optional[_BatchWriter] = None
+    for index, record in enumerate(records):
+        encoded = encode_record(record)
+        if writer is not None and (
+            writer.count >= max_records or writer.size + writer.cost(encoded) > max_bytes
+        ):
+            entries.append(writer.close())
+            writer = None
+        if writer is None:
+            name = f"batch-{len(entries) + 1:04d}.{fmt}"
+            writer = _BatchWriter(out_dir / name, fmt, index)
+            if writer.size + writer.cost(encoded) > max_bytes:
+                writer.close()
+                (out_dir / name).unlink()
+                raise ValueError(f"record {index} alone is {len(encoded)} bytes, over --max-bytes {max_bytes}")
+        writer.add(encoded)
+    if writer is not None:
+        entries.append(writer.close())
+    return entries
+
+
+def write_manifest(out_dir: Path, source: Path, fmt: str, max_records: int, max_bytes: int, entries: List[BatchEntry]) -> Path:
+    manifest = {
+        "source": str(source),
+        "format": fmt,
+        "max_records": max_records,
+        "max_bytes": max_bytes,
+        "total_records": entries[-1].end if entries else 0,
+        "batches": [asdict(entry) for entry in entries],
+    }
+    path = out_dir / MANIFEST_NAME
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    tmp_path.replace(path)
+    return path
+
+
+def load_manifest(out_dir: Path) -> List[BatchEntry]:
+    manifest = json.loads((out_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    return [BatchEntry(**entry) for entry in manifest["batches"]]
+
+
+def verify_batch(out_dir: Path, entry: BatchEntry) -> bool:
+    """True when the batch file still has the size and checksum the manifest recorded."""
+    path = out_dir / entry.file
+    if not path.exists() or path.stat().st_size != entry.bytes:
+        return False
+    digest = hashlib.sha256()
+    with path.open("rb") as src:
+        for chunk in iter(lambda: src.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest() == entry.sha256
+
+
+def read_batch(out_dir: Path, entry: BatchEntry) -> List[Dict[str, object]]:
+    return list(iter_records(out_dir / entry.file))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Split authorization records into size-capped upload batches.")
+    parser.add_argument("source", type=Path, help="JSON array or JSON Lines file of normalized records")
+    parser.add_argument("--out-dir", type=Path, default=OUT_DIR)
+    parser.add_argument("--format", choices=BATCH_FORMATS, default="json", help="compact JSON arrays or JSON Lines")
+    parser.add_argument(
+        "--max-records", type=int, help=f"records per batch at most (default: {DEFAULT_MAX_RECORDS})"
+    )
+    parser.add_argument("--max-bytes", type=int, default=DEFAULT_MAX_BYTES, help="serialized bytes per batch at most")
+    parser.add_argument(
+        "--batches",
+        type=int,
+        help="Aim for N evenly sized batches instead; --max-records and --max-bytes still cap each one.",
+    )
+    args = parser.parse_args()
+    if (args.max_records is not None and args.max_records < 1) or args.max_bytes < 1:
+        parser.error("--max-records and --max-bytes must be positive")
+    if args.batches is not None and args.batches < 1:
+        parser.error("--batches must be at least 1")
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    if args.batches is not None:
+        total = sum(1 for _ in iter_records(args.source))
+        max_records = max(1, math.ceil(total / args.batches))
+        if args.max_records is not None:
+            max_records = min(max_records, args.max_records)
+    else:
+        max_records = args.max_records or DEFAULT_MAX_RECORDS
+
+    for fmt in BATCH_FORMATS:
+        for stale in args.out_dir.glob(f"batch-*.{fmt}") if args.out_dir.exists() else []:
+            stale.unlink()
+    (args.out_dir / MANIFEST_NAME).unlink(missing_ok=True)
+
+    entries = split_batches(iter_records(args.source), args.out_dir, args.format, max_records, args.max_bytes)
+    manifest = write_manifest(args.out_dir, args.source, args.format, max_records, args.max_bytes, entries)
+    largest = max((entry.bytes for entry in entries), default=0)
+    total = entries[-1].end if entries else 0
+    print(f"records={total} batches={len(entries)} largest_batch_bytes={largest} manifest={manifest}")
+
+
+if __name__ == "__main__":
+    main()
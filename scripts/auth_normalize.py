@@ -0,0 +1,199 @@
+"""Streaming normalizer for client authorization workbooks.
+
+Workbooks are opened with ``openpyxl.load_workbook(read_only=True)``, which
+parses sheet XML lazily as rows are iterated, so memory stays flat however many
+sheets or rows a workbook has; records are yielded one at a time.
+
+Each data row (from row 3) holds, in order: client name, auth type, auth
+amount, IEHP, service text, location, staff needed and the auth date range.
+
+Requires openpyxl.
+"""
+
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from date_normalize import parse_slash_date
+
+FIRST_DATA_ROW = 3
+AUTH_COLUMNS = 8
+# Distinct service texts are few next to rows; they repeat across clients.
+SERVICE_UNITS_CACHE_SIZE = 4096
+
+_NUMBER_RE = re.compile(r"(\d+(?:\.\d+)?)")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Every H0032 / HO hour mention in one left-to-right scan. The alternatives sit in
+# a lookahead so matches may overlap (in "H0032 4 HRS HO" the supervision hours
+# and the "4 HRS HO" parent-consult hours share the "4 HRS"); no two alternatives
+# can match at the same position, so none is shadowed by another.
+_HOURS = r"\d+(?:\.\d+)?"
+_SERVICE_UNITS_RE = re.compile(
+    r"(?=(?:"
+    rf"H0032\s*HO\s*(?P<code_ho>{_HOURS})\s*HRS?"
+    rf"|H0032(?!\s*HO|HO)\s*(?P<supervision>{_HOURS})\s*HRS?"
+    rf"|(?P<hours_ho>{_HOURS})\s*HRS?\s*HO\b"
+    rf"|\bHO\s*(?P<ho_hours>{_HOURS})\s*HRS?"
+    r"))"
+)
+# When several HO forms appear, the first listed wins (then leftmost within a form).
+_HO_GROUPS = ("code_ho", "hours_ho", "ho_hours")
+
+AuthRecord = Dict[str, object]
+
+
+def clean(value: object) -> Optional[str]:
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text if text else None
+
+
+def parse_hours(value: object):
+    text = clean(value)
+    if not text:
+        return None
+    match = _NUMBER_RE.search(text)
+    if not match:
+        return None
+    hours = float(match.group(1))
+    return int(hours) if hours.is_integer() else hours
+
+
+def parse_date_range(
+    value: object, min_year: Optional[int] = None, max_year: Optional[int] = None
+) -> Tuple[Optional[str], Optional[str]]:
+    """``"M/D/YY - M/D/YY"`` -> ISO start/end dates (two-digit years are 20xx)."""
+    text = clean(value)
+    if not text or "-" not in text:
+        return (None, None)
+    left, right = text.split("-", 1)
+    return (
+        parse_slash_date(left.strip(), min_year=min_year, max_year=max_year),
+        parse_slash_date(right.strip(), min_year=min_year, max_year=max_year),
+    )
+
+
+def split_name(value: object) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """``(full, first, last)`` from ``"Last, First"`` or ``"First ... Last"``."""
+    name = clean(value)
+    if not name:
+        return (None, None, None)
+    full = _WHITESPACE_RE.sub(" ", name)
+    if "," in full:
+        last, first = [part.strip() or None for part in full.split(",", 1)]
+        return (full, first, last)
+    parts = full.split(" ")
+    if len(parts) >= 2:
+        return (full, " ".join(parts[:-1]), parts[-1])
+    return (full, full, None)
+
+
+def _round_units(value: Optional[float]) -> Optional[int]:
+    if value is None:
+        return None
+    return int(value) if float(value).is_integer() else int(round(value))
+
+
+def parse_service_units(value: object) -> Tuple[Optional[int], Optional[int]]:
+    """``(supervision_units, parent_consult_units)`` from H0032 / HO hours in the service text."""
+    text = clean(value)
+    if not text:
+        return (None, None)
+    return _parse_service_text(text)
+
+
+@lru_cache(maxsize=SERVICE_UNITS_CACHE_SIZE)
+def _parse_service_text(text: str) -> Tuple[Optional[int], Optional[int]]:
+    found: Dict[str, str] = {}
+    for match in _SERVICE_UNITS_RE.finditer(text.upper()):
+        group = match.lastgroup
+        if group not in found:
+            found[group] = match.group(group)
+            if "code_ho" in found and "supervision" in found:
+                break
+
+    ho = next((float(found[group]) for group in _HO_GROUPS if group in found), None)
+    supervision = float(found["supervision"]) if "supervision" in found else None
+    return (_round_units(supervision), _round_units(ho))
+
+
+def normalize_auth_row(
+    row: Sequence[object], min_year: Optional[int] = None, max_year: Optional[int] = None
+) -> AuthRecord:
+    name_raw, auth_type, auth_amount, iehp, service_text, location, staff_needed, date_range = row[:AUTH_COLUMNS]
+    full_name, first_name, last_name = split_name(name_raw)
+    auth_hours = parse_hours(auth_amount)
+    start_date, end_date = parse_date_range(date_range, min_year, max_year)
+    supervision_units, parent_consult_units = parse_service_units(service_text)
+    whole_hours = isinstance(auth_hours, (int, float)) and float(auth_hours).is_integer()
+    one_to_one = clean(auth_type) and "1to1" in str(auth_type).replace(" ", "").lower()
+    notes = " | ".join([part for part in (clean(iehp), clean(service_text), clean(staff_needed)) if part]) or None
+    return {
+        "full_name": full_name,
+        "first_name": first_name,
+        "last_name": last_name,
+        "city": clean(location),
+        "authorized_hours_per_month": int(auth_hours) if whole_hours else None,
+        "auth_units": auth_hours,
+        "auth_start_date": start_date,
+        "auth_end_date": end_date,
+        "one_to_one_units": int(auth_hours) if one_to_one and isinstance(auth_hours, (int, float)) else None,
+        "supervision_units": supervision_units,
+        "parent_consult_units": parent_consult_units,
+        "notes": notes,
+    }
+
+
+def is_placeholder_name(full_name: Optional[str]) -> bool:
+    """Rows without a client name, or the 'CO' marker rows, are not authorizations."""
+    return not full_name or full_name.upper() == "CO"
+
+
+def _load_workbook_read_only(path: Path):
+    try:
+        import openpyxl
+    except ImportError as exc:  # pragma: no cover - depends on the environment
+        raise RuntimeError("Reading authorization workbooks requires openpyxl (pip install openpyxl)") from exc
+    return openpyxl.load_workbook(path, read_only=True, data_only=True)
+
+
+def workbook_sheet_names(path: Path) -> List[str]:
+    workbook = _load_workbook_read_only(path)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+def iter_auth_records(
+    path: Path,
+    all_sheets: bool = False,
+    skip_placeholders: bool = False,
+    min_year: Optional[int] = None,
+    max_year: Optional[int] = None,
+    sheet_names: Optional[Sequence[str]] = None,
+) -> Iterator[AuthRecord]:
+    """Stream normalized records from the first sheet, every sheet or the named sheets of a workbook."""
+    workbook = _load_workbook_read_only(path)
+    try:
+        if sheet_names is not None:
+            sheets = [workbook[name] for name in sheet_names]
+        else:
+            sheets = workbook.worksheets if all_sheets else workbook.worksheets[:1]
+        for sheet in sheets:
+            for row in sheet.iter_rows(min_row=FIRST_DATA_ROW, values_only=True):
+                if not row or not any(clean(cell) for cell in row):
+                    continue
+                if len(row) < AUTH_COLUMNS:
+                    # read-only rows stop at the sheet's recorded dimension
+                    row = tuple(row) + (None,) * (AUTH_COLUMNS - len(row))
+                record = normalize_auth_row(row, min_year, max_year)
+                if skip_placeholders and is_placeholder_name(record["full_name"]):
+                    continue
+                yield record
+    finally:
+        # read-only workbooks keep the archive open until closed
+        workbook.close()
@@ -1,115 +1,100 @@
+import argparse
 import csv
+import io
 import json
-from datetime import datetime
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from columnar_output import COLUMNAR_FORMATS, write_cleaned_outputs
+from csv_normalize import DATE, SCRUB, STATE, scrub_cell
+from date_normalize import dominant_format
+from incremental_index import (
+    BLANK,
+    IncrementalIndex,
+    csv_field,
+    format_rows,
+    header_offset,
+    parse_records,
+    sidecar_path,
+    write_rendered_outputs,
+)
+from stage_timings import StageTimings, phase, profiled
 
 RAW_PATH = Path("data/client_raw.csv")
 CLEAN_PATH = Path("data/client_cleaned.csv")
 REPORT_PATH = Path("data/client_import_report.json")
 PLACEHOLDER_DOMAIN = "clients.placeholder.local"
 
-STATE_MAP = {
-    "ALABAMA": "AL",
-    "ALASKA": "AK",
-    "ARIZONA": "AZ",
-    "ARKANSAS": "AR",
-    "CALIFORNIA": "CA",
-    "COLORADO": "CO",
-    "CONNECTICUT": "CT",
-    "DELAWARE": "DE",
-    "DISTRICT OF COLUMBIA": "DC",
-    "FLORIDA": "FL",
-    "GEORGIA": "GA",
-    "HAWAII": "HI",
-    "IDAHO": "ID",
-    "ILLINOIS": "IL",
-    "INDIANA": "IN",
-    "IOWA": "IA",
-    "KANSAS": "KS",
-    "KENTUCKY": "KY",
-    "LOUISIANA": "LA",
-    "MAINE": "ME",
-    "MARYLAND": "MD",
-    "MASSACHUSETTS": "MA",
-    "MICHIGAN": "MI",
-    "MINNESOTA": "MN",
-    "MISSISSIPPI": "MS",
-    "MISSOURI": "MO",
-    "MONTANA": "MT",
-    "NEBRASKA": "NE",
-    "NEVADA": "NV",
-    "NEW HAMPSHIRE": "NH",
-    "NEW JERSEY": "NJ",
-    "NEW MEXICO": "NM",
-    "NEW YORK": "NY",
-    "NORTH CAROLINA": "NC",
-    "NORTH DAKOTA": "ND",
-    "OHIO": "OH",
-    "OKLAHOMA": "OK",
-    "OREGON": "OR",
-    "PENNSYLVANIA": "PA",
-    "RHODE ISLAND": "RI",
-    "SOUTH CAROLINA": "SC",
-    "SOUTH DAKOTA": "SD",
-    "TENNESSEE": "TN",
-    "TEXAS": "TX",
-    "UTAH": "UT",
-    "VERMONT": "VT",
-    "VIRGINIA": "VA",
-    "WASHINGTON": "WA",
-    "WEST VIRGINIA": "WV",
-    "WISCONSIN": "WI",
-    "WYOMING": "WY",
-}
-
-
-def scrub_cell(value: str) -> str:
-    return value.replace("\r", " ").replace("\n", " ").strip()
-
-
-def normalize_state(value: str) -> str:
-    trimmed = scrub_cell(value)
-    if not trimmed:
-        return ""
-    if len(trimmed) == 2:
-        return trimmed.upper()
-    return STATE_MAP.get(trimmed.upper(), trimmed)
-
-
-def normalize_dob(value: str) -> str:
-    trimmed = scrub_cell(value)
-    if not trimmed:
-        return ""
-    for fmt in ("%m/%d/%Y", "%m/%d/%y"):
-        try:
-            as_date = datetime.strptime(trimmed, fmt)
-            return as_date.strftime("%Y-%m-%d")
-        except ValueError:
-            continue
-    return trimmed
-
-
-def main() -> None:
-    if not RAW_PATH.exists():
-        raise FileNotFoundError(f"Source CSV not found at {RAW_PATH}")
-
-    with RAW_PATH.open("r", encoding="utf-8-sig", newline="") as src:
-        reader = list(csv.reader(src))
-
-    header_idx = None
+# Smallest byte range handed to a worker in --workers mode; below this the
+# pickling round-trip costs more than the cleaning it parallelizes.
+MIN_CHUNK_BYTES = 1 << 20
+
+# Rows read and normalized together as columns in the serial path.
+BATCH_ROWS = 4096
+
+# Required fields, in report order; each has a flag bit in the incremental index.
+MISSING_FIELDS = ("first_name", "last_name", "email", "date_of_birth")
+MISSING_FLAGS = [(BLANK << (bit + 1), name) for bit, name in enumerate(MISSING_FIELDS)]
+# The record gets a placeholder email ...
+PLACEHOLDER = BLANK << (len(MISSING_FIELDS) + 1)
+# ... based on its row number, so the placeholder moves with the row.
+ROW_BASED = PLACEHOLDER << 1
+
+
+@dataclass
+class ColumnLayout:
+    headers: List[str]
+    added_email_column: bool
+    state_index: Optional[int]
+    dob_index: Optional[int]
+    first_name_index: Optional[int]
+    last_name_index: Optional[int]
+    email_index: Optional[int]
+    client_id_index: Optional[int]
+
+
+@dataclass
+class ImportReport:
+    """Per-key state carried across the row stream; everything else is written as it is produced."""
+
+    rows_written: int = 0
+    missing_required_rows: List[Dict[str, object]] = field(default_factory=list)
+    missing_email_rows: List[int] = field(default_factory=list)
+    duplicate_emails: Dict[str, List[int]] = field(default_factory=dict)
+    duplicate_client_ids: Dict[str, List[int]] = field(default_factory=dict)
+    placeholder_assignments: List[Dict[str, str]] = field(default_factory=list)
+    used_emails: Dict[str, int] = field(default_factory=dict)
+
+    def as_dict(self, added_email_column: bool) -> Dict[str, object]:
+        return {
+            "rows_written": self.rows_written,
+            "added_email_column": added_email_column,
+            "missing_required_rows": self.missing_required_rows,
+            "missing_email_rows": self.missing_email_rows,
+            "duplicate_emails": {
+                email: nums for email, nums in self.duplicate_emails.items() if len(nums) > 1
+            },
+            "duplicate_client_ids": {
+                cid: nums for cid, nums in self.duplicate_client_ids.items() if len(nums) > 1
+            },
+            "placeholder_emails_assigned": self.placeholder_assignments,
+        }
+
+
+def locate_header(reader: Iterator[List[str]]) -> Tuple[int, List[str]]:
+    """Consume rows from ``reader`` up to and including the header row."""
     for idx, row in enumerate(reader):
         normalized = [scrub_cell(cell) for cell in row]
         if "First Name" in normalized and "Last Name" in normalized:
-            header_idx = idx
-            break
-
-    if header_idx is None:
-        raise ValueError("Unable to locate header row in client CSV.")
+            return idx, normalized
+    raise ValueError("Unable to locate header row in client CSV.")
 
-    headers = [scrub_cell(cell) for cell in reader[header_idx]]
-    rows = reader[header_idx + 1 :]
 
+def resolve_layout(headers: List[str]) -> ColumnLayout:
+    headers = list(headers)
     added_email_column = False
     if not any(header.lower() == "email" for header in headers):
         headers.append("Email")
@@ -121,128 +106,574 @@ def main() -> None:
         if normalized not in header_index:
             header_index[normalized] = idx
 
-    state_index = header_index.get("State")
-    dob_index = header_index.get("DOB")
-    first_name_index = header_index.get("First Name")
-    last_name_index = header_index.get("Last Name")
-    email_index = header_index.get("Email")
-
     client_id_index = None
     for name in headers:
         if "client id" in name.lower():
             client_id_index = header_index.get(name.strip())
             break
 
-    processed_rows: List[List[str]] = []
-    duplicate_emails: Dict[str, List[int]] = {}
-    duplicate_client_ids: Dict[str, List[int]] = {}
-    missing_required_rows: List[Dict[str, int]] = []
-    missing_email_rows: List[int] = []
-    placeholder_assignments: List[Dict[str, str]] = []
-    used_emails: Dict[str, int] = {}
+    return ColumnLayout(
+        headers=headers,
+        added_email_column=added_email_column,
+        state_index=header_index.get("State"),
+        dob_index=header_index.get("DOB"),
+        first_name_index=header_index.get("First Name"),
+        last_name_index=header_index.get("Last Name"),
+        email_index=header_index.get("Email"),
+        client_id_index=client_id_index,
+    )
 
-    for row_num, row in enumerate(rows, start=header_idx + 2):
-        if not any(scrub_cell(cell) for cell in row):
-            continue
 
-        if len(row) < len(headers):
-            row = row + [""] * (len(headers) - len(row))
-        elif len(row) > len(headers):
-            row = row[: len(headers)]
+def is_blank(row: List[str]) -> bool:
+    return not any(cell.strip() for cell in row)
+
+
+def normalize_rows(
+    rows: List[List[str]], layout: ColumnLayout, dob_formats: Optional[Dict[str, int]] = None
+) -> List[List[str]]:
+    """Pad/truncate, scrub and normalize a batch of rows column by column.
+
+    Independent of any other batch, so it can run in worker processes.
+    """
+    if not rows:
+        return []
+
+    width = len(layout.headers)
+    fitted = [
+        row + [""] * (width - len(row)) if len(row) < width else row[:width]
+        for row in rows
+    ]
+
+    columns = [SCRUB.normalize_column(column) for column in zip(*fitted)]
+
+    if layout.state_index is not None:
+        columns[layout.state_index] = STATE.normalize_column(columns[layout.state_index])
+
+    if layout.dob_index is not None:
+        columns[layout.dob_index] = DATE.normalize_column(columns[layout.dob_index], dob_formats)
+
+    return [list(row) for row in zip(*columns)]
+
 
-        row = [scrub_cell(cell) for cell in row]
+def placeholder_stem(row: List[str], layout: ColumnLayout) -> str:
+    """Placeholder email base from the client id or name; empty when the row number has to be used."""
+    base_candidate = ""
+    if layout.client_id_index is not None:
+        base_candidate = row[layout.client_id_index]
+    if not base_candidate and layout.first_name_index is not None and layout.last_name_index is not None:
+        first = row[layout.first_name_index].lower().replace(" ", "")
+        last = row[layout.last_name_index].lower().replace(" ", "")
+        base_candidate = f"{first}.{last}".strip(".")
 
-        if state_index is not None:
-            row[state_index] = normalize_state(row[state_index])
+    return (
+        base_candidate.lower()
+        .replace(" ", "")
+        .replace("/", "")
+        .replace("#", "")
+        .replace("@", "")
+        .replace(",", "")
+    )
 
-        if dob_index is not None:
-            row[dob_index] = normalize_dob(row[dob_index])
 
-        email_value = row[email_index].lower() if email_index is not None else ""
-        if email_value:
-            duplicate_emails.setdefault(email_value, []).append(row_num)
+def placeholder_base(row: List[str], row_num: int, layout: ColumnLayout) -> str:
+    return placeholder_stem(row, layout) or f"row{row_num}"
+
+
+def placeholder_email(base: str, count: int) -> str:
+    """The placeholder for the ``count``-th earlier row (0-based) sharing ``base``."""
+    return f"{base}@{PLACEHOLDER_DOMAIN}" if count == 0 else f"{base}-{count}@{PLACEHOLDER_DOMAIN}"
+
+
+def missing_fields(row: List[str], layout: ColumnLayout) -> List[str]:
+    indexes = (layout.first_name_index, layout.last_name_index, layout.email_index, layout.dob_index)
+    return [name for name, idx in zip(MISSING_FIELDS, indexes) if idx is not None and not row[idx]]
+
+
+def record_row(row: List[str], row_num: int, layout: ColumnLayout, report: ImportReport) -> None:
+    """Apply the order-dependent steps (placeholder suffixes, duplicate and missing-field tracking)."""
+    email_index = layout.email_index
+    email_value = row[email_index].lower() if email_index is not None else ""
+    if email_value:
+        report.duplicate_emails.setdefault(email_value, []).append(row_num)
+    else:
+        if email_index is not None:
+            sanitized = placeholder_base(row, row_num, layout)
+
+            count = report.used_emails.get(sanitized, 0)
+            report.used_emails[sanitized] = count + 1
+
+            email = placeholder_email(sanitized, count)
+            row[email_index] = email
+            report.placeholder_assignments.append({"row": str(row_num), "email": email})
+            report.duplicate_emails.setdefault(email, []).append(row_num)
         else:
-            if email_index is not None:
-                base_candidate = ""
-                if client_id_index is not None:
-                    base_candidate = row[client_id_index]
-                if not base_candidate and first_name_index is not None and last_name_index is not None:
-                    first = row[first_name_index].lower().replace(" ", "")
-                    last = row[last_name_index].lower().replace(" ", "")
-                    base_candidate = f"{first}.{last}".strip(".")
-                if not base_candidate:
-                    base_candidate = f"row{row_num}"
-
-                sanitized = (
-                    base_candidate.lower()
-                    .replace(" ", "")
-                    .replace("/", "")
-                    .replace("#", "")
-                    .replace("@", "")
-                    .replace(",", "")
+            report.missing_email_rows.append(row_num)
+
+    if layout.client_id_index is not None:
+        client_value = row[layout.client_id_index]
+        if client_value:
+            report.duplicate_client_ids.setdefault(client_value, []).append(row_num)
+
+    # after the placeholder is assigned, so placeholders count as present
+    fields = missing_fields(row, layout)
+    if fields:
+        report.missing_required_rows.append({"row": row_num, "fields": fields})
+
+    report.rows_written += 1
+
+
+def iter_cleaned_rows(
+    rows: Iterable[List[str]],
+    layout: ColumnLayout,
+    report: ImportReport,
+    start: int,
+    dob_formats: Optional[Dict[str, int]] = None,
+    timings: Optional[StageTimings] = None,
+) -> Iterator[List[str]]:
+    rows = iter(rows)
+    row_num = start
+    while True:
+        with phase(timings, "read"):
+            chunk = list(islice(rows, BATCH_ROWS))
+            batch_nums = [num for num, row in enumerate(chunk, start=row_num) if not is_blank(row)]
+            batch = [chunk[num - row_num] for num in batch_nums]
+        if not chunk:
+            return
+        row_num += len(chunk)
+        yield from _record_batch(batch, batch_nums, layout, report, dob_formats, timings)
+
+
+def _record_batch(
+    batch: List[List[str]],
+    batch_nums: List[int],
+    layout: ColumnLayout,
+    report: ImportReport,
+    dob_formats: Optional[Dict[str, int]],
+    timings: Optional[StageTimings] = None,
+) -> Iterator[List[str]]:
+    with phase(timings, "normalize"):
+        normalized = normalize_rows(batch, layout, dob_formats)
+    with phase(timings, "dedupe"):
+        for row_num, row in zip(batch_nums, normalized):
+            record_row(row, row_num, layout, report)
+    yield from normalized
+
+
+def is_header_row(row: List[str]) -> bool:
+    normalized = [scrub_cell(cell) for cell in row]
+    return "First Name" in normalized and "Last Name" in normalized
+
+
+def locate_header_offset(path: Path) -> Tuple[int, List[str], int]:
+    """Find the header row without a text-mode reader so the byte offset of the data is known.
+
+    Returns ``(header_idx, headers, data_offset)``.
+    """
+    found = header_offset(path, is_header_row)
+    if found is None:
+        raise ValueError("Unable to locate header row in client CSV.")
+    header_idx, row, data_offset = found
+    return header_idx, [scrub_cell(cell) for cell in row], data_offset
+
+
+def split_record_ranges(path: Path, start: int, chunk_bytes: int) -> List[Tuple[int, int]]:
+    """Split ``path[start:]`` into byte ranges that end on CSV record boundaries.
+
+    A newline only ends a record when it sits outside a quoted field, i.e. when an
+    even number of quote characters has been seen since the last boundary.
+    """
+    ranges: List[Tuple[int, int]] = []
+    with path.open("rb") as fh:
+        fh.seek(start)
+        chunk_start = pos = start
+        quotes = 0
+        for line in fh:
+            pos += len(line)
+            quotes += line.count(b'"')
+            if quotes % 2 == 0 and pos - chunk_start >= chunk_bytes:
+                ranges.append((chunk_start, pos))
+                chunk_start = pos
+                quotes = 0
+        if pos > chunk_start:
+            ranges.append((chunk_start, pos))
+    return ranges
+
+
+def clean_chunk(
+    path: Path, byte_range: Tuple[int, int], layout: ColumnLayout
+) -> Tuple[int, List[Tuple[int, List[str]]], Dict[str, int]]:
+    """Worker: normalize every record in a byte range.
+
+    Returns the number of records seen (blank ones included, so row numbers can be
+    rebuilt), the ``(local_index, row)`` pairs that survived the blank-row filter
+    and the DOB format tally for the chunk.
+    """
+    start, end = byte_range
+    with path.open("rb") as fh:
+        fh.seek(start)
+        text = fh.read(end - start).decode("utf-8")
+
+    count = 0
+    kept: List[List[str]] = []
+    kept_idx: List[int] = []
+    for count, row in enumerate(csv.reader(io.StringIO(text, newline="")), start=1):
+        if is_blank(row):
+            continue
+        kept.append(row)
+        kept_idx.append(count - 1)
+    dob_formats: Dict[str, int] = {}
+    cleaned = list(zip(kept_idx, normalize_rows(kept, layout, dob_formats)))
+    return count, cleaned, dob_formats
+
+
+def iter_parallel_cleaned_rows(
+    path: Path,
+    data_offset: int,
+    layout: ColumnLayout,
+    report: ImportReport,
+    start: int,
+    workers: int,
+    dob_formats: Optional[Dict[str, int]] = None,
+) -> Iterator[List[str]]:
+    """Clean byte-range chunks in a process pool and merge them back in original row order.
+
+    Workers only do the row-local work; ``record_row`` runs here, serially, so
+    placeholder suffixes and duplicate maps match a single-process run exactly.
+    """
+    data_bytes = path.stat().st_size - data_offset
+    chunk_bytes = max(MIN_CHUNK_BYTES, data_bytes // (workers * 4) + 1)
+    ranges = split_record_ranges(path, data_offset, chunk_bytes)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: List[Future] = []
+        next_range = 0
+        row_base = start
+        while pending or next_range < len(ranges):
+            # keep at most two chunks per worker in flight so memory stays bounded
+            while next_range < len(ranges) and len(pending) < workers * 2:
+                pending.append(pool.submit(clean_chunk, path, ranges[next_range], layout))
+                next_range += 1
+            count, cleaned, chunk_formats = pending.pop(0).result()
+            if dob_formats is not None:
+                for fmt, fmt_count in chunk_formats.items():
+                    dob_formats[fmt] = dob_formats.get(fmt, 0) + fmt_count
+            for local_idx, row in cleaned:
+                record_row(row, row_base + local_idx, layout, report)
+                yield row
+            row_base += count
+
+
+def clean_incremental(
+    data: bytes,
+    data_offset: int,
+    start: int,
+    layout: ColumnLayout,
+    index: IncrementalIndex,
+    report: ImportReport,
+    dob_formats: Optional[Dict[str, int]] = None,
+    timings: Optional[StageTimings] = None,
+) -> Iterator[bytes]:
+    """Clean only the records of ``data[data_offset:]`` that changed since the previous run.
+
+    The key maps in ``index`` (emails, client ids, placeholder bases -> entries)
+    are patched for the removed and re-cleaned records only; ``report`` is then
+    filled as a full run would fill it. Returns the cleaned CSV body.
+    """
+    email_index = layout.email_index
+    client_id_index = layout.client_id_index
+
+    def keys(row: List[str]) -> Tuple[str, str, Optional[str]]:
+        """(email, client id, placeholder stem or None when the row keeps its email) of a normalized row."""
+        email = row[email_index].lower() if email_index is not None else ""
+        client_id = row[client_id_index] if client_id_index is not None else ""
+        stem = placeholder_stem(row, layout) if email_index is not None and not email else None
+        return email, client_id, stem
+
+    with phase(timings, "read"):
+        records = index.align(data, data_offset)
+        gone = [entry for entry in index.removed if not index.flags[entry] & BLANK]
+        removed = [(entry, *keys(row)) for entry, row in zip(gone, parse_records([index.out_line(e) for e in gone]))]
+
+    entries: List[Tuple[bytes, int, int]] = []
+    added: List[Tuple[int, str, str, Optional[str]]] = []
+    for offset in range(0, len(records), BATCH_ROWS):
+        with phase(timings, "read"):
+            raw_rows = parse_records(records[offset : offset + BATCH_ROWS])
+            kept = [pos for pos, row in enumerate(raw_rows) if not is_blank(row)]
+        with phase(timings, "normalize"):
+            rows = normalize_rows([raw_rows[pos] for pos in kept], layout, dob_formats)
+            row_keys = [keys(row) for row in rows]
+            # the placeholder is spliced in where the empty email cell starts
+            cuts = iter(
+                len(prefix) - 2 if email_index else 0
+                for prefix in format_rows(
+                    [row[:email_index] + [""] for row, (_, _, stem) in zip(rows, row_keys) if stem is not None]
+                )
+            )
+            batch_entries: List[Tuple[bytes, int, int]] = [(b"", -1, BLANK)] * len(raw_rows)
+            for pos, row, line, (email, client_id, stem) in zip(kept, rows, format_rows(rows), row_keys):
+                fields = missing_fields(row, layout)
+                flags, cut = 0, -1
+                if stem is not None:
+                    fields.remove("email")
+                    flags = PLACEHOLDER if stem else PLACEHOLDER | ROW_BASED
+                    cut = next(cuts)
+                for bit, name in MISSING_FLAGS:
+                    if name in fields:
+                        flags |= bit
+                batch_entries[pos] = (line, cut, flags)
+                added.append((index.first_added + offset + pos, email, client_id, stem))
+            entries.extend(batch_entries)
+    index.store(entries)
+
+    with phase(timings, "dedupe"):
+        row_based = index.extra.setdefault("row_based", {})
+        positions = index.positions
+
+        # placeholder groups whose -N suffixes may shift: those losing or gaining
+        # an entry, and those of row-based entries whose row number moved
+        touched: Set[str] = set()
+        dropped: List[Tuple[int, str, str, str]] = []
+        for entry, email, client_id, stem in removed:
+            base = ""
+            if stem is not None:
+                base = row_based.pop(str(entry)) if index.flags[entry] & ROW_BASED else stem
+                touched.add(base)
+            dropped.append((entry, email, client_id, base))
+        moved = []
+        for key, base in row_based.items():
+            new_base = f"row{start + positions[int(key)]}"
+            if new_base != base:
+                moved.append((int(key), base, new_base))
+                touched.update((base, new_base))
+        linked: List[Tuple[int, str, str, str]] = []
+        for entry, email, client_id, stem in added:
+            base = ""
+            if stem is not None:
+                base = stem or f"row{start + positions[entry]}"
+                if not stem:
+                    row_based[str(entry)] = base
+                touched.add(base)
+            linked.append((entry, email, client_id, base))
+
+        for base in touched:
+            for count, entry in enumerate(index.members("placeholders", base)):
+                index.unlink("emails", placeholder_email(base, count), entry)
+        for entry, email, client_id, base in dropped:
+            if base:
+                index.unlink("placeholders", base, entry)
+            elif email:
+                index.unlink("emails", email, entry)
+            if client_id:
+                index.unlink("client_ids", client_id, entry)
+        for entry, base, new_base in moved:
+            index.unlink("placeholders", base, entry)
+            index.link("placeholders", new_base, entry)
+            row_based[str(entry)] = new_base
+        for entry, email, client_id, base in linked:
+            if base:
+                index.link("placeholders", base, entry)
+            elif email:
+                index.link("emails", email, entry)
+            if client_id:
+                index.link("client_ids", client_id, entry)
+        # groups back in row order first: a placeholder's suffix is its rank in the group
+        index.settle()
+        for base in touched:
+            for count, entry in enumerate(index.members("placeholders", base)):
+                index.link("emails", placeholder_email(base, count), entry)
+        index.settle()
+
+        placeholder_emails = {
+            entry: placeholder_email(base, 0) for base, entry in index.singles["placeholders"].items()
+        }
+        placeholder_emails.update(
+            (entry, placeholder_email(base, count))
+            for base, members in index.maps["placeholders"].items()
+            for count, entry in enumerate(members)
+        )
+        missing_mask = sum(bit for bit, _ in MISSING_FLAGS)
+        for position, entry in enumerate(index.order()):
+            flags = index.flags[entry]
+            if flags & BLANK:
+                continue
+            row_num = start + position
+            report.rows_written += 1
+            if flags & PLACEHOLDER:
+                report.placeholder_assignments.append({"row": str(row_num), "email": placeholder_emails[entry]})
+            elif email_index is None:
+                report.missing_email_rows.append(row_num)
+            if flags & missing_mask:
+                fields = [name for bit, name in MISSING_FLAGS if flags & bit]
+                report.missing_required_rows.append({"row": row_num, "fields": fields})
+        report.duplicate_emails = index.duplicates("emails", start)
+        report.duplicate_client_ids = index.duplicates("client_ids", start)
+
+    return index.render({entry: csv_field(email).encode("utf-8") for entry, email in placeholder_emails.items()})
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Clean the raw client export into client_cleaned.csv.")
+    parser.add_argument(
+        "--backend",
+        choices=("loop", "pandas"),
+        default="loop",
+        help=(
+            "Row-loop backend (default) or the whole-column pandas backend, several times faster on large "
+            "exports; outputs are identical. pandas requires pandas and pyarrow."
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Clean byte-range chunks in N worker processes (default: 1, single process).",
+    )
+    parser.add_argument(
+        "--date-formats",
+        action="store_true",
+        help="Print which date formats the DOB column used.",
+    )
+    parser.add_argument(
+        "--columnar",
+        choices=COLUMNAR_FORMATS,
+        help="Also write a typed columnar copy (client_cleaned.arrow or .parquet); requires pyarrow.",
+    )
+    parser.add_argument(
+        "--no-csv",
+        action="store_true",
+        help="With --columnar, skip client_cleaned.csv and write only the columnar file.",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Keep an index of cleaned records in client_cleaned.index/ and only re-clean records that "
+            "are new or changed since the previous run (--date-formats then counts re-cleaned rows only)."
+        ),
+    )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Add per-phase and per-normalizer timings to the report (serial loop backend only).",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        metavar="PATH",
+        help="Write a cProfile/pstats dump of the run to PATH (main process only).",
+    )
+    args = parser.parse_args()
+    if args.no_csv and not args.columnar:
+        parser.error("--no-csv requires --columnar")
+    if args.incremental and args.workers > 1:
+        parser.error("--incremental cannot be combined with --workers")
+    if args.backend == "pandas" and (args.incremental or args.workers > 1):
+        parser.error("--backend pandas cannot be combined with --incremental or --workers")
+    if args.timings and (args.backend == "pandas" or args.workers > 1):
+        parser.error("--timings is only available with the serial loop backend")
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    with profiled(args.profile):
+        run(args)
+
+
+def run(args: argparse.Namespace) -> None:
+    if not RAW_PATH.exists():
+        raise FileNotFoundError(f"Source CSV not found at {RAW_PATH}")
+
+    timings = StageTimings() if args.timings else None
+    if timings is not None:
+        timings.track("normalize_state", STATE)
+        timings.track("normalize_dob", DATE)
+
+    report = ImportReport()
+    dob_formats: Optional[Dict[str, int]] = {} if args.date_formats else None
+    if args.backend == "pandas":
+        from client_frame_backend import clean_client_frame, read_client_frame, write_frame_csv
+
+        header_idx, headers, data_offset = locate_header_offset(RAW_PATH)
+        layout = resolve_layout(headers)
+        frame, positions = read_client_frame(RAW_PATH, data_offset, len(headers), len(layout.headers))
+        frame = clean_client_frame(
+            frame, positions + header_idx + 2, layout, report, PLACEHOLDER_DOMAIN, dob_formats=dob_formats
+        )
+        if not args.no_csv:
+            write_frame_csv(CLEAN_PATH, layout.headers, frame)
+        if args.columnar:
+            write_cleaned_outputs(
+                CLEAN_PATH,
+                layout.headers,
+                frame.itertuples(index=False, name=None),
+                columnar_format=args.columnar,
+                write_csv=False,
+            )
+    elif args.workers > 1:
+        header_idx, headers, data_offset = locate_header_offset(RAW_PATH)
+        layout = resolve_layout(headers)
+        write_cleaned_outputs(
+            CLEAN_PATH,
+            layout.headers,
+            iter_parallel_cleaned_rows(
+                RAW_PATH,
+                data_offset,
+                layout,
+                report,
+                start=header_idx + 2,
+                workers=args.workers,
+                dob_formats=dob_formats,
+            ),
+            columnar_format=args.columnar,
+            write_csv=not args.no_csv,
+        )
+    elif args.incremental:
+        with phase(timings, "header"):
+            header_idx, headers, data_offset = locate_header_offset(RAW_PATH)
+            layout = resolve_layout(headers)
+        index = IncrementalIndex(sidecar_path(CLEAN_PATH), layout.headers, ("emails", "client_ids", "placeholders"))
+        with phase(timings, "read"):
+            data = RAW_PATH.read_bytes()
+        body = clean_incremental(data, data_offset, header_idx + 2, layout, index, report, dob_formats, timings)
+        with phase(timings, "write"):
+            write_rendered_outputs(
+                CLEAN_PATH, layout.headers, body, columnar_format=args.columnar, write_csv=not args.no_csv
+            )
+        index.commit()
+        print(f"incremental: {index.stats.summary()}")
+    else:
+        with RAW_PATH.open("r", encoding="utf-8-sig", newline="") as src:
+            reader = csv.reader(src)
+            with phase(timings, "header"):
+                header_idx, headers = locate_header(reader)
+                layout = resolve_layout(headers)
+
+            with phase(timings, "write"):
+                write_cleaned_outputs(
+                    CLEAN_PATH,
+                    layout.headers,
+                    iter_cleaned_rows(
+                        reader,
+                        layout,
+                        report,
+                        start=header_idx + 2,
+                        dob_formats=dob_formats,
+                        timings=timings,
+                    ),
+                    columnar_format=args.columnar,
+                    write_csv=not args.no_csv,
                 )
-                if not sanitized:
-                    sanitized = f"row{row_num}"
-
-                count = used_emails.get(sanitized, 0)
-                used_emails[sanitized] = count + 1
-                if count > 0:
-                    sanitized = f"{sanitized}-{count}"
-
-                placeholder_email = f"{sanitized}@{PLACEHOLDER_DOMAIN}"
-                row[email_index] = placeholder_email
-                placeholder_assignments.append({"row": str(row_num), "email": placeholder_email})
-                duplicate_emails.setdefault(placeholder_email, []).append(row_num)
-            else:
-                missing_email_rows.append(row_num)
-
-        if client_id_index is not None:
-            client_value = row[client_id_index]
-            if client_value:
-                duplicate_client_ids.setdefault(client_value, []).append(row_num)
-
-        missing_fields = []
-        if first_name_index is not None and not row[first_name_index]:
-            missing_fields.append("first_name")
-        if last_name_index is not None and not row[last_name_index]:
-            missing_fields.append("last_name")
-        if email_index is not None and not row[email_index]:
-            missing_fields.append("email")
-        if dob_index is not None and not row[dob_index]:
-            missing_fields.append("date_of_birth")
-
-        # recompute email value for missing-field detection (placeholders count as present)
-        if email_index is not None and row[email_index]:
-            if "email" in missing_fields:
-                missing_fields.remove("email")
-
-        if missing_fields:
-            missing_required_rows.append({"row": row_num, "fields": missing_fields})
-
-        processed_rows.append(row)
-
-    with CLEAN_PATH.open("w", encoding="utf-8", newline="") as dst:
-        writer = csv.writer(dst)
-        writer.writerow(headers)
-        writer.writerows(processed_rows)
-
-    report = {
-        "rows_written": len(processed_rows),
-        "added_email_column": added_email_column,
-        "missing_required_rows": missing_required_rows,
-        "missing_email_rows": missing_email_rows,
-        "duplicate_emails": {
-            email: nums for email, nums in duplicate_emails.items() if len(nums) > 1
-        },
-        "duplicate_client_ids": {
-            cid: nums for cid, nums in duplicate_client_ids.items() if len(nums) > 1
-        },
-        "placeholder_emails_assigned": placeholder_assignments,
-    }
-
-    REPORT_PATH.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    report_data = report.as_dict(layout.added_email_column)
+    if timings is not None:
+        report_data["timings"] = timings.as_dict()
+    REPORT_PATH.write_text(json.dumps(report_data, indent=2), encoding="utf-8")
+
+    if dob_formats is not None:
+        print(f"DOB: dominant_format={dominant_format(dob_formats)} counts={json.dumps(dob_formats, sort_keys=True)}")
 
 
 if __name__ == "__main__":
     main()
-
@@ -1,108 +1,224 @@
+import argparse
 import csv
 import json
-import re
 from pathlib import Path
-from typing import Dict, List
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from columnar_output import COLUMNAR_FORMATS, write_cleaned_outputs
+from csv_normalize import EMAIL, PHONE, STATE, STRIP
+from incremental_index import (
+    BLANK,
+    IncrementalIndex,
+    format_rows,
+    header_offset,
+    parse_records,
+    sidecar_path,
+    write_rendered_outputs,
+)
+from stage_timings import StageTimings, phase, profiled
 
 RAW_PATH = Path("data/staff_raw.csv")
 CLEAN_PATH = Path("data/staff_cleaned.csv")
 DUP_REPORT_PATH = Path("data/staff_email_duplicates.json")
+# The duplicates report is a bare email -> rows map, so --timings gets its own file.
+TIMINGS_PATH = Path("data/staff_import_timings.json")
+
+# Rows normalized together as columns.
+BATCH_ROWS = 4096
+
+
+def normalize_rows(
+    rows: List[List[str]],
+    headers: List[str],
+    state_index: Optional[int],
+    phone_index: Optional[int],
+    email_index: Optional[int],
+) -> List[List[str]]:
+    """Pad/truncate, strip and normalize a batch of rows column by column."""
+    if not rows:
+        return []
+
+    width = len(headers)
+    fitted = [
+        row + [""] * (width - len(row)) if len(row) < width else row[:width]
+        for row in rows
+    ]
+
+    columns = [STRIP.normalize_column(column) for column in zip(*fitted)]
+
+    if state_index is not None:
+        columns[state_index] = STATE.normalize_column(columns[state_index])
+
+    if phone_index is not None:
+        columns[phone_index] = PHONE.normalize_column(columns[phone_index])
+
+    if email_index is not None:
+        columns[email_index] = EMAIL.normalize_column(columns[email_index])
+
+    return [list(row) for row in zip(*columns)]
+
 
-STATE_MAP = {
-    "ALABAMA": "AL",
-    "ALASKA": "AK",
-    "ARIZONA": "AZ",
-    "ARKANSAS": "AR",
-    "CALIFORNIA": "CA",
-    "COLORADO": "CO",
-    "CONNECTICUT": "CT",
-    "DELAWARE": "DE",
-    "DISTRICT OF COLUMBIA": "DC",
-    "FLORIDA": "FL",
-    "GEORGIA": "GA",
-    "HAWAII": "HI",
-    "IDAHO": "ID",
-    "ILLINOIS": "IL",
-    "INDIANA": "IN",
-    "IOWA": "IA",
-    "KANSAS": "KS",
-    "KENTUCKY": "KY",
-    "LOUISIANA": "LA",
-    "MAINE": "ME",
-    "MARYLAND": "MD",
-    "MASSACHUSETTS": "MA",
-    "MICHIGAN": "MI",
-    "MINNESOTA": "MN",
-    "MISSISSIPPI": "MS",
-    "MISSOURI": "MO",
-    "MONTANA": "MT",
-    "NEBRASKA": "NE",
-    "NEVADA": "NV",
-    "NEW HAMPSHIRE": "NH",
-    "NEW JERSEY": "NJ",
-    "NEW MEXICO": "NM",
-    "NEW YORK": "NY",
-    "NORTH CAROLINA": "NC",
-    "NORTH DAKOTA": "ND",
-    "OHIO": "OH",
-    "OKLAHOMA": "OK",
-    "OREGON": "OR",
-    "PENNSYLVANIA": "PA",
-    "RHODE ISLAND": "RI",
-    "SOUTH CAROLINA": "SC",
-    "SOUTH DAKOTA": "SD",
-    "TENNESSEE": "TN",
-    "TEXAS": "TX",
-    "UTAH": "UT",
-    "VERMONT": "VT",
-    "VIRGINIA": "VA",
-    "WASHINGTON": "WA",
-    "WEST VIRGINIA": "WV",
-    "WISCONSIN": "WI",
-    "WYOMING": "WY",
-}
-
-
-def normalize_state(value: str) -> str:
-    trimmed = value.strip()
-    if not trimmed:
-        return ""
-    if len(trimmed) == 2:
-        return trimmed.upper()
-    upper_value = trimmed.upper()
-    return STATE_MAP.get(upper_value, trimmed)
-
-
-def normalize_phone(value: str) -> str:
-    if not value:
-        return ""
-    value = value.replace("x___", "")
-    cleaned = re.sub(r"[^0-9+]", "", value)
-    # collapse leading zeros if phone started with +0...
-    if cleaned.startswith("00"):
-        cleaned = "+" + cleaned[2:]
-    return cleaned
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Clean the raw staff export into staff_cleaned.csv.")
+    parser.add_argument(
+        "--columnar",
+        choices=COLUMNAR_FORMATS,
+        help="Also write a typed columnar copy (staff_cleaned.arrow or .parquet); requires pyarrow.",
+    )
+    parser.add_argument(
+        "--no-csv",
+        action="store_true",
+        help="With --columnar, skip staff_cleaned.csv and write only the columnar file.",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Keep an index of cleaned records in staff_cleaned.index/ and only re-clean records that are new "
+            "or changed since the previous run."
+        ),
+    )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Write per-phase and per-normalizer timings to staff_import_timings.json.",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        metavar="PATH",
+        help="Write a cProfile/pstats dump of the run to PATH.",
+    )
+    args = parser.parse_args()
+    if args.no_csv and not args.columnar:
+        parser.error("--no-csv requires --columnar")
+    return args
 
 
 def main() -> None:
+    args = parse_args()
+    with profiled(args.profile):
+        run(args)
+
+
+def is_header_row(row: List[str]) -> bool:
+    return "Account Organization Name" in [cell.strip() for cell in row]
+
+
+def clean_incremental(
+    data: bytes,
+    data_offset: int,
+    start: int,
+    index: IncrementalIndex,
+    normalize_batch: Callable[[List[List[str]]], List[List[str]]],
+    email_index: Optional[int],
+    timings: Optional[StageTimings] = None,
+) -> Tuple[Iterator[bytes], Dict[str, List[int]]]:
+    """Clean only the records of ``data[data_offset:]`` that changed since the previous run.
+
+    The email -> entries map in ``index`` is patched for the removed and
+    re-cleaned records only. Returns the cleaned CSV body and the duplicates.
+    """
+    with phase(timings, "read"):
+        records = index.align(data, data_offset)
+        gone = [entry for entry in index.removed if not index.flags[entry] & BLANK]
+        removed = list(zip(gone, parse_records([index.out_line(entry) for entry in gone])))
+
+    entries: List[Tuple[bytes, int, int]] = []
+    added: List[Tuple[int, str]] = []
+    for offset in range(0, len(records), BATCH_ROWS):
+        with phase(timings, "read"):
+            raw_rows = parse_records(records[offset : offset + BATCH_ROWS])
+            kept = [pos for pos, row in enumerate(raw_rows) if any(cell.strip() for cell in row)]
+        with phase(timings, "normalize"):
+            rows = normalize_batch([raw_rows[pos] for pos in kept])
+            batch_entries: List[Tuple[bytes, int, int]] = [(b"", -1, BLANK)] * len(raw_rows)
+            for pos, line in zip(kept, format_rows(rows)):
+                batch_entries[pos] = (line, -1, 0)
+            entries.extend(batch_entries)
+            if email_index is not None:
+                first = index.first_added + offset
+                added.extend((first + pos, row[email_index]) for pos, row in zip(kept, rows) if row[email_index])
+    index.store(entries)
+
+    with phase(timings, "dedupe"):
+        if email_index is not None:
+            for entry, row in removed:
+                if row[email_index]:
+                    index.unlink("emails", row[email_index], entry)
+            for entry, email in added:
+                index.link("emails", email, entry)
+            index.settle()
+        duplicate_emails = index.duplicates("emails", start)
+
+    return index.render({}), duplicate_emails
+
+
+def run(args: argparse.Namespace) -> None:
     if not RAW_PATH.exists():
         raise FileNotFoundError(f"Source CSV not found at {RAW_PATH}")
 
-    with RAW_PATH.open("r", encoding="utf-8-sig", newline="") as src:
-        reader = list(csv.reader(src))
+    timings = StageTimings() if args.timings else None
+    if timings is not None:
+        timings.track("normalize_state", STATE)
+        timings.track("normalize_phone", PHONE)
+
+    duplicate_emails = run_incremental(args, timings) if args.incremental else run_full(args, timings)
+
+    with phase(timings, "write"):
+        DUP_REPORT_PATH.write_text(
+            json.dumps(duplicate_emails, indent=2), encoding="utf-8"
+        )
+
+    if timings is not None:
+        TIMINGS_PATH.write_text(json.dumps({"timings": timings.as_dict()}, indent=2), encoding="utf-8")
+
+
+def run_incremental(args: argparse.Namespace, timings: Optional[StageTimings]) -> Dict[str, List[int]]:
+    with phase(timings, "header"):
+        found = header_offset(RAW_PATH, is_header_row)
+        if found is None:
+            raise ValueError("Unable to locate header row in staff CSV.")
+        header_idx, header_row, data_offset = found
+        headers = [cell.strip() for cell in header_row]
+
+    state_index = headers.index("State") if "State" in headers else None
+    phone_index = headers.index("Phone") if "Phone" in headers else None
+    email_index = headers.index("Email") if "Email" in headers else None
+
+    def normalize_batch(batch_rows: List[List[str]]) -> List[List[str]]:
+        return normalize_rows(batch_rows, headers, state_index, phone_index, email_index)
+
+    index = IncrementalIndex(sidecar_path(CLEAN_PATH), headers, ("emails",))
+    with phase(timings, "read"):
+        data = RAW_PATH.read_bytes()
+    body, duplicate_emails = clean_incremental(
+        data, data_offset, header_idx + 2, index, normalize_batch, email_index, timings
+    )
+    with phase(timings, "write"):
+        write_rendered_outputs(CLEAN_PATH, headers, body, columnar_format=args.columnar, write_csv=not args.no_csv)
+    index.commit()
+    print(f"incremental: {index.stats.summary()}")
+    return duplicate_emails
 
-    header_idx = None
-    for idx, row in enumerate(reader):
-        normalized = [cell.strip() for cell in row]
-        if "Account Organization Name" in normalized:
-            header_idx = idx
-            break
 
-    if header_idx is None:
-        raise ValueError("Unable to locate header row in staff CSV.")
+def run_full(args: argparse.Namespace, timings: Optional[StageTimings]) -> Dict[str, List[int]]:
+    with phase(timings, "read"):
+        with RAW_PATH.open("r", encoding="utf-8-sig", newline="") as src:
+            reader = list(csv.reader(src))
 
-    headers = [cell.strip() for cell in reader[header_idx]]
-    rows = reader[header_idx + 1 :]
+    with phase(timings, "header"):
+        header_idx = None
+        for idx, row in enumerate(reader):
+            if is_header_row(row):
+                header_idx = idx
+                break
+
+        if header_idx is None:
+            raise ValueError("Unable to locate header row in staff CSV.")
+
+        headers = [cell.strip() for cell in reader[header_idx]]
+        rows = reader[header_idx + 1 :]
 
     processed_rows: List[List[str]] = []
     email_tracker: Dict[str, List[int]] = {}
@@ -111,45 +227,40 @@ def main() -> None:
     phone_index = headers.index("Phone") if "Phone" in headers else None
     email_index = headers.index("Email") if "Email" in headers else None
 
-    for row_num, row in enumerate(rows, start=header_idx + 2):
-        if not any(cell.strip() for cell in row):
-            continue
-
-        if len(row) < len(headers):
-            row = row + [""] * (len(headers) - len(row))
-        elif len(row) > len(headers):
-            row = row[: len(headers)]
+    with phase(timings, "read"):
+        kept = [
+            (row_num, row)
+            for row_num, row in enumerate(rows, start=header_idx + 2)
+            if any(cell.strip() for cell in row)
+        ]
 
-        row = [cell.strip() for cell in row]
+    for offset in range(0, len(kept), BATCH_ROWS):
+        batch = kept[offset : offset + BATCH_ROWS]
+        with phase(timings, "normalize"):
+            normalized = normalize_rows(
+                [row for _, row in batch], headers, state_index, phone_index, email_index
+            )
+        with phase(timings, "dedupe"):
+            for (row_num, _), row in zip(batch, normalized):
+                if email_index is not None:
+                    email_value = row[email_index]
+                    if email_value:
+                        email_tracker.setdefault(email_value, []).append(row_num)
 
-        if state_index is not None:
-            row[state_index] = normalize_state(row[state_index])
+                processed_rows.append(row)
 
-        if phone_index is not None:
-            row[phone_index] = normalize_phone(row[phone_index])
+    with phase(timings, "write"):
+        write_cleaned_outputs(
+            CLEAN_PATH, headers, processed_rows, columnar_format=args.columnar, write_csv=not args.no_csv
+        )
 
-        if email_index is not None:
-            email_value = row[email_index].strip().lower()
-            row[email_index] = email_value
-            if email_value:
-                email_tracker.setdefault(email_value, []).append(row_num)
-
-        processed_rows.append(row)
-
-    with CLEAN_PATH.open("w", encoding="utf-8", newline="") as dst:
-        writer = csv.writer(dst)
-        writer.writerow(headers)
-        writer.writerows(processed_rows)
-
-    duplicate_emails = {
-        email: rows
-        for email, rows in email_tracker.items()
-        if len(rows) > 1
-    }
-
-    DUP_REPORT_PATH.write_text(
-        json.dumps(duplicate_emails, indent=2), encoding="utf-8"
-    )
+    with phase(timings, "dedupe"):
+        duplicate_emails = {
+            email: rows
+            for email, rows in email_tracker.items()
+            if len(rows) > 1
+        }
+    return duplicate_emails
 
 
 if __name__ == "__main__":
@@ -0,0 +1,311 @@
+"""pandas backend for clean_client_csv (``--backend pandas``).
+
+The export is parsed straight into Arrow-backed string columns
+(``pyarrow.csv``), and every per-cell step runs as an Arrow string kernel,
+directly or through pandas' ``.str`` accessor: pad/truncate, scrubbing (line
+breaks to spaces, then a trim of exactly what ``str.strip`` removes),
+blank-row detection, lowercasing and the placeholder sanitizing. State and
+DOB normalization run once per distinct value (``pd.factorize``), placeholder
+``-N`` suffixes come from ``groupby().cumcount()``, duplicate maps from one
+stable sort per key column and missing-field detection from boolean masks.
+The cleaned CSV body is joined from the columns with Arrow kernels and written
+in one piece. Output and report match the loop backend byte for byte.
+
+Files the Arrow parser cannot take column-for-column (rows wider or narrower
+than the header, empty lines) are parsed with the ``csv`` module instead and
+cleaned the same way.
+
+The whole export is held in memory; requires pandas, numpy and pyarrow.
+"""
+
+import csv
+import io
+import sys
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+
+from csv_normalize import STATE
+from date_normalize import UNPARSED, parse_us_date
+
+PLACEHOLDER_STRIP_CHARS = (" ", "/", "#", "@", ",")
+STRING = pd.StringDtype("pyarrow")
+
+# Exactly the characters str.strip() removes; Arrow's own whitespace set differs.
+WHITESPACE = "".join(ch for ch in map(chr, range(sys.maxunicode + 1)) if ch.isspace())
+
+# Cleaned cells never hold line breaks, so only these force csv.QUOTE_MINIMAL quoting.
+_QUOTE_TRIGGERS = (",", '"')
+
+
+def _string_series(values, index: Optional[pd.Index] = None) -> pd.Series:
+    return pd.Series(pd.array(values, dtype=STRING), index=index)
+
+
+def _arrow(series: pd.Series):
+    """The series' Arrow data (usually a ChunkedArray) as large_string, without copying."""
+    return pa.array(series.array, type=pa.large_string())
+
+
+def _chunks(array) -> List[pa.Array]:
+    return array.chunks if isinstance(array, pa.ChunkedArray) else [array]
+
+
+def _may_contain(array, chars: Tuple[str, ...]) -> bool:
+    """False when no value can contain any of ``chars``: one byte scan of each chunk's data buffer."""
+    for chunk in _chunks(array):
+        data = chunk.buffers()[2]
+        if data is not None:
+            raw = data.to_pybytes()
+            if any(char.encode("utf-8") in raw for char in chars):
+                return True
+    return False
+
+
+def _empty_mask(array) -> np.ndarray:
+    return pc.equal(pc.binary_length(array), 0).to_numpy(zero_copy_only=False)
+
+
+def _is_empty(series: pd.Series) -> np.ndarray:
+    return _empty_mask(_arrow(series))
+
+
+def _scrub(array):
+    if _may_contain(array, ("\r", "\n")):
+        array = pc.replace_substring(pc.replace_substring(array, "\r", " "), "\n", " ")
+    return pc.utf8_trim(array, WHITESPACE)
+
+
+def _digits(values: np.ndarray) -> pa.Array:
+    return pc.cast(pa.array(values), pa.large_string())
+
+
+def _lower(series: pd.Series) -> pd.Series:
+    """``str.lower`` per value: an ASCII kernel, with Python's full case mapping for the rest."""
+    array = _arrow(series)
+    lowered = pc.ascii_lower(array)
+    non_ascii = pc.invert(pc.string_is_ascii(array)).to_numpy(zero_copy_only=False)
+    if not non_ascii.any():
+        return _string_series(lowered, series.index)
+    out = lowered.to_numpy(zero_copy_only=False)
+    out[non_ascii] = [value.lower() for value in out[non_ascii]]
+    return _string_series(out, series.index)
+
+
+def _read_arrow(path: Path, data_offset: int, raw_width: int) -> Optional[List[pa.ChunkedArray]]:
+    """Raw columns via pyarrow.csv, or None when some record is not exactly ``raw_width`` fields."""
+    names = [str(idx) for idx in range(raw_width)]
+    with path.open("rb") as fh:
+        fh.seek(data_offset)
+        try:
+            table = pa_csv.read_csv(
+                fh,
+                read_options=pa_csv.ReadOptions(column_names=names),
+                parse_options=pa_csv.ParseOptions(newlines_in_values=True, ignore_empty_lines=False),
+                convert_options=pa_csv.ConvertOptions(
+                    column_types={name: pa.large_string() for name in names},
+                    strings_can_be_null=False,
+                    quoted_strings_can_be_null=False,
+                ),
+            )
+        except pa.ArrowInvalid:
+            return None
+    return table.columns
+
+
+def _read_ragged(path: Path, data_offset: int, width: int) -> Tuple[List[pa.Array], np.ndarray]:
+    """Width-fitted raw columns via the csv module, plus a non-blank mask over all cells of each record."""
+    with path.open("rb") as fh:
+        fh.seek(data_offset)
+        text = fh.read().decode("utf-8")
+    rows = list(csv.reader(io.StringIO(text, newline="")))
+    # blank detection looks at every cell, including ones past the header width
+    nonblank = np.fromiter((any(cell.strip() for cell in row) for row in rows), dtype=bool, count=len(rows))
+    fitted = [row + [""] * (width - len(row)) if len(row) < width else row[:width] for row in rows]
+    columns = [pa.array(column, type=pa.large_string()) for column in zip(*fitted)]
+    return columns or [pa.array([], type=pa.large_string()) for _ in range(width)], nonblank
+
+
+def read_client_frame(path: Path, data_offset: int, raw_width: int, width: int) -> Tuple[pd.DataFrame, np.ndarray]:
+    """Scrubbed, width-fitted frame of the non-blank data records, plus each one's 0-based record index.
+
+    ``raw_width`` is the header row's field count; ``width`` the cleaned layout's
+    (one more when an Email column is added).
+    """
+    columns = _read_arrow(path, data_offset, raw_width) if path.stat().st_size > data_offset else None
+    if columns is None:
+        columns, nonblank = _read_ragged(path, data_offset, width)
+        columns = [_scrub(column) for column in columns]
+    else:
+        columns = [_scrub(column) for column in columns[:width]]
+        # scrubbing only trims and turns line breaks into spaces, so a cell is blank iff it scrubs to ""
+        nonblank = ~np.logical_and.reduce([_empty_mask(column) for column in columns])
+
+    positions = np.flatnonzero(nonblank)
+    if len(positions) < len(nonblank):
+        mask = pa.array(nonblank)
+        columns = [pc.filter(column, mask) for column in columns]
+    columns += [pa.array([""] * len(positions), type=pa.large_string()) for _ in range(width - len(columns))]
+    frame = pd.DataFrame({idx: _string_series(column) for idx, column in enumerate(columns)}, columns=range(width))
+    return frame, positions
+
+
+def _map_distinct(series: pd.Series, normalize: Callable[[str], str]) -> pd.Series:
+    codes, uniques = pd.factorize(series, sort=False)
+    mapped = pa.array([normalize(value) for value in uniques], type=pa.large_string())
+    return _string_series(mapped.take(pa.array(codes)), series.index)
+
+
+def _normalize_dob(series: pd.Series, formats: Optional[Dict[str, int]]) -> pd.Series:
+    codes, uniques = pd.factorize(series, sort=False)
+    parsed = [parse_us_date(value) if value else ("", None) for value in uniques]
+    if formats is not None:
+        counts = np.bincount(codes, minlength=len(uniques))
+        for value, (_, fmt), count in zip(uniques, parsed, counts.tolist()):
+            if value:
+                key = fmt or UNPARSED
+                formats[key] = formats.get(key, 0) + count
+    mapped = pa.array([normalized for normalized, _ in parsed], type=pa.large_string())
+    return _string_series(mapped.take(pa.array(codes)), series.index)
+
+
+def _group_duplicates(keys: pd.Series, row_nums: np.ndarray) -> Dict[str, List[int]]:
+    """Row numbers per key for keys seen more than once, in first-appearance order."""
+    codes, uniques = pd.factorize(keys, sort=False)
+    counts = np.bincount(codes, minlength=len(uniques))
+    repeated = counts[codes] > 1
+    codes = codes[repeated]
+    # codes number keys by first appearance; a stable sort keeps each key's rows in order
+    order = np.argsort(codes, kind="stable")
+    grouped = row_nums[repeated][order].tolist()
+    group_codes = np.flatnonzero(counts > 1)
+    ends = np.cumsum(counts[group_codes]).tolist()
+    return {
+        key: grouped[start:end]
+        for key, start, end in zip(uniques[group_codes].tolist(), [0, *ends[:-1]], ends)
+    }
+
+
+def clean_client_frame(
+    frame: pd.DataFrame,
+    row_nums: np.ndarray,
+    layout,
+    report,
+    placeholder_domain: str,
+    dob_formats: Optional[Dict[str, int]] = None,
+) -> pd.DataFrame:
+    """Clean the frame ``read_client_frame`` returns; fills ``report`` the way ``record_row`` would.
+
+    ``row_nums`` are the source row numbers of the frame's rows. Returns the
+    cleaned frame with positional (integer) columns in header order.
+    """
+    if frame.empty:
+        return frame
+
+    if layout.state_index is not None:
+        frame[layout.state_index] = _map_distinct(frame[layout.state_index], STATE)
+
+    if layout.dob_index is not None:
+        frame[layout.dob_index] = _normalize_dob(frame[layout.dob_index], dob_formats)
+
+    email_index = layout.email_index
+    if email_index is not None:
+        needs = _is_empty(frame[email_index])
+        if needs.any():
+            subset = frame.loc[needs]
+            row_label = "row" + _string_series(_digits(row_nums[needs]), subset.index)
+
+            if layout.client_id_index is not None:
+                base = subset[layout.client_id_index]
+            else:
+                base = _string_series([""] * len(subset), subset.index)
+            if layout.first_name_index is not None and layout.last_name_index is not None:
+                first = _lower(subset[layout.first_name_index]).str.replace(" ", "", regex=False)
+                last = _lower(subset[layout.last_name_index]).str.replace(" ", "", regex=False)
+                base = base.where(base.ne(""), (first + "." + last).str.strip("."))
+            base = base.where(base.ne(""), row_label)
+
+            sanitized = _lower(base)
+            for char in PLACEHOLDER_STRIP_CHARS:
+                sanitized = sanitized.str.replace(char, "", regex=False)
+            sanitized = sanitized.where(sanitized.ne(""), row_label)
+
+            occurrence = sanitized.groupby(sanitized, sort=False).cumcount()
+            suffix = "-" + _string_series(_digits(occurrence.to_numpy()), subset.index)
+            suffixed = sanitized.where(occurrence.eq(0), sanitized + suffix)
+            placeholders = suffixed + "@" + placeholder_domain
+            frame.loc[needs, email_index] = placeholders
+
+            report.placeholder_assignments = [
+                {"row": str(row_num), "email": placeholder}
+                for row_num, placeholder in zip(row_nums[needs].tolist(), placeholders.tolist())
+            ]
+        # placeholders are already lowercase, so one lower() keys both kinds
+        report.duplicate_emails = _group_duplicates(_lower(frame[email_index]), row_nums)
+    else:
+        report.missing_email_rows = row_nums.tolist()
+
+    if layout.client_id_index is not None:
+        client_ids = frame[layout.client_id_index]
+        present = ~_is_empty(client_ids)
+        report.duplicate_client_ids = _group_duplicates(client_ids[present], row_nums[present])
+
+    checks = [
+        (layout.first_name_index, "first_name"),
+        (layout.last_name_index, "last_name"),
+        (email_index, "email"),
+        (layout.dob_index, "date_of_birth"),
+    ]
+    checks = [(idx, name) for idx, name in checks if idx is not None]
+    if checks:
+        # bit i of a row's code is set when check i's field is empty
+        codes = np.zeros(len(frame), dtype=np.int64)
+        for bit, (idx, _) in enumerate(checks):
+            codes |= _is_empty(frame[idx]).astype(np.int64) << bit
+        fields = [
+            [name for bit, (_, name) in enumerate(checks) if code >> bit & 1] for code in range(1 << len(checks))
+        ]
+        missing = np.flatnonzero(codes)
+        report.missing_required_rows = [
+            {"row": row_num, "fields": list(fields[code])}
+            for row_num, code in zip(row_nums[missing].tolist(), codes[missing].tolist())
+        ]
+
+    report.rows_written = len(frame)
+    return frame
+
+
+def _literal(text: str) -> pa.Scalar:
+    return pa.scalar(text, type=pa.large_string())
+
+
+def _csv_field(series: pd.Series):
+    array = _arrow(series)
+    if not _may_contain(array, _QUOTE_TRIGGERS):
+        return array
+    needs_quotes = pc.or_(*(pc.match_substring(array, char) for char in _QUOTE_TRIGGERS))
+    escaped = pc.replace_substring(array, '"', '""')
+    quoted = pc.binary_join_element_wise(_literal('"'), escaped, _literal('"'), _literal(""))
+    return pc.if_else(needs_quotes, quoted, array)
+
+
+def write_frame_csv(path: Path, headers: List[str], frame: pd.DataFrame) -> None:
+    """Write the cleaned frame as csv.writer would (QUOTE_MINIMAL, ``\\r\\n`` line ends)."""
+    header = io.StringIO()
+    csv.writer(header).writerow(headers)
+    with path.open("wb") as dst:
+        dst.write(header.getvalue().encode("utf-8"))
+        if frame.empty:
+            return
+        lines = pc.binary_join_element_wise(*(_csv_field(frame[idx]) for idx in frame.columns), _literal(","))
+        lines = pc.binary_join_element_wise(lines, _literal(""), _literal("\r\n"))
+        # a string array's data buffer holds its values back to back: the CSV body
+        for chunk in _chunks(lines):
+            offsets = np.frombuffer(chunk.buffers()[1], dtype=np.int64)[chunk.offset : chunk.offset + len(chunk) + 1]
+            if len(offsets):
+                dst.write(memoryview(chunk.buffers()[2])[offsets[0] : offsets[-1]])
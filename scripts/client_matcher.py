@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""Link normalized authorization records to client ids in the cleaned roster.
+
+The roster (data/client_cleaned.csv) is indexed in memory into blocks keyed by
+the Soundex code of the last name, the first initial and the city. A
+hyphenated or multi-word last name is indexed under the whole name and under
+each part, so "Kansara-Silva" is also found as "Silva". A record is scored
+only against the clients in its block. The city is dropped from the key when
+the record has no city or nothing in its city block scores high enough.
+
+A candidate's score weighs three parts:
+- similarity of the last names (0.55): bigram Dice, or the Levenshtein
+  ratio when that is higher, since one typo in a short name costs many bigrams
+- bigram similarity of the first names (0.35)
+- whether the cities are equal (0.10)
+
+Bigram sets are built once per roster client, and every distinct
+(first, last, city) is scored once. A record gets the best candidate's
+``client_id`` only when:
+- the best score reaches ``--min-confidence``, and
+- no other client scores within AMBIGUITY_MARGIN of it (siblings with
+  near-identical names stay unlinked).
+
+``match_status`` says which case applied.
+
+Usage:
+    python scripts/client_matcher.py data/client_authorizations.json \\
+        [--roster data/client_cleaned.csv] [--output data/client_authorizations_matched.json] [--min-confidence 0.85]
+"""
+
+import argparse
+import csv
+import json
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from auth_batches import iter_records
+
+ROSTER_PATH = Path("data/client_cleaned.csv")
+OUTPUT_PATH = Path("data/client_authorizations_matched.json")
+DEFAULT_MIN_CONFIDENCE = 0.85
+AMBIGUITY_MARGIN = 0.02
+LAST_NAME_WEIGHT = 0.55
+FIRST_NAME_WEIGHT = 0.35
+CITY_WEIGHT = 0.10
+
+_SOUNDEX_DIGITS = {
+    letter: digit
+    for digit, letters in (("1", "BFPV"), ("2", "CGJKQSXZ"), ("3", "DT"), ("4", "L"), ("5", "MN"), ("6", "R"))
+    for letter in letters
+}
+
+AuthRecord = Dict[str, object]
+NameKey = Tuple[str, str, str]
+
+
+def normalize_name(value: object) -> str:
+    """Lowercase ASCII letters and single spaces: accents stripped, punctuation and digits dropped."""
+    if value is None:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", str(value))
+    letters = "".join(ch if ch.isalpha() and ch.isascii() else " " for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(letters.lower().split())
+
+
+def soundex(name: str) -> str:
+    """American Soundex of a normalized name ("" when it has no letters)."""
+    letters = name.replace(" ", "").upper()
+    if not letters:
+        return ""
+    code = letters[0]
+    previous = _SOUNDEX_DIGITS.get(letters[0], "")
+    for letter in letters[1:]:
+        digit = _SOUNDEX_DIGITS.get(letter, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # H and W do not separate letters with the same code; vowels do
+        if letter not in "HW":
+            previous = digit
+    return code.ljust(4, "0")
+
+
+def last_name_keys(last: str) -> Set[str]:
+    keys = {soundex(last)}
+    parts = last.split()
+    if len(parts) > 1:
+        keys.update(soundex(part) for part in parts)
+    keys.discard("")
+    return keys
+
+
+def bigrams(text: str) -> FrozenSet[str]:
+    padded = f" {text} "
+    return frozenset(padded[i:i + 2] for i in range(len(padded) - 1))
+
+
+def dice(left: FrozenSet[str], right: FrozenSet[str]) -> float:
+    if not left or not right:
+        return 0.0
+    return 2 * len(left & right) / (len(left) + len(right))
+
+
+def edit_similarity(left: str, right: str) -> float:
+    """1 - Levenshtein distance / longer length; kinder than bigrams to one typo in a short name."""
+    if not left or not right:
+        return 0.0
+    previous = list(range(len(right) + 1))
+    for i, left_char in enumerate(left, 1):
+        current = [i]
+        for j, right_char in enumerate(right, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (left_char != right_char)))
+        previous = current
+    return 1 - previous[-1] / max(len(left), len(right))
+
+
+@dataclass
+class RosterClient:
+    client_id: str
+    first: str
+    middle: str
+    last: str
+    city: str
+    last_grams: FrozenSet[str] = field(init=False, repr=False)
+    first_grams: Tuple[FrozenSet[str], ...] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.last_grams = bigrams(self.last)
+        forms = dict.fromkeys([self.first, f"{self.first} {self.middle}".strip()])
+        self.first_grams = tuple(bigrams(form) for form in forms if form)
+
+
+@dataclass
+class Match:
+    client_id: Optional[str]
+    confidence: float
+    status: str
+    candidates: int
+
+
+@dataclass
+class MatchStats:
+    records: int = 0
+    distinct_names: int = 0
+    matched: int = 0
+    ambiguous: int = 0
+    low_confidence: int = 0
+    unmatched: int = 0
+    candidates_scored: int = 0
+
+    def summary(self) -> str:
+        per_name = self.candidates_scored / self.distinct_names if self.distinct_names else 0.0
+        return (
+            f"records={self.records} distinct_names={self.distinct_names} matched={self.matched} "
+            f"ambiguous={self.ambiguous} low_confidence={self.low_confidence} unmatched={self.unmatched} "
+            f"candidates_per_name={per_name:.1f}"
+        )
+
+
+def name_key(first_name: object, last_name: object, city: object) -> NameKey:
+    return (normalize_name(first_name), normalize_name(last_name), normalize_name(city))
+
+
+class ClientIndex:
+    """Blocked in-memory index over the cleaned client roster."""
+
+    def __init__(self, clients: Iterable[RosterClient], min_confidence: float = DEFAULT_MIN_CONFIDENCE) -> None:
+        self.clients: List[RosterClient] = list(clients)
+        self.min_confidence = min_confidence
+        self._blocks: Dict[Tuple[str, str, str], List[int]] = {}
+        self._loose_blocks: Dict[Tuple[str, str], List[int]] = {}
+        self._matches: Dict[NameKey, Match] = {}
+        for position, client in enumerate(self.clients):
+            initial = client.first[:1]
+            for key in last_name_keys(client.last):
+                self._blocks.setdefault((key, initial, client.city), []).append(position)
+                self._loose_blocks.setdefault((key, initial), []).append(position)
+
+    @classmethod
+    def from_csv(cls, path: Path, min_confidence: float = DEFAULT_MIN_CONFIDENCE) -> "ClientIndex":
+        with path.open("r", encoding="utf-8-sig", newline="") as src:
+            reader = csv.reader(src)
+            header = next(reader)
+            # the export repeats "Client ID#"; the first one is the roster id
+            id_index, first_index, middle_index, last_index, city_index = (
+                header.index(name) for name in ("Client ID#", "First Name", "Middle Name", "Last Name", "City")
+            )
+            clients = [
+                RosterClient(
+                    row[id_index].strip(),
+                    normalize_name(row[first_index]),
+                    normalize_name(row[middle_index]),
+                    normalize_name(row[last_index]),
+                    normalize_name(row[city_index]),
+                )
+                for row in reader
+                if len(row) > max(id_index, last_index, city_index) and row[id_index].strip()
+            ]
+        return cls(clients, min_confidence)
+
+    def candidates(self, first: str, last: str, city: str, with_city: bool = True) -> List[int]:
+        """Roster positions in the query's blocks, narrowed by city when ``with_city``."""
+        initial = first[:1]
+        keys = last_name_keys(last)
+        if with_city:
+            return sorted({pos for key in keys for pos in self._blocks.get((key, initial, city), ())})
+        return sorted({pos for key in keys for pos in self._loose_blocks.get((key, initial), ())})
+
+    def score(self, first: str, last: str, city: str, client: RosterClient) -> float:
+        first_grams = bigrams(first)
+        first_similarity = max((dice(first_grams, grams) for grams in client.first_grams), default=0.0)
+        if " " in first and client.first_grams:
+            # "Maria Elena" against a roster first name of "Maria"
+            first_similarity = max(first_similarity, dice(bigrams(first.split()[0]), client.first_grams[0]))
+        last_similarity = dice(bigrams(last), client.last_grams)
+        if last_similarity < 1:
+            last_similarity = max(last_similarity, edit_similarity(last, client.last))
+        return (
+            LAST_NAME_WEIGHT * last_similarity
+            + FIRST_NAME_WEIGHT * first_similarity
+            + (CITY_WEIGHT if city and city == client.city else 0.0)
+        )
+
+    def match(self, first_name: object, last_name: object, city: object) -> Match:
+        key = name_key(first_name, last_name, city)
+        cached = self._matches.get(key)
+        if cached is None:
+            cached = self._matches[key] = self._match(*key)
+        return cached
+
+    def _scored(self, first: str, last: str, city: str, positions: List[int]) -> List[Tuple[float, str]]:
+        return sorted(
+            ((self.score(first, last, city, self.clients[pos]), self.clients[pos].client_id) for pos in positions),
+            reverse=True,
+        )
+
+    def _match(self, first: str, last: str, city: str) -> Match:
+        if not first or not last:
+            return Match(None, 0.0, "unmatched", 0)
+        positions = self.candidates(first, last, city) if city else []
+        scored = self._scored(first, last, city, positions)
+        if not scored or scored[0][0] < self.min_confidence:
+            # the client may have moved, or the row's city may be off
+            positions = self.candidates(first, last, city, with_city=False)
+            scored = self._scored(first, last, city, positions)
+        if not scored:
+            return Match(None, 0.0, "unmatched", 0)
+        best_score, best_id = scored[0]
+        confidence = round(best_score, 3)
+        runner_up = next((score for score, client_id in scored[1:] if client_id != best_id), 0.0)
+        if best_score < self.min_confidence:
+            return Match(None, confidence, "low_confidence", len(positions))
+        if best_score - runner_up < AMBIGUITY_MARGIN:
+            return Match(None, confidence, "ambiguous", len(positions))
+        return Match(best_id, confidence, "matched", len(positions))
+
+
+def match_records(records: Iterable[AuthRecord], index: ClientIndex) -> Tuple[List[AuthRecord], MatchStats]:
+    """Records with ``client_id``, ``match_confidence`` and ``match_status`` added."""
+    stats = MatchStats()
+    matched: List[AuthRecord] = []
+    seen: Set[NameKey] = set()
+    for record in records:
+        key = name_key(record.get("first_name"), record.get("last_name"), record.get("city"))
+        result = index.match(*key)
+        if key not in seen:
+            seen.add(key)
+            stats.distinct_names += 1
+            stats.candidates_scored += result.candidates
+        stats.records += 1
+        setattr(stats, result.status, getattr(stats, result.status) + 1)
+        matched.append(
+            {**record, "client_id": result.client_id, "match_confidence": result.confidence, "match_status": result.status}
+        )
+    return matched, stats
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Link authorization records to client ids in the cleaned roster.")
+    parser.add_argument("source", type=Path, help="JSON array or JSON Lines file of normalized authorization records")
+    parser.add_argument("--roster", type=Path, default=ROSTER_PATH, help=f"cleaned client CSV (default: {ROSTER_PATH})")
+    parser.add_argument("--output", type=Path, default=OUTPUT_PATH, help=f"matched JSON (default: {OUTPUT_PATH})")
+    parser.add_argument(
+        "--min-confidence", type=float, default=DEFAULT_MIN_CONFIDENCE, help="lowest score that links a record (0-1)"
+    )
+    parser.add_argument("--indent", type=int, help="pretty-print the output with this indent (default: compact)")
+    args = parser.parse_args()
+    if not 0 <= args.min_confidence <= 1:
+        parser.error("--min-confidence must be between 0 and 1")
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    started = time.perf_counter()
+    index = ClientIndex.from_csv(args.roster, args.min_confidence)
+    records, stats = match_records(iter_records(args.source), index)
+
+    separators: Optional[Tuple[str, str]] = None if args.indent is not None else (",", ":")
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(
+        json.dumps(records, ensure_ascii=True, indent=args.indent, separators=separators), encoding="utf-8"
+    )
+    print(
+        f"roster={len(index.clients)} {stats.summary()} file={args.output} "
+        f"seconds={time.perf_counter() - started:.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Optional Arrow IPC / Parquet output for the CSV cleaners.
+
+Rows are buffered and written as record batches, so this keeps up with the
+cleaners' streaming output. Typed columns: dates become ``date32`` (unparseable
+or empty values become null), categorical columns are dictionary-encoded and
+everything else stays a string exactly as written to the CSV.
+
+Arrow IPC files (``.arrow``) can be memory-mapped by loaders::
+
+    with pa.memory_map("data/client_cleaned.arrow") as source:
+        table = pa.ipc.open_file(source).read_all()
+
+Requires ``pyarrow``; it is imported only when columnar output is requested.
+"""
+
+import csv
+from contextlib import ExitStack
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from date_normalize import parse_us_date
+
+COLUMNAR_FORMATS = ("arrow", "parquet")
+
+# Header -> column kind; headers not listed are plain strings.
+COLUMN_KINDS: Dict[str, str] = {
+    "DOB": "date",
+    "State": "category",
+    "Email": "string",
+}
+
+BATCH_ROWS = 65536
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as exc:
+        raise RuntimeError("Columnar output requires pyarrow (pip install pyarrow).") from exc
+    return pyarrow
+
+
+def unique_column_names(headers: List[str]) -> List[str]:
+    """Suffix repeated headers (``Client ID#`` appears twice in client exports) as ``name.1``, ``name.2``."""
+    seen: Dict[str, int] = {}
+    names: List[str] = []
+    for header in headers:
+        count = seen.get(header, 0)
+        seen[header] = count + 1
+        names.append(header if count == 0 else f"{header}.{count}")
+    return names
+
+
+def to_date(value: str) -> Optional[date]:
+    """Accept the cleaners' ISO output as well as raw ``MM/DD/YYYY`` / ``MM/DD/YY`` values."""
+    if not value:
+        return None
+    normalized = parse_us_date(value)[0]
+    try:
+        return date.fromisoformat(normalized)
+    except ValueError:
+        return None
+
+
+class ColumnarWriter:
+    """Streams cleaned rows into an Arrow IPC file or a Parquet file."""
+
+    def __init__(self, path: Path, headers: List[str], fmt: str, kinds: Dict[str, str] = COLUMN_KINDS) -> None:
+        if fmt not in COLUMNAR_FORMATS:
+            raise ValueError(f"Unsupported columnar format: {fmt}")
+        pa = _require_pyarrow()
+        self._pa = pa
+        self._kinds = [kinds.get(header, "string") for header in headers]
+        # Categories only ever grow, so later batches carry dictionary deltas
+        # rather than replacements (the IPC file format rejects replacements).
+        self._categories: List[Dict[str, int]] = [{} for _ in headers]
+        self._buffer: List[List[str]] = []
+
+        types = {
+            "date": pa.date32(),
+            "category": pa.dictionary(pa.int32(), pa.string()),
+            "string": pa.string(),
+        }
+        self.schema = pa.schema(
+            [pa.field(name, types[kind]) for name, kind in zip(unique_column_names(headers), self._kinds)]
+        )
+
+        self._fmt = fmt
+        if fmt == "arrow":
+            options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+            self._writer = pa.ipc.new_file(str(path), self.schema, options=options)
+        else:
+            import pyarrow.parquet as pq
+
+            self._writer = pq.ParquetWriter(str(path), self.schema)
+
+    def write_row(self, row: List[str]) -> None:
+        self._buffer.append(row)
+        if len(self._buffer) >= BATCH_ROWS:
+            self.flush()
+
+    def write_rows(self, rows: List[List[str]]) -> None:
+        for row in rows:
+            self.write_row(row)
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        pa = self._pa
+        arrays = []
+        for idx, (column, kind) in enumerate(zip(zip(*self._buffer), self._kinds)):
+            if kind == "date":
+                arrays.append(pa.array([to_date(value) for value in column], type=pa.date32()))
+            elif kind == "category":
+                categories = self._categories[idx]
+                indices = [
+                    categories.setdefault(value, len(categories)) if value else None for value in column
+                ]
+                arrays.append(
+                    pa.DictionaryArray.from_arrays(
+                        pa.array(indices, type=pa.int32()), pa.array(list(categories), type=pa.string())
+                    )
+                )
+            else:
+                arrays.append(pa.array(column, type=pa.string()))
+        batch = pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+        if self._fmt == "arrow":
+            self._writer.write_batch(batch)
+        else:
+            self._writer.write_table(pa.Table.from_batches([batch]))
+        self._buffer = []
+
+    def close(self) -> None:
+        self.flush()
+        self._writer.close()
+
+    def __enter__(self) -> "ColumnarWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def write_cleaned_outputs(
+    csv_path: Path,
+    headers: List[str],
+    rows: Iterable[List[str]],
+    columnar_format: Optional[str] = None,
+    write_csv: bool = True,
+) -> None:
+    """Write cleaned rows to the CSV and/or a columnar file next to it (``csv_path`` with the format's suffix)."""
+    if not columnar_format:
+        with csv_path.open("w", encoding="utf-8", newline="") as dst:
+            writer = csv.writer(dst)
+            writer.writerow(headers)
+            writer.writerows(rows)
+        return
+
+    with ExitStack() as stack:
+        columnar = stack.enter_context(
+            ColumnarWriter(csv_path.with_suffix(f".{columnar_format}"), headers, columnar_format)
+        )
+        writer = None
+        if write_csv:
+            dst = stack.enter_context(csv_path.open("w", encoding="utf-8", newline=""))
+            writer = csv.writer(dst)
+            writer.writerow(headers)
+        for row in rows:
+            if writer is not None:
+                writer.writerow(row)
+            columnar.write_row(row)
@@ -0,0 +1,198 @@
+"""Cell normalizers shared by the client and staff CSV cleaners.
+
+Every normalizer is a ``ColumnNormalizer``: callable on a single value and
+exposing ``normalize_column(values)`` for a whole column at once, which is how
+the cleaners drive them. Normalizers whose inputs repeat heavily (state names,
+phone numbers) memoize on the raw value. ``track()`` turns on per-call counters
+for ``--timings``.
+"""
+
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional
+
+from date_normalize import UNPARSED, parse_us_date
+
+STATE_MAP = {
+    "ALABAMA": "AL",
+    "ALASKA": "AK",
+    "ARIZONA": "AZ",
+    "ARKANSAS": "AR",
+    "CALIFORNIA": "CA",
+    "COLORADO": "CO",
+    "CONNECTICUT": "CT",
+    "DELAWARE": "DE",
+    "DISTRICT OF COLUMBIA": "DC",
+    "FLORIDA": "FL",
+    "GEORGIA": "GA",
+    "HAWAII": "HI",
+    "IDAHO": "ID",
+    "ILLINOIS": "IL",
+    "INDIANA": "IN",
+    "IOWA": "IA",
+    "KANSAS": "KS",
+    "KENTUCKY": "KY",
+    "LOUISIANA": "LA",
+    "MAINE": "ME",
+    "MARYLAND": "MD",
+    "MASSACHUSETTS": "MA",
+    "MICHIGAN": "MI",
+    "MINNESOTA": "MN",
+    "MISSISSIPPI": "MS",
+    "MISSOURI": "MO",
+    "MONTANA": "MT",
+    "NEBRASKA": "NE",
+    "NEVADA": "NV",
+    "NEW HAMPSHIRE": "NH",
+    "NEW JERSEY": "NJ",
+    "NEW MEXICO": "NM",
+    "NEW YORK": "NY",
+    "NORTH CAROLINA": "NC",
+    "NORTH DAKOTA": "ND",
+    "OHIO": "OH",
+    "OKLAHOMA": "OK",
+    "OREGON": "OR",
+    "PENNSYLVANIA": "PA",
+    "RHODE ISLAND": "RI",
+    "SOUTH CAROLINA": "SC",
+    "SOUTH DAKOTA": "SD",
+    "TENNESSEE": "TN",
+    "TEXAS": "TX",
+    "UTAH": "UT",
+    "VERMONT": "VT",
+    "VIRGINIA": "VA",
+    "WASHINGTON": "WA",
+    "WEST VIRGINIA": "WV",
+    "WISCONSIN": "WI",
+    "WYOMING": "WY",
+}
+
+NORMALIZER_CACHE_SIZE = 16384
+
+_LINE_BREAK_TABLE = str.maketrans({"\r": " ", "\n": " "})
+
+# Every ASCII byte except digits and "+"; phone cleanup is a single bytes.translate.
+_PHONE_DELETE_BYTES = bytes(c for c in range(128) if chr(c) not in "0123456789+")
+_PHONE_CHARS = frozenset("0123456789+")
+
+
+@dataclass
+class NormalizerStats:
+    calls: int = 0
+    seconds: float = 0.0
+
+
+class ColumnNormalizer:
+    """A single-value normalizer with a whole-column batch API."""
+
+    def __init__(self, normalize: Callable[[str], str], cache_size: Optional[int] = None) -> None:
+        self._normalize = lru_cache(maxsize=cache_size)(normalize) if cache_size else normalize
+        self.stats: Optional[NormalizerStats] = None
+
+    def __call__(self, value: str) -> str:
+        return self._normalize(value)
+
+    def track(self) -> NormalizerStats:
+        """Count values and time spent in ``normalize_column`` from now on."""
+        self.stats = NormalizerStats()
+        return self.stats
+
+    def cache_info(self):
+        return self._normalize.cache_info() if hasattr(self._normalize, "cache_info") else None
+
+    def _timed(self, normalize_column: Callable[..., List[str]], values: Iterable[str], *args) -> List[str]:
+        started = time.perf_counter()
+        out = normalize_column(values, *args)
+        self.stats.calls += len(out)
+        self.stats.seconds += time.perf_counter() - started
+        return out
+
+    def _map(self, values: Iterable[str]) -> List[str]:
+        return list(map(self._normalize, values))
+
+    def normalize_column(self, values: Iterable[str]) -> List[str]:
+        if self.stats is None:
+            return self._map(values)
+        return self._timed(self._map, values)
+
+
+def _scrub(value: str) -> str:
+    # most cells carry no line breaks; skip the translate for them
+    if "\r" in value or "\n" in value:
+        value = value.translate(_LINE_BREAK_TABLE)
+    return value.strip()
+
+
+def _state(value: str) -> str:
+    trimmed = value.strip()
+    if not trimmed:
+        return ""
+    if len(trimmed) == 2:
+        return trimmed.upper()
+    return STATE_MAP.get(trimmed.upper(), trimmed)
+
+
+def _phone(value: str) -> str:
+    if not value:
+        return ""
+    if value.isascii():
+        cleaned = value.encode("ascii").translate(None, _PHONE_DELETE_BYTES).decode("ascii")
+    else:
+        cleaned = "".join(ch for ch in value if ch in _PHONE_CHARS)
+    # collapse leading zeros if phone started with +0...
+    if cleaned.startswith("00"):
+        cleaned = "+" + cleaned[2:]
+    return cleaned
+
+
+def _email(value: str) -> str:
+    return value.strip().lower()
+
+
+class DateColumnNormalizer(ColumnNormalizer):
+    """US date column normalizer that can also tally which format each value matched."""
+
+    def __init__(self) -> None:
+        super().__init__(self._date)
+
+    @staticmethod
+    def _date(value: str) -> str:
+        if not value:
+            return ""
+        return parse_us_date(value)[0]
+
+    def cache_info(self):
+        return parse_us_date.cache_info()
+
+    def normalize_column(self, values: Iterable[str], formats: Optional[Dict[str, int]] = None) -> List[str]:
+        if formats is None:
+            return super().normalize_column(values)
+        if self.stats is None:
+            return self._tally(values, formats)
+        return self._timed(self._tally, values, formats)
+
+    @staticmethod
+    def _tally(values: Iterable[str], formats: Dict[str, int]) -> List[str]:
+        out: List[str] = []
+        for value in values:
+            if not value:
+                out.append("")
+                continue
+            normalized, fmt = parse_us_date(value)
+            key = fmt or UNPARSED
+            formats[key] = formats.get(key, 0) + 1
+            out.append(normalized)
+        return out
+
+
+SCRUB = ColumnNormalizer(_scrub)
+STRIP = ColumnNormalizer(str.strip)
+STATE = ColumnNormalizer(_state, cache_size=NORMALIZER_CACHE_SIZE)
+PHONE = ColumnNormalizer(_phone, cache_size=NORMALIZER_CACHE_SIZE)
+EMAIL = ColumnNormalizer(_email)
+DATE = DateColumnNormalizer()
+
+scrub_cell = SCRUB
+normalize_state = STATE
+normalize_phone = PHONE
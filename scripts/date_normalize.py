@@ -0,0 +1,98 @@
+"""Shared date normalization for the CSV cleaners and authorization normalizers.
+
+Raw exports repeat a small set of distinct date strings across many rows, so
+parsing is memoized on the raw value. ``MM/DD/YYYY`` and ``MM/DD/YY`` are
+matched with a single regex and converted with ``int`` instead of looping over
+``datetime.strptime`` formats; results are identical to that loop.
+"""
+
+import re
+from datetime import date
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+DATE_CACHE_SIZE = 8192
+
+US_DATE_FORMATS = ("%m/%d/%Y", "%m/%d/%y")
+UNPARSED = "unparsed"
+
+# Same alternations strptime compiles for %m, %d, %Y and %y, so anything accepted
+# here is accepted by the strptime loop and vice versa.
+_US_DATE_RE = re.compile(
+    r"(1[0-2]|0[1-9]|[1-9])/(3[01]|[12]\d|0[1-9]|[1-9]| [1-9])/(?:(\d\d\d\d)|(\d\d))"
+)
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_us_date(value: str) -> Tuple[str, Optional[str]]:
+    """Return ``(normalized, matched_format)`` for a trimmed ``MM/DD/YYYY`` or ``MM/DD/YY`` value.
+
+    ``normalized`` is the ISO date, or ``value`` unchanged when no format applies
+    (``matched_format`` is then ``None``). Two-digit years pivot like ``%y``:
+    69-99 map to the 1900s, 00-68 to the 2000s.
+    """
+    match = _US_DATE_RE.fullmatch(value)
+    if match is None:
+        return value, None
+
+    month, day, long_year, short_year = match.groups()
+    if long_year is not None:
+        fmt = US_DATE_FORMATS[0]
+        year = int(long_year)
+    else:
+        fmt = US_DATE_FORMATS[1]
+        year = int(short_year)
+        year += 1900 if year >= 69 else 2000
+
+    try:
+        parsed = date(year, int(month), int(day))
+    except ValueError:
+        return value, None
+
+    if year < 1000:
+        # strftime does not zero-pad years below 1000; keep its output
+        return parsed.strftime("%Y-%m-%d"), fmt
+    return f"{year:04d}-{parsed.month:02d}-{parsed.day:02d}", fmt
+
+
+def normalize_us_date(value: str, formats: Optional[Dict[str, int]] = None) -> str:
+    """Normalize a trimmed date string, optionally tallying the format it matched into ``formats``."""
+    normalized, fmt = parse_us_date(value)
+    if formats is not None:
+        key = fmt or UNPARSED
+        formats[key] = formats.get(key, 0) + 1
+    return normalized
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_slash_date(
+    value: str, century: int = 2000, min_year: Optional[int] = None, max_year: Optional[int] = None
+) -> Optional[str]:
+    """Lenient ``M/D/Y`` parser used for authorization date ranges.
+
+    Each part goes through ``int`` (so surrounding spaces are tolerated), years
+    below 100 are offset by ``century`` and years outside ``[min_year, max_year]``
+    are rejected. Returns the ISO date or ``None``.
+    """
+    parts = value.split("/")
+    if len(parts) != 3:
+        return None
+    try:
+        month, day, year = (int(part) for part in parts)
+        if year < 100:
+            year += century
+        if min_year is not None and year < min_year:
+            return None
+        if max_year is not None and year > max_year:
+            return None
+        return date(year, month, day).isoformat()
+    except (ValueError, OverflowError):
+        return None
+
+
+def dominant_format(formats: Dict[str, int]) -> Optional[str]:
+    """Most frequent parsed format in a tally, ignoring unparsed values."""
+    parsed = {fmt: count for fmt, count in formats.items() if fmt != UNPARSED}
+    if not parsed:
+        return None
+    return max(parsed, key=lambda fmt: parsed[fmt])
@@ -0,0 +1,516 @@
+"""Sidecar index that lets the CSV cleaners re-clean only the records that changed.
+
+The sidecar is a directory next to the cleaned CSV (``<cleaned>.index/``)
+holding one entry per raw record ever cleaned:
+
+* ``raw`` - the record's raw bytes, exactly as they appeared in the export;
+* ``out`` - the cleaned CSV line written for it;
+* ``meta`` - per entry, the end offsets into ``raw`` and ``out`` plus two
+  cleaner-defined ints (where a late-bound cell is spliced in, and flags);
+* ``state.json`` - the entry order of the last run and the keys of the
+  cleaner's key maps (e.g. email -> entries) that have more than one entry;
+* ``<map>.<generation>.keys`` / ``.ids`` - every other key of each map, one
+  per line, and its single entry. Most keys are unique, and flat files load
+  far faster than the same keys in JSON.
+
+``state.json`` and the key files are rewritten on every run; the generation
+in the key file names is the one ``state.json`` points at.
+
+``raw``, ``out`` and ``meta`` are append-only: a run appends entries for new
+or edited records and leaves every other byte alone.
+
+``align`` walks the new export against the stored raw bytes of the previous
+order. Unchanged runs of records are matched as whole byte ranges, so they are
+never split into rows, parsed or hashed; only around an edit are records split
+out to find where the two line up again. Key maps store entry ids rather than
+row numbers, so an insertion does not touch them: callers ``unlink``/``link``
+the keys of removed and added entries, and only those keys are re-sorted.
+Row numbers are computed from the new order when the report is written.
+"""
+
+import csv
+import io
+import json
+import re
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from itertools import chain
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from columnar_output import write_cleaned_outputs
+
+# Bump when a normalizer's output changes so stale sidecars are ignored.
+INDEX_VERSION = "3"
+
+# Entry flag shared by the cleaners: the record is blank and produced no output.
+BLANK = 1
+
+# Records compared per side when looking for the realignment after an edit; doubles until found.
+RESYNC_WINDOW = 16
+
+# meta holds (raw_end, out_end, cut, flags) per entry.
+META_FIELDS = 4
+
+# An escaped character in a key file: backslash-n for a newline, a doubled backslash for a backslash.
+KEY_ESCAPE = re.compile(r"\\(.)")
+
+
+def sidecar_path(clean_path: Path) -> Path:
+    return clean_path.with_suffix(".index")
+
+
+def join_keys(keys: Sequence[str]) -> str:
+    """``keys`` one per line, with backslashes and newlines escaped when any key has one."""
+    text = "\n".join(keys)
+    if "\\" in text or text.count("\n") != max(len(keys) - 1, 0):
+        text = "\n".join(key.replace("\\", "\\\\").replace("\n", "\\n") for key in keys)
+    return text
+
+
+def unescape_key(match: "re.Match[str]") -> str:
+    return "\n" if match.group(1) == "n" else match.group(1)
+
+
+def split_keys(text: str, count: int) -> List[str]:
+    """The ``count`` keys ``join_keys`` wrote to ``text``."""
+    keys = text.split("\n") if count else []
+    if "\\" in text:
+        keys = [KEY_ESCAPE.sub(unescape_key, key) if "\\" in key else key for key in keys]
+    return keys
+
+
+def header_offset(
+    path: Path, is_header: Callable[[List[str]], bool]
+) -> Optional[Tuple[int, List[str], int]]:
+    """Find the first row matching ``is_header`` without a text-mode reader, so the data's byte offset is known.
+
+    Returns ``(header_idx, header_row, data_offset)``, or None if no row matches.
+    """
+    with path.open("rb") as fh:
+        if fh.read(3) != b"\xef\xbb\xbf":
+            fh.seek(0)
+        idx = 0
+        record = b""
+        for line in fh:
+            record += line
+            if record.count(b'"') % 2:
+                continue
+            text = record.decode("utf-8")
+            record = b""
+            for row in csv.reader(io.StringIO(text, newline="")):
+                if is_header(row):
+                    return idx, row, fh.tell()
+                idx += 1
+    return None
+
+
+def record_end(data: bytes, start: int) -> int:
+    """End of the CSV record starting at ``start``: the first newline after an even number of quotes."""
+    end = start
+    quotes = 0
+    while True:
+        newline = data.find(b"\n", end)
+        if newline < 0:
+            return len(data)
+        quotes += data.count(b'"', end, newline)
+        end = newline + 1
+        if quotes % 2 == 0:
+            return end
+
+
+def parse_records(records: List[bytes]) -> List[List[str]]:
+    """Parse raw records, one row each."""
+    rows = list(csv.reader(io.StringIO(b"".join(records).decode("utf-8"), newline="")))
+    if len(rows) != len(records):
+        # e.g. a bare CR ending a record, which the csv module splits on but the byte walk does not
+        raise ValueError("--incremental needs one CSV row per record in the export; rerun without --incremental")
+    return rows
+
+
+def format_rows(rows: List[List[str]]) -> List[bytes]:
+    """Each row as the bytes ``csv.writer`` writes for it, line terminator included."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # writerow returns what the one write() call of the row returned: its length in characters
+    lengths = [writer.writerow(row) for row in rows]
+    text = buffer.getvalue()
+    lines: List[bytes] = []
+    pos = 0
+    for length in lengths:
+        lines.append(text[pos : pos + length].encode("utf-8"))
+        pos += length
+    return lines
+
+
+def csv_field(value: str) -> str:
+    """``value`` as ``csv.writer`` writes a field of a multi-field row."""
+    if any(char in value for char in ',"\r\n'):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+def write_rendered_outputs(
+    csv_path: Path,
+    headers: List[str],
+    body: Iterable[bytes],
+    columnar_format: Optional[str] = None,
+    write_csv: bool = True,
+) -> None:
+    """``write_cleaned_outputs`` for a CSV body that is already rendered to bytes."""
+    header = format_rows([headers])[0]
+    if not columnar_format:
+        with csv_path.open("wb") as dst:
+            dst.write(header)
+            dst.writelines(body)
+        return
+
+    data = b"".join(body)
+    if write_csv:
+        with csv_path.open("wb") as dst:
+            dst.write(header)
+            dst.write(data)
+    rows = csv.reader(io.StringIO(data.decode("utf-8"), newline=""))
+    write_cleaned_outputs(csv_path, headers, rows, columnar_format=columnar_format, write_csv=False)
+
+
+@dataclass
+class IncrementalStats:
+    reused: int = 0
+    cleaned: int = 0
+    removed: int = 0
+
+    def summary(self) -> str:
+        return f"reused={self.reused} cleaned={self.cleaned} removed={self.removed}"
+
+
+class IncrementalIndex:
+    """The previous run's entries, their new order after ``align`` and the cleaner's key maps."""
+
+    def __init__(self, path: Path, headers: List[str], map_names: Sequence[str]) -> None:
+        self.path = path
+        self.headers = headers
+        self.stats = IncrementalStats()
+        state = self._load_state(map_names)
+        live = sum(count for _, count in state["segments"]) if state else 0
+        # once most stored entries are dead, start over instead of carrying them forever
+        if state is not None and state["entries"] > 2 * live + RESYNC_WINDOW:
+            state = None
+        self._fresh = state is None
+
+        self._old_entries = state["entries"] if state else 0
+        self._old_segments: List[Tuple[int, int]] = [tuple(seg) for seg in state["segments"]] if state else []
+        self._raw = (path / "raw").read_bytes()[: state["raw_size"]] if state else b""
+        self._out = (path / "out").read_bytes()[: state["out_size"]] if state else b""
+        meta = array("q")
+        if state:
+            meta.frombytes((path / "meta").read_bytes()[: state["entries"] * META_FIELDS * meta.itemsize])
+        self.raw_ends, self.out_ends, self.cuts, self.flags = (meta[field::META_FIELDS] for field in range(4))
+
+        self._generation = state["generation"] if state else 0
+        # keys with more than one entry; keys with one live in singles, which is much larger
+        self.maps: Dict[str, Dict[str, List[int]]] = {name: state["maps"][name] if state else {} for name in map_names}
+        self.singles: Dict[str, Dict[str, int]] = {name: state["singles"][name] if state else {} for name in map_names}
+        self.extra: Dict[str, Dict[str, str]] = state["extra"] if state else {}
+        self._touched: Dict[str, Set[str]] = {name: set() for name in map_names}
+
+        # filled by align() / store()
+        self.segments: List[List[int]] = []
+        self.removed: List[int] = []
+        self.positions = array("q")
+        self._new_raw: List[bytes] = []
+        self._new_out = b""
+
+    def _key_files(self, name: str, generation: int) -> Tuple[Path, Path]:
+        return self.path / f"{name}.{generation}.keys", self.path / f"{name}.{generation}.ids"
+
+    def _load_state(self, map_names: Sequence[str]) -> Optional[Dict]:
+        try:
+            state = json.loads((self.path / "state.json").read_text(encoding="utf-8"))
+            sizes = {name: (self.path / name).stat().st_size for name in ("raw", "out", "meta")}
+            # a different cleaner version or header layout invalidates every entry
+            if state.get("version") != INDEX_VERSION or state.get("headers") != self.headers:
+                return None
+            state["singles"] = {}
+            for name in map_names:
+                keys_path, ids_path = self._key_files(name, state["generation"])
+                ids = array("q")
+                ids.frombytes(ids_path.read_bytes())
+                keys = split_keys(keys_path.read_text(encoding="utf-8"), len(ids))
+                if len(keys) != len(ids) or name not in state["maps"]:
+                    return None
+                state["singles"][name] = dict(zip(keys, ids))
+        except (OSError, ValueError):
+            return None
+        # a crash between appending entries and replacing state.json only leaves extra bytes behind
+        if (
+            sizes["raw"] < state["raw_size"]
+            or sizes["out"] < state["out_size"]
+            or sizes["meta"] < state["entries"] * META_FIELDS * 8
+        ):
+            return None
+        return state
+
+    @property
+    def first_added(self) -> int:
+        """Entry id of the first record returned by ``align``; the rest follow in order."""
+        return self._old_entries
+
+    def _raw_start(self, entry: int) -> int:
+        return self.raw_ends[entry - 1] if entry else 0
+
+    def _out_start(self, entry: int) -> int:
+        return self.out_ends[entry - 1] if entry else 0
+
+    def _raw_record(self, entry: int) -> bytes:
+        return self._raw[self._raw_start(entry) : self.raw_ends[entry]]
+
+    def _keep(self, first: int, count: int) -> None:
+        if self.segments and sum(self.segments[-1]) == first:
+            self.segments[-1][1] += count
+        else:
+            self.segments.append([first, count])
+
+    def _add(self, data: bytes, spans: List[Tuple[int, int]]) -> None:
+        if spans:
+            self._keep(self._old_entries + len(self._new_raw), len(spans))
+            self._new_raw.extend(data[start:end] for start, end in spans)
+
+    def align(self, data: bytes, offset: int) -> List[bytes]:
+        """Line ``data[offset:]`` up with the previous run's records and return the ones that must be cleaned.
+
+        The returned records (new or edited, in export order) get entry ids from
+        ``first_added`` on; ``store`` takes their cleaned lines.
+        """
+        old_ids = list(chain.from_iterable(range(first, first + count) for first, count in self._old_segments))
+        segment_ends: List[int] = []
+        for _, count in self._old_segments:
+            segment_ends.append((segment_ends[-1] if segment_ends else 0) + count)
+
+        raw_view = memoryview(self._raw)
+        pos, old_pos = offset, 0
+        while pos < len(data) and old_pos < len(old_ids):
+            entry = old_ids[old_pos]
+            limit = segment_ends[bisect_left(segment_ends, old_pos + 1)] - old_pos
+            matched = self._match_run(data, pos, entry, limit, raw_view)
+            if matched:
+                self._keep(entry, matched)
+                pos += self.raw_ends[entry + matched - 1] - self._raw_start(entry)
+                old_pos += matched
+                continue
+            dropped, spans = self._resync(data, pos, old_ids, old_pos)
+            self.removed.extend(old_ids[old_pos : old_pos + dropped])
+            old_pos += dropped
+            self._add(data, spans)
+            if spans:
+                pos = spans[-1][1]
+        raw_view.release()
+
+        self.removed.extend(old_ids[old_pos:])
+        spans = []
+        while pos < len(data):
+            spans.append((pos, record_end(data, pos)))
+            pos = spans[-1][1]
+        self._add(data, spans)
+
+        self.stats.cleaned = len(self._new_raw)
+        self.stats.removed = len(self.removed)
+        self.stats.reused = len(old_ids) - len(self.removed)
+        self.positions = array("q", bytes(8 * (self._old_entries + len(self._new_raw))))
+        position = 0
+        for first, count in self.segments:
+            self.positions[first : first + count] = array("q", range(position, position + count))
+            position += count
+        return self._new_raw
+
+    def _match_run(self, data: bytes, pos: int, entry: int, limit: int, raw_view: memoryview) -> int:
+        """How many stored records from ``entry`` on (at most ``limit``, adjacent in ``raw``) match ``data[pos:]``."""
+        base = self._raw_start(entry)
+
+        def same(lo: int, hi: int) -> bool:
+            start = self._raw_start(entry + lo)
+            return data.startswith(raw_view[start : self.raw_ends[entry + hi - 1]], pos + start - base)
+
+        # gallop over doubling windows, then bisect the first one that differs;
+        # each byte is compared about twice at most
+        lo, step, hi = 0, 1, limit
+        while lo < limit:
+            hi = min(lo + step, limit)
+            if not same(lo, hi):
+                break
+            lo, step = hi, step * 2
+        while hi - lo > 1 and lo < limit:
+            mid = (lo + hi) // 2
+            if same(lo, mid):
+                lo = mid
+            else:
+                hi = mid
+        # the old export's last record may have had no newline; it only matches at the very end
+        if lo and self._raw[self.raw_ends[entry + lo - 1] - 1] != 0x0A:
+            if pos + self.raw_ends[entry + lo - 1] - base != len(data):
+                lo -= 1
+        return lo
+
+    def _resync(
+        self, data: bytes, pos: int, old_ids: List[int], old_pos: int
+    ) -> Tuple[int, List[Tuple[int, int]]]:
+        """After a mismatch, find the nearest point where new and old records line up again.
+
+        Returns how many old records to drop and the new records (byte spans) to clean
+        before that point. A match must be followed by a second one, so a repeated
+        record (a blank line, a copied row) does not anchor the realignment.
+        """
+        spans: List[Tuple[int, int]] = []
+        window = RESYNC_WINDOW
+        while True:
+            end = spans[-1][1] if spans else pos
+            while len(spans) <= window and end < len(data):
+                spans.append((end, record_end(data, end)))
+                end = spans[-1][1]
+            new_done = end >= len(data)
+            olds = old_ids[old_pos : old_pos + window + 1]
+            old_done = old_pos + len(olds) >= len(old_ids)
+
+            seen: Dict[bytes, int] = {}
+            for offset, entry in enumerate(olds):
+                seen.setdefault(self._raw_record(entry), offset)
+            for offset, (start, stop) in enumerate(spans):
+                match = seen.get(data[start:stop])
+                if match is None:
+                    continue
+                if offset + 1 < len(spans) and match + 1 < len(olds):
+                    following = spans[offset + 1]
+                    if data[following[0] : following[1]] != self._raw_record(olds[match + 1]):
+                        continue
+                elif not (offset + 1 == len(spans) and new_done) and not (match + 1 == len(olds) and old_done):
+                    continue
+                return match, spans[:offset]
+            if new_done and old_done:
+                return len(olds), spans
+            window *= 2
+
+    def store(self, entries: List[Tuple[bytes, int, int]]) -> None:
+        """Record ``(cleaned line, cut, flags)`` for each record ``align`` returned, in the same order."""
+        out_end = len(self._out)
+        for line, cut, flags in entries:
+            out_end += len(line)
+            self.out_ends.append(out_end)
+            self.cuts.append(cut)
+            self.flags.append(flags)
+        raw_end = len(self._raw)
+        for record in self._new_raw:
+            raw_end += len(record)
+            self.raw_ends.append(raw_end)
+        self._new_out = b"".join(line for line, _, _ in entries)
+
+    def out_line(self, entry: int) -> bytes:
+        """The stored cleaned line of a previous run's entry."""
+        return self._out[self._out_start(entry) : self.out_ends[entry]]
+
+    def order(self) -> List[int]:
+        return list(chain.from_iterable(range(first, first + count) for first, count in self.segments))
+
+    def members(self, name: str, key: str) -> List[int]:
+        """The entries of ``key`` in map ``name``, in row order once settled."""
+        entries = self.maps[name].get(key)
+        if entries is not None:
+            return entries
+        single = self.singles[name].get(key)
+        return [] if single is None else [single]
+
+    def link(self, name: str, key: str, entry: int) -> None:
+        entries = self.maps[name].get(key)
+        if entries is None:
+            single = self.singles[name].pop(key, None)
+            if single is None:
+                # a new key: one entry is already in order
+                self.singles[name][key] = entry
+                return
+            entries = self.maps[name][key] = [single]
+        entries.append(entry)
+        self._touched[name].add(key)
+
+    def unlink(self, name: str, key: str, entry: int) -> None:
+        entries = self.maps[name].get(key)
+        if entries is None:
+            entries = self.maps[name][key] = [self.singles[name].pop(key)]
+        entries.remove(entry)
+        self._touched[name].add(key)
+
+    def settle(self) -> None:
+        """Put the entries of every linked/unlinked key back in row order; keys left with one entry go to singles."""
+        for name, keys in self._touched.items():
+            mapping = self.maps[name]
+            for key in keys:
+                entries = mapping.pop(key)
+                if len(entries) > 1:
+                    entries.sort(key=self.positions.__getitem__)
+                    mapping[key] = entries
+                elif entries:
+                    self.singles[name][key] = entries[0]
+            keys.clear()
+
+    def duplicates(self, name: str, start: int) -> Dict[str, List[int]]:
+        """Keys of map ``name`` with more than one entry, as row numbers, in order of first appearance."""
+        positions = self.positions
+        repeated = sorted(self.maps[name].items(), key=lambda item: positions[item[1][0]])
+        return {key: [start + positions[entry] for entry in entries] for key, entries in repeated}
+
+    def render(self, inserts: Dict[int, bytes]) -> Iterator[bytes]:
+        """The cleaned CSV body in the new order, with ``inserts[entry]`` spliced in at that entry's cut."""
+        out = memoryview(self._out + self._new_out)
+        spliced = sorted(inserts)
+        for first, count in self.segments:
+            start = self._out_start(first)
+            lo = bisect_left(spliced, first)
+            hi = bisect_left(spliced, first + count, lo)
+            for entry in spliced[lo:hi]:
+                cut = self._out_start(entry) + self.cuts[entry]
+                yield out[start:cut]
+                yield inserts[entry]
+                start = cut
+            yield out[start : self.out_ends[first + count - 1]]
+
+    def commit(self) -> None:
+        """Append this run's entries and replace the state; call only after the cleaned outputs were written."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        meta = array("q")
+        for entry in range(self._old_entries, len(self.flags)):
+            meta.extend((self.raw_ends[entry], self.out_ends[entry], self.cuts[entry], self.flags[entry]))
+        for name, kept, tail in (
+            ("raw", len(self._raw), b"".join(self._new_raw)),
+            ("out", len(self._out), self._new_out),
+            ("meta", self._old_entries * META_FIELDS * meta.itemsize, meta.tobytes()),
+        ):
+            target = self.path / name
+            with target.open("wb" if self._fresh or not target.exists() else "r+b") as fh:
+                # drop anything a crashed run appended after the last state.json
+                fh.truncate(kept)
+                fh.seek(kept)
+                fh.write(tail)
+
+        generation = self._generation + 1
+        for name, singles in self.singles.items():
+            keys_path, ids_path = self._key_files(name, generation)
+            keys_path.write_text(join_keys(list(singles)), encoding="utf-8")
+            ids_path.write_bytes(array("q", singles.values()).tobytes())
+
+        state = {
+            "version": INDEX_VERSION,
+            "generation": generation,
+            "headers": self.headers,
+            "entries": len(self.flags),
+            "raw_size": self.raw_ends[-1] if self.raw_ends else 0,
+            "out_size": self.out_ends[-1] if self.out_ends else 0,
+            "segments": self.segments,
+            "maps": self.maps,
+            "extra": self.extra,
+        }
+        tmp_path = self.path / "state.json.tmp"
+        tmp_path.write_text(json.dumps(state), encoding="utf-8")
+        tmp_path.replace(self.path / "state.json")
+        current = set(chain.from_iterable(self._key_files(name, generation) for name in self.singles))
+        for stale in chain(self.path.glob("*.keys"), self.path.glob("*.ids")):
+            if stale not in current:
+                stale.unlink()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Normalize client authorization workbooks into one merged, deduplicated JSON file.
+
+Supersedes the tmp_normalize_auth / tmp_normalize_auth_v2 / tmp_clean_auth
+chain. The name, date-range and unit parsing from auth_normalize, the drop of
+name-less and 'CO' rows, and the authorization year bounds all run in a single
+pass with nothing written in between.
+
+Inputs may be workbook files, directories (every ``*.xlsx`` inside) or glob
+patterns. Each sheet of each workbook is one task for the process pool.
+Results are merged in input order (workbook, then sheet, then row). A record
+identical to one already kept is dropped.
+
+Usage:
+    python scripts/ingest_authorizations.py "client authorization.xlsx" auths/ "exports/*.xlsx" \\
+        [--output data/client_authorizations.json] [--workers 4]
+
+Requires openpyxl.
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Set, Tuple
+
+from auth_normalize import AuthRecord, is_placeholder_name, iter_auth_records, workbook_sheet_names
+
+OUTPUT_PATH = Path("data/client_authorizations.json")
+MIN_AUTH_YEAR = 2000
+MAX_AUTH_YEAR = 2100
+
+
+@dataclass
+class IngestStats:
+    workbooks: int = 0
+    sheets: int = 0
+    rows_read: int = 0
+    placeholder_rows: int = 0
+    duplicate_rows: int = 0
+    records_written: int = 0
+
+    def summary(self) -> str:
+        return (
+            f"workbooks={self.workbooks} sheets={self.sheets} rows={self.rows_read} "
+            f"skipped_placeholder={self.placeholder_rows} duplicates={self.duplicate_rows} "
+            f"written={self.records_written}"
+        )
+
+
+def expand_inputs(inputs: Iterable[str]) -> List[Path]:
+    """Files, directories and glob patterns -> workbook paths, in order, without repeats."""
+    paths: List[Path] = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            matches = sorted(path.glob("*.xlsx"))
+        elif path.exists():
+            matches = [path]
+        else:
+            matches = sorted(Path(match) for match in glob.glob(item, recursive=True))
+            if not matches:
+                raise FileNotFoundError(f"No workbook matches {item}")
+        # Excel keeps "~$name.xlsx" lock files next to open workbooks
+        paths.extend(match for match in matches if not match.name.startswith("~$"))
+    return list(dict.fromkeys(paths))
+
+
+def ingest_sheet(
+    path: Path, sheet_name: str, min_year: Optional[int], max_year: Optional[int]
+) -> Tuple[List[AuthRecord], int]:
+    """Worker: normalized records of one sheet, plus how many placeholder rows were dropped."""
+    records: List[AuthRecord] = []
+    skipped = 0
+    for record in iter_auth_records(path, sheet_names=[sheet_name], min_year=min_year, max_year=max_year):
+        if is_placeholder_name(record["full_name"]):
+            skipped += 1
+            continue
+        records.append(record)
+    return records, skipped
+
+
+def record_identity(record: AuthRecord) -> Tuple[object, ...]:
+    return tuple(record.values())
+
+
+def ingest(
+    paths: List[Path], workers: int, min_year: Optional[int], max_year: Optional[int]
+) -> Tuple[List[AuthRecord], IngestStats]:
+    stats = IngestStats(workbooks=len(paths))
+    tasks = [(path, name) for path in paths for name in workbook_sheet_names(path)]
+    stats.sheets = len(tasks)
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            futures = [pool.submit(ingest_sheet, path, name, min_year, max_year) for path, name in tasks]
+            results = (future.result() for future in futures)
+            return _merge(results, stats)
+    return _merge((ingest_sheet(path, name, min_year, max_year) for path, name in tasks), stats)
+
+
+def _merge(
+    results: Iterable[Tuple[List[AuthRecord], int]], stats: IngestStats
+) -> Tuple[List[AuthRecord], IngestStats]:
+    merged: List[AuthRecord] = []
+    seen: Set[Tuple[object, ...]] = set()
+    for records, skipped in results:
+        stats.placeholder_rows += skipped
+        stats.rows_read += skipped + len(records)
+        for record in records:
+            identity = record_identity(record)
+            if identity in seen:
+                stats.duplicate_rows += 1
+                continue
+            seen.add(identity)
+            merged.append(record)
+    stats.records_written = len(merged)
+    return merged, stats
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Normalize client authorization workbooks into one JSON file.")
+    parser.add_argument("inputs", nargs="+", help="workbook files, directories of .xlsx files or glob patterns")
+    parser.add_argument("--output", type=Path, default=OUTPUT_PATH, help=f"merged JSON (default: {OUTPUT_PATH})")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=min(4, os.cpu_count() or 1),
+        help="Parse sheets in N worker processes (1 = in process).",
+    )
+    parser.add_argument("--min-year", type=int, default=MIN_AUTH_YEAR, help="earliest plausible authorization year")
+    parser.add_argument("--max-year", type=int, default=MAX_AUTH_YEAR, help="latest plausible authorization year")
+    parser.add_argument("--indent", type=int, help="pretty-print the output with this indent (default: compact)")
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    started = time.perf_counter()
+    paths = expand_inputs(args.inputs)
+    records, stats = ingest(paths, args.workers, args.min_year, args.max_year)
+
+    separators: Optional[Tuple[str, str]] = None if args.indent is not None else (",", ":")
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(
+        json.dumps(records, ensure_ascii=True, indent=args.indent, separators=separators), encoding="utf-8"
+    )
+    print(f"{stats.summary()} file={args.output} seconds={time.perf_counter() - started:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Compare full-mode and read-only streaming loads of an authorization workbook.
+
+``full`` is what the tmp_normalize_auth scripts used to do: ``load_workbook``
+in full mode, then iterate and normalize. ``stream`` is
+``auth_normalize.iter_auth_records``. Each mode runs in its own subprocess so
+its peak RSS is measured in isolation.
+
+Usage: python scripts/perf/bench_auth_workbook.py [--rows 50000] [--sheets 4] [--repeat 3]
+
+Requires openpyxl.
+"""
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from auth_normalize import FIRST_DATA_ROW, clean, iter_auth_records, normalize_auth_row
+from bench_cleaners import peak_rss_mb
+from generate_exports import auth_rows
+
+
+def write_workbook(path: Path, rows: int, sheets: int, seed: int) -> None:
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    per_sheet = -(-rows // sheets)
+    for sheet_no in range(sheets):
+        sheet = workbook.create_sheet(f"Authorizations {sheet_no + 1}")
+        for row in auth_rows(random.Random(seed + sheet_no), per_sheet):
+            sheet.append(row)
+    workbook.save(path)
+
+
+def load_full(path: Path) -> int:
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(path, data_only=True)
+    count = 0
+    for sheet in workbook.worksheets:
+        for row in sheet.iter_rows(min_row=FIRST_DATA_ROW, values_only=True):
+            if row and any(clean(cell) for cell in row):
+                normalize_auth_row(row)
+                count += 1
+    return count
+
+
+def load_stream(path: Path) -> int:
+    return sum(1 for _ in iter_auth_records(path, all_sheets=True))
+
+
+def run_child(mode: str, path: Path) -> tuple[float, float]:
+    started = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, __file__, "--child", mode, str(path)], stdout=subprocess.DEVNULL)
+    _, status, rusage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - started
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode:
+        raise SystemExit(f"{mode} load exited with {proc.returncode}")
+    return elapsed, peak_rss_mb(rusage)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--sheets", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, path = args.child
+        print((load_full if mode == "full" else load_stream)(Path(path)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "client authorization.xlsx"
+        write_workbook(path, args.rows, args.sheets, args.seed)
+        print(f"{args.rows:,} rows over {args.sheets} sheet(s), {path.stat().st_size:,} bytes")
+        results = {}
+        for mode in ("full", "stream"):
+            runs = [run_child(mode, path) for _ in range(args.repeat)]
+            results[mode] = (min(elapsed for elapsed, _ in runs), max(rss for _, rss in runs))
+            print(f"{mode:<8} {results[mode][0]:8.3f}s {results[mode][1]:8.1f} MiB peak RSS")
+
+    full, stream = results["full"], results["stream"]
+    print(f"stream vs full: time x{stream[0] / full[0]:.2f}, peak RSS x{stream[1] / full[1]:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Benchmark the data-cleaning scripts on synthetic exports and save the results as JSON.
+
+For each size, generate_exports.py writes fresh raw exports into a temporary
+workdir and every script runs there as a subprocess, ``--repeat`` times.
+The fastest wall time, the rows/sec it implies and the highest peak RSS are
+recorded per script, together with the commit, so two result files can be
+compared with ``--compare``.
+
+The auth normalizers read and write hard-coded Windows paths. On POSIX those
+are plain relative file names, so the generated workbook is placed under that
+name in the workdir. On Windows they would point at real user files and are
+skipped. They stream the workbook through auth_normalize.py's read-only
+loader, so they run at every size. Auth runs need openpyxl; ``--no-auth``
+benchmarks the CSV cleaners only.
+
+Usage: python scripts/perf/bench_cleaners.py [--sizes 10k,100k,1m] [--repeat 3]
+           [--output reports/cleaner-benchmarks.json] [--compare OLD.json]
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from generate_exports import generate
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+AUTH_WORKBOOK = r"c:\Users\test\Desktop\AllIincompassing\client authorization.xlsx"
+
+# (name, script, needs auth workbook)
+SCRIPTS: List[Tuple[str, Path, bool]] = [
+    ("clean_client_csv", REPO_ROOT / "scripts" / "clean_client_csv.py", False),
+    ("clean_staff_csv", REPO_ROOT / "scripts" / "clean_staff_csv.py", False),
+    ("tmp_normalize_auth", REPO_ROOT / "tmp_normalize_auth.py", True),
+    ("tmp_normalize_auth_v2", REPO_ROOT / "tmp_normalize_auth_v2.py", True),
+    # reads tmp_normalize_auth's output, so it runs after it
+    ("tmp_clean_auth", REPO_ROOT / "tmp_clean_auth.py", True),
+]
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def peak_rss_mb(rusage) -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    divisor = 1 << 20 if sys.platform == "darwin" else 1 << 10
+    return rusage.ru_maxrss / divisor
+
+
+def run_once(script: Path, workdir: Path) -> Tuple[float, float]:
+    started = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, str(script)], cwd=workdir, stdout=subprocess.DEVNULL)
+    # wait4 returns this child's own rusage, unlike RUSAGE_CHILDREN's running maximum
+    _, status, rusage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - started
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode:
+        raise SystemExit(f"{script.name} exited with {proc.returncode}")
+    return elapsed, peak_rss_mb(rusage)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def bench_size(rows: int, repeat: int, seed: int, with_auth: bool) -> List[Dict[str, object]]:
+    results: List[Dict[str, object]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        generate(workdir / "data", rows, seed, auth=with_auth)
+        if with_auth:
+            shutil.move(str(workdir / "data" / "client authorization.xlsx"), str(workdir / AUTH_WORKBOOK))
+
+        for name, script, needs_auth in SCRIPTS:
+            if needs_auth and not with_auth:
+                continue
+            best, peak = float("inf"), 0.0
+            for _ in range(repeat):
+                elapsed, rss = run_once(script, workdir)
+                best, peak = min(best, elapsed), max(peak, rss)
+            results.append({
+                "script": name,
+                "rows": rows,
+                "seconds": round(best, 4),
+                "rows_per_second": round(rows / best, 1),
+                "peak_rss_mb": round(peak, 1),
+            })
+            print(f"{name:<24} {rows:>10,} rows {best:>9.3f}s {rows / best:>12,.0f} rows/s {peak:>8.1f} MiB")
+    return results
+
+
+def compare(current: List[Dict[str, object]], baseline_path: Path) -> None:
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    previous = {(entry["script"], entry["rows"]): entry for entry in baseline["results"]}
+    print(f"\nvs {baseline_path} ({(baseline.get('commit') or 'unknown')[:12]}): time ratio, >1 is slower")
+    for entry in current:
+        old = previous.get((entry["script"], entry["rows"]))
+        if old is None:
+            continue
+        ratio = entry["seconds"] / old["seconds"] if old["seconds"] else float("inf")
+        rss_ratio = entry["peak_rss_mb"] / old["peak_rss_mb"] if old["peak_rss_mb"] else float("inf")
+        print(f"{entry['script']:<24} {entry['rows']:>10,} rows  time x{ratio:.2f}  rss x{rss_ratio:.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10k,100k,1m", help="comma-separated row counts, k/m suffixes allowed")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--no-auth", action="store_true", help="only benchmark the CSV cleaners")
+    parser.add_argument("--output", type=Path, default=REPO_ROOT / "reports" / "cleaner-benchmarks.json")
+    parser.add_argument("--compare", type=Path, help="earlier result file to compare against")
+    args = parser.parse_args()
+
+    auth_available = not args.no_auth and os.name == "posix" and importlib.util.find_spec("openpyxl") is not None
+    if not args.no_auth and not auth_available:
+        print("auth normalizers skipped (need openpyxl and a POSIX system)")
+
+    results: List[Dict[str, object]] = []
+    for size in [parse_size(part) for part in args.sizes.split(",") if part.strip()]:
+        results.extend(bench_size(size, args.repeat, args.seed, auth_available))
+
+    payload = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "seed": args.seed,
+        "results": results,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    print(f"\nwrote {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Time clean_client_csv's loop and pandas backends on one export and check they agree.
+
+Without a CSV, a seeded synthetic export of ``--rows`` rows (default 1M) is
+generated with generate_exports.py first. Both backends run as subprocesses,
+so interpreter start-up and imports are included in their times.
+
+Usage: python scripts/perf/bench_client_backends.py [path/to/client_raw.csv] [--rows 1000000] [--repeat 3]
+"""
+
+import argparse
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from generate_exports import generate
+
+SCRIPT = Path(__file__).resolve().parent.parent / "clean_client_csv.py"
+OUTPUTS = ("client_cleaned.csv", "client_import_report.json")
+
+
+def run_backend(backend: str, workdir: Path, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, str(SCRIPT), "--backend", backend], cwd=workdir, check=True)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("raw_csv", type=Path, nargs="?", help="client export to clean (default: a generated one)")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="rows in the generated export")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    timings: dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_csv = args.raw_csv
+        if raw_csv is None:
+            generate(Path(tmp) / "generated", args.rows, args.seed)
+            raw_csv = Path(tmp) / "generated" / "client_raw.csv"
+        for backend in ("loop", "pandas"):
+            workdir = Path(tmp) / backend
+            (workdir / "data").mkdir(parents=True)
+            shutil.copy(raw_csv, workdir / "data" / "client_raw.csv")
+            timings[backend] = run_backend(backend, workdir, args.repeat)
+
+        for name in OUTPUTS:
+            loop_bytes = (Path(tmp) / "loop" / "data" / name).read_bytes()
+            pandas_bytes = (Path(tmp) / "pandas" / "data" / name).read_bytes()
+            if loop_bytes != pandas_bytes:
+                raise SystemExit(f"{name} differs between the loop and pandas backends")
+
+    for backend, elapsed in timings.items():
+        print(f"{backend:<8} {elapsed:8.3f}s")
+    print(f"speedup: {timings['loop'] / timings['pandas']:.2f}x (outputs identical)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Time client_matcher's blocked index against scoring the whole roster, and measure match accuracy.
+
+A synthetic roster gets unique names built from syllables. Authorization rows
+are drawn from it with the variations the workbooks show:
+- dropped accents and "Last, First" order
+- one-letter typos in the last name
+- a middle name folded into the first name
+- a missing or different city
+- a share of rows whose client is not in the roster at all
+
+Accuracy counts linked rows that got the right client. Brute force applies the
+same scoring to every roster client, for a sample of the rows.
+
+Usage: python scripts/perf/bench_client_matcher.py [--roster 20000] [--rows 10000] [--brute-force-sample 300]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from auth_normalize import split_name
+from client_matcher import ClientIndex, RosterClient, match_records, name_key, normalize_name
+from generate_exports import CITIES
+
+SYLLABLES = ["an", "bel", "car", "da", "el", "fer", "gar", "hu", "is", "jo", "ka", "lo", "mar", "ne", "or",
+             "pa", "qui", "ro", "san", "ta", "ur", "va", "wen", "xi", "ya", "zo", "ño", "lé", "ch", "th"]
+
+
+def make_name(rng: random.Random, parts: int) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(parts)).capitalize()
+
+
+def make_roster(rng: random.Random, size: int) -> List[Tuple[str, str, str, str, str]]:
+    """(client_id, first, middle, last, city) with unique first/last pairs."""
+    roster = []
+    seen = set()
+    while len(roster) < size:
+        first, last = make_name(rng, rng.randint(2, 3)), make_name(rng, rng.randint(2, 4))
+        if rng.random() < 0.1:
+            last = f"{last}-{make_name(rng, 2)}"
+        if (normalize_name(first), normalize_name(last)) in seen:
+            continue
+        seen.add((normalize_name(first), normalize_name(last)))
+        middle = make_name(rng, 2) if rng.random() < 0.3 else ""
+        roster.append((str(400000 + len(roster)), first, middle, last, rng.choice(CITIES)))
+    return roster
+
+
+def typo(rng: random.Random, text: str) -> str:
+    if len(text) < 4:
+        return text
+    i = rng.randrange(1, len(text) - 1)
+    return text[:i] + rng.choice("aeioulnrst") + text[i + 1:]
+
+
+def make_rows(rng: random.Random, roster, count: int) -> List[Tuple[dict, Optional[str]]]:
+    rows = []
+    for _ in range(count):
+        if rng.random() < 0.1:
+            client_id, first, middle, last, city = None, make_name(rng, 2), "", make_name(rng, 3), rng.choice(CITIES)
+        else:
+            client_id, first, middle, last, city = rng.choice(roster)
+        roll = rng.random()
+        if roll < 0.15:
+            last = typo(rng, last)
+        elif roll < 0.25 and middle:
+            first = f"{first} {middle}"
+        elif roll < 0.35:
+            first, last = normalize_name(first).title(), normalize_name(last).title()
+        city = None if rng.random() < 0.1 else (rng.choice(CITIES) if rng.random() < 0.1 else city)
+        raw = f"{last}, {first}" if rng.random() < 0.5 else f"{first} {last}"
+        full, first_name, last_name = split_name(raw)
+        rows.append(({"full_name": full, "first_name": first_name, "last_name": last_name, "city": city}, client_id))
+    return rows
+
+
+def brute_force(index: ClientIndex, record: dict) -> Optional[str]:
+    first, last, city = name_key(record["first_name"], record["last_name"], record["city"])
+    scored = sorted(((index.score(first, last, city, client), client.client_id) for client in index.clients), reverse=True)
+    return scored[0][1] if scored[0][0] >= index.min_confidence else None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--roster", type=int, default=20_000)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--brute-force-sample", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    roster = make_roster(rng, args.roster)
+    rows = make_rows(rng, roster, args.rows)
+
+    started = time.perf_counter()
+    index = ClientIndex(RosterClient(cid, *(normalize_name(v) for v in rest)) for cid, *rest in roster)
+    built = time.perf_counter() - started
+    started = time.perf_counter()
+    matched, stats = match_records((record for record, _ in rows), index)
+    blocked = time.perf_counter() - started
+
+    linked = [(record["client_id"], expected) for record, (_, expected) in zip(matched, rows) if record["client_id"]]
+    correct = sum(1 for got, expected in linked if got == expected)
+    findable = sum(1 for _, expected in rows if expected)
+    print(f"roster={len(roster):,} rows={len(rows):,} index build {built:.3f}s, match {blocked:.3f}s")
+    print(stats.summary())
+    print(f"linked {len(linked):,} of {findable:,} rows whose client exists; {correct / max(len(linked), 1):.2%} correct")
+
+    sample = [record for record, _ in rows[: args.brute_force_sample]]
+    started = time.perf_counter()
+    full_scan = [brute_force(index, record) for record in sample]
+    per_row = (time.perf_counter() - started) / len(sample)
+    agree = sum(1 for record, got in zip(matched, full_scan) if record["client_id"] in (got, None))
+    print(
+        f"brute force: {per_row * 1000:.2f}ms/row (~{per_row * len(rows):.1f}s for all rows, "
+        f"{per_row * len(rows) / blocked:.0f}x the blocked index); "
+        f"blocked link agrees with (or defers to) it on {agree}/{len(sample)} sampled rows"
+    )
+
+
+if __name__ == "__main__":
+    main()
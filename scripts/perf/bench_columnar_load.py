@@ -0,0 +1,71 @@
+"""Compare load time and on-disk size of a cleaned CSV against its columnar copies.
+
+Run a cleaner with ``--columnar arrow`` and ``--columnar parquet`` first, then:
+
+    python scripts/perf/bench_columnar_load.py data/client_cleaned.csv
+
+Requires pyarrow.
+"""
+
+import argparse
+import csv
+import time
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+
+def load_csv_module(path: Path) -> int:
+    with path.open("r", encoding="utf-8", newline="") as src:
+        return sum(1 for _ in csv.reader(src)) - 1
+
+
+def load_csv_arrow(path: Path) -> int:
+    return pa_csv.read_csv(path).num_rows
+
+
+def load_arrow_mmap(path: Path) -> int:
+    with pa.memory_map(str(path)) as source:
+        return pa.ipc.open_file(source).read_all().num_rows
+
+
+def load_parquet(path: Path) -> int:
+    return pq.read_table(path).num_rows
+
+
+def best_of(fn, path: Path, repeat: int) -> tuple[float, int]:
+    best = float("inf")
+    rows = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = fn(path)
+        best = min(best, time.perf_counter() - started)
+    return best, rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark loading cleaned CSV vs. Arrow IPC vs. Parquet.")
+    parser.add_argument("csv_path", type=Path)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    candidates = [
+        ("csv (csv module)", args.csv_path, load_csv_module),
+        ("csv (pyarrow.csv)", args.csv_path, load_csv_arrow),
+        ("arrow ipc (mmap)", args.csv_path.with_suffix(".arrow"), load_arrow_mmap),
+        ("parquet", args.csv_path.with_suffix(".parquet"), load_parquet),
+    ]
+
+    print(f"{'format':<20} {'size':>12} {'load':>10} {'rows':>10}")
+    for label, path, loader in candidates:
+        if not path.exists():
+            print(f"{label:<20} {'missing':>12}")
+            continue
+        elapsed, rows = best_of(loader, path, args.repeat)
+        print(f"{label:<20} {path.stat().st_size:>12,} {elapsed * 1000:>8.1f}ms {rows:>10,}")
+
+
+if __name__ == "__main__":
+    main()
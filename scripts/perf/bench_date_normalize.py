@@ -0,0 +1,70 @@
+"""Microbenchmark: memoized date engine vs. the strptime loop normalize_dob used to run.
+
+Usage: python scripts/perf/bench_date_normalize.py [--rows N] [--distinct N]
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from date_normalize import normalize_us_date, parse_us_date  # noqa: E402
+
+
+def strptime_loop(value: str) -> str:
+    for fmt in ("%m/%d/%Y", "%m/%d/%y"):
+        try:
+            return datetime.strptime(value, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return value
+
+
+def build_values(rows: int, distinct: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    pool: list[str] = []
+    for _ in range(distinct):
+        month, day = rng.randint(1, 12), rng.randint(1, 28)
+        if rng.random() < 0.8:
+            pool.append(f"{month:02d}/{day:02d}/{rng.randint(1940, 2024)}")
+        elif rng.random() < 0.9:
+            pool.append(f"{month}/{day}/{rng.randint(0, 99):02d}")
+        else:
+            pool.append(f"{rng.randint(1940, 2024)}-{month:02d}-{day:02d}")
+    return [rng.choice(pool) for _ in range(rows)]
+
+
+def run(label: str, fn, values: list[str]) -> float:
+    started = time.perf_counter()
+    for value in values:
+        fn(value)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed:8.3f}s  {len(values) / elapsed:>12,.0f} rows/s")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--distinct", type=int, default=5_000)
+    args = parser.parse_args()
+
+    values = build_values(args.rows, args.distinct)
+    mismatches = sum(1 for value in set(values) if strptime_loop(value) != parse_us_date(value)[0])
+    if mismatches:
+        raise SystemExit(f"{mismatches} values normalize differently from the strptime loop")
+
+    baseline = run("strptime loop", strptime_loop, values)
+    parse_us_date.cache_clear()
+    cached = run("normalize_us_date (cached)", normalize_us_date, values)
+    parse_us_date.cache_clear()
+    uncached = run("parse_us_date (no reuse)", parse_us_date.__wrapped__, values)
+    print(f"speedup: cached {baseline / cached:.1f}x, regex path alone {baseline / uncached:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
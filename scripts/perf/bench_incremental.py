@@ -0,0 +1,80 @@
+"""Time --incremental against a full run of the CSV cleaners after a few hundred rows changed.
+
+A seeded synthetic export of ``--rows`` rows (default 1M) is generated with
+generate_exports.py. For each cleaner an incremental run builds the sidecar
+index on it, then ``--edits`` rows are edited, inserted or deleted (as in
+check_incremental_parity.py) and the edited export is cleaned both ways. Every
+timed incremental run starts from the same sidecar. Cleaners run as
+subprocesses, so interpreter start-up and imports are included. Exits non-zero
+if the outputs differ.
+
+Usage: python scripts/perf/bench_incremental.py [--rows 1000000] [--edits 300] [--repeat 3]
+"""
+
+import argparse
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from check_incremental_parity import CLEANERS, edit_export
+from generate_exports import generate
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+
+
+def timed_run(script: str, workdir: Path, *extra: str) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, str(SCRIPTS_DIR / script), *extra], cwd=workdir, check=True, capture_output=True)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--edits", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        generate(Path(tmp) / "generated", args.rows, args.seed)
+        for script, raw_name, outputs in CLEANERS:
+            full_dir = Path(tmp) / "full"
+            inc_dir = Path(tmp) / "incremental"
+            for workdir in (full_dir, inc_dir):
+                shutil.rmtree(workdir, ignore_errors=True)
+                (workdir / "data").mkdir(parents=True)
+                shutil.copy(Path(tmp) / "generated" / raw_name, workdir / "data" / raw_name)
+
+            first = timed_run(script, inc_dir, "--incremental")
+            # incremental_index.sidecar_path of the cleaned CSV
+            sidecar = (inc_dir / "data" / outputs[0]).with_suffix(".index")
+            primed = Path(tmp) / "primed"
+            shutil.rmtree(primed, ignore_errors=True)
+            shutil.copytree(sidecar, primed)
+
+            for workdir in (full_dir, inc_dir):
+                edit_export(workdir / "data" / raw_name, args.edits, args.seed)
+            full = min(timed_run(script, full_dir) for _ in range(args.repeat))
+            incremental = float("inf")
+            for _ in range(args.repeat):
+                shutil.rmtree(sidecar)
+                shutil.copytree(primed, sidecar)
+                incremental = min(incremental, timed_run(script, inc_dir, "--incremental"))
+
+            for name in outputs:
+                if (full_dir / "data" / name).read_bytes() != (inc_dir / "data" / name).read_bytes():
+                    raise SystemExit(f"{script}: {name} differs between the full and incremental runs")
+            print(
+                f"{script:<22} {args.rows:>10,} rows {args.edits:>5} edits  full {full:8.3f}s  "
+                f"incremental {incremental:8.3f}s  ({full / incremental:.1f}x, first run {first:.3f}s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Check that --incremental runs of the CSV cleaners match full runs byte for byte.
+
+For each cleaner: clean the original export both ways (the incremental run
+builds the sidecar index), edit, insert and delete a few rows, clean the
+edited export both ways again and compare every output file after each
+round. Exits non-zero on any difference.
+
+Usage: python scripts/perf/check_incremental_parity.py [--data-dir data] [--edits 25]
+"""
+
+import argparse
+import csv
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+
+CLEANERS = [
+    ("clean_client_csv.py", "client_raw.csv", ["client_cleaned.csv", "client_import_report.json"]),
+    ("clean_staff_csv.py", "staff_raw.csv", ["staff_cleaned.csv", "staff_email_duplicates.json"]),
+]
+
+STATE_EDITS = ["California", "nevada", "TX", "", "Ontario"]
+DOB_EDITS = ["01/02/2003", "2/3/99", "", "not a date"]
+
+
+def run_cleaner(script: str, workdir: Path, *extra: str) -> None:
+    subprocess.run([sys.executable, str(SCRIPTS_DIR / script), *extra], cwd=workdir, check=True, capture_output=True)
+
+
+def edit_export(path: Path, edits: int, seed: int) -> None:
+    rng = random.Random(seed)
+    with path.open("r", encoding="utf-8-sig", newline="") as src:
+        rows = list(csv.reader(src))
+    # leave the preamble and header rows alone
+    body_start = 2
+    for _ in range(edits):
+        if len(rows) <= body_start:
+            break
+        pos = rng.randrange(body_start, len(rows))
+        action = rng.random()
+        if action < 0.6:
+            row = rows[pos]
+            cell = rng.randrange(len(row)) if row else 0
+            if row:
+                row[cell] = rng.choice(STATE_EDITS + DOB_EDITS + [""])
+        elif action < 0.8:
+            rows.insert(pos, list(rows[rng.randrange(body_start, len(rows))]))
+        else:
+            del rows[pos]
+    with path.open("w", encoding="utf-8", newline="") as dst:
+        csv.writer(dst).writerows(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-dir", type=Path, default=Path("data"))
+    parser.add_argument("--edits", type=int, default=25)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        full_dir = Path(tmp) / "full"
+        inc_dir = Path(tmp) / "incremental"
+        for workdir in (full_dir, inc_dir):
+            (workdir / "data").mkdir(parents=True)
+
+        for script, raw_name, outputs in CLEANERS:
+            for workdir in (full_dir, inc_dir):
+                shutil.copy(args.data_dir / raw_name, workdir / "data" / raw_name)
+            for round_name in ("first run", "after edits"):
+                if round_name == "after edits":
+                    for workdir in (full_dir, inc_dir):
+                        edit_export(workdir / "data" / raw_name, args.edits, args.seed)
+                run_cleaner(script, full_dir)
+                run_cleaner(script, inc_dir, "--incremental")
+
+                for name in outputs:
+                    same = (full_dir / "data" / name).read_bytes() == (inc_dir / "data" / name).read_bytes()
+                    print(f"{script:<22} {round_name:<12} {name:<30} {'identical' if same else 'DIFFERS'}")
+                    failures += not same
+
+    if failures:
+        raise SystemExit(f"{failures} output(s) differ between full and incremental runs")
+
+
+if __name__ == "__main__":
+    main()
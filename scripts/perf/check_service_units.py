@@ -0,0 +1,137 @@
+"""Check the single-pass parse_service_units against the regex cascade it replaced, and time both.
+
+Inputs compared, all of which must agree:
+- random service texts assembled from the tokens the cascade reacts to (codes,
+  HO, HR/HRS, numbers, separators, near-miss words), as a seeded property check
+- the service texts of generated authorization workbooks
+- every service cell of the workbooks passed with ``--workbook`` (requires openpyxl)
+
+Exits non-zero on the first mismatch and prints the counterexample.
+
+Usage: python scripts/perf/check_service_units.py [--cases 200000] [--workbook path.xlsx ...]
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import auth_normalize
+from auth_normalize import FIRST_DATA_ROW, clean, parse_service_units
+from generate_exports import auth_rows
+
+TOKENS = [
+    "H0032", "H0032HO", "HO", "ho", "h0032", "HR", "HRS", "hrs", "Hr", "HOURS", "SHO", "HOW", "H0031", "0032",
+    "1", "2", "4", "10", "2.5", "0.75", ".5", "3.", "007", "١٢",
+]
+SEPARATORS = ["", "", " ", " ", "  ", ",", ", ", "/", "-", "\n", "\t", "+"]
+
+
+def legacy_parse_service_units(s) -> Tuple[Optional[int], Optional[int]]:
+    # verbatim from tmp_normalize_auth.py before the single-pass parser
+    s = clean(s)
+    if not s:
+        return (None, None)
+    text = s.upper()
+
+    ho = None
+    for p in [r'H0032\s*HO\s*(\d+(?:\.\d+)?)\s*HRS?', r'H0032HO\s*(\d+(?:\.\d+)?)\s*HRS?', r'(\d+(?:\.\d+)?)\s*HRS?\s*HO\b', r'\bHO\s*(\d+(?:\.\d+)?)\s*HRS?']:
+        m = re.search(p, text)
+        if m:
+            ho = float(m.group(1)); break
+
+    sup = None
+    m = re.search(r'H0032(?!\s*HO|HO)\s*(\d+(?:\.\d+)?)\s*HRS?', text)
+    if m:
+        sup = float(m.group(1))
+
+    def int_or_none(v):
+        if v is None:
+            return None
+        return int(v) if float(v).is_integer() else int(round(v))
+
+    return (int_or_none(sup), int_or_none(ho))
+
+
+def random_texts(cases: int, seed: int) -> Iterable[str]:
+    rng = random.Random(seed)
+    for _ in range(cases):
+        parts = []
+        for _ in range(rng.randint(1, 9)):
+            parts.append(rng.choice(TOKENS))
+            parts.append(rng.choice(SEPARATORS))
+        yield "".join(parts)
+
+
+def generated_texts(rows: int, seed: int) -> List[object]:
+    return [row[4] for row in auth_rows(random.Random(seed), rows)[2:]]
+
+
+def workbook_texts(path: Path) -> List[object]:
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        return [
+            row[4]
+            for sheet in workbook.worksheets
+            for row in sheet.iter_rows(min_row=FIRST_DATA_ROW, values_only=True)
+            if row and len(row) > 4
+        ]
+    finally:
+        workbook.close()
+
+
+def check(label: str, texts: Iterable[object]) -> int:
+    count = 0
+    for text in texts:
+        expected, actual = legacy_parse_service_units(text), parse_service_units(text)
+        if expected != actual:
+            raise SystemExit(f"{label}: {text!r} -> cascade {expected}, single-pass {actual}")
+        count += 1
+    print(f"{label:<24} {count:>9,} texts agree")
+    return count
+
+
+def best_of(fn, texts: List[object], repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        auth_normalize._parse_service_text.cache_clear()
+        started = time.perf_counter()
+        for text in texts:
+            fn(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--workbook", type=Path, action="append", default=[])
+    args = parser.parse_args()
+
+    check("random token soup", random_texts(args.cases, args.seed))
+    column = generated_texts(50_000, args.seed)
+    check("generated workbook", column)
+    for path in args.workbook:
+        check(path.name, workbook_texts(path))
+
+    legacy = best_of(legacy_parse_service_units, column)
+    distinct = list(dict.fromkeys(column))
+    uncached = best_of(parse_service_units, distinct)
+    legacy_distinct = best_of(legacy_parse_service_units, distinct)
+    cached = best_of(parse_service_units, column)
+    print(f"\n{len(column):,} generated cells, {len(distinct):,} distinct")
+    print(f"per distinct text: cascade {legacy_distinct / len(distinct) * 1e6:.2f}us, single-pass {uncached / len(distinct) * 1e6:.2f}us")
+    print(f"whole column:      cascade {legacy:.3f}s, single-pass memoized {cached:.3f}s ({legacy / cached:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Generate synthetic raw exports shaped like data/client_raw.csv and data/staff_raw.csv.
+
+Rows reuse the real header rows, preamble lines and column layouts and are
+seeded with the mess the cleaners exist for: state names in every spelling,
+DOBs in several formats (plus junk), phones with extensions and country
+codes, missing and repeated emails, repeated client ids, embedded newlines
+and blank rows. With ``--auth`` a client authorization workbook in the layout
+the ``tmp_normalize_auth*.py`` scripts read is written too (requires openpyxl).
+
+Usage: python scripts/perf/generate_exports.py OUT_DIR --rows 100000 [--auth] [--seed 7]
+"""
+
+import argparse
+import csv
+import random
+from pathlib import Path
+from typing import Callable, List
+
+CLIENT_HEADERS = [
+    "Account Organization Name", " Account ID", " Client ID#", "First Name", "Middle Name", "Last Name",
+    "Location/Facility", "Client Status", "Status Active?", "DOB", "Age", "Gender", "Street Address", "City",
+    "State", "Postal Code", "Client ID#", "UCI#", "Client Order", "Reason for Referral",
+    "Notice of Privacy Practices Provided to Client", "Service Intensity", "Kareo Patient ID", "Notes", "Module",
+    "Email",
+]
+
+STAFF_HEADERS = [
+    "Account Organization Name", "Rethink Account ID", "Rethink Staff ID", "First Name", "Middle Name",
+    "Last Name", "Location(s)/Facilities", "Company Staff ID", "Start Date", "Staff Member Status",
+    "Status Active?", "DOB", "Phone", "Street Address", "City Address", "State", "Postal Code",
+    "Show RBT Training Module?", "BACB ID", "Show Scheduling", "Username", "Time Zone", "Employee Type", "Title",
+    "Email", "NPI Number", "NPI Number By Passed", "Medicaid ID", "Practitioner ID", "Taxonomy Code",
+    "Supervisor", "Staff Photo", "Gender", "Handle Aggression?", "Age Groups", "Languages Spoken",
+    "Max Caseload",
+]
+
+AUTH_HEADERS = [
+    "Client Name", "Auth Type", "Auth Amount", "IEHP", "Service", "Location", "Staff Needed", "Auth Dates",
+]
+
+FIRST_NAMES = ["Brett", "Joshua", "Rhys", "Elijah", "Matteo", "Rey", "Ahn Phuong", "Sreyphorn", "Gabriela",
+               "Hailey", "Aaron", "María José", "Zoë", "Liam", "Olivia", "Noah", "Sofia", "Mateo"]
+LAST_NAMES = ["Thorpe", "Kansara-Silva", "Quezada", "Serna", "Zaragoza", "Deane", "Vy Ly", "Chhoun",
+              "Sanchez", "Huynh", "Gascon", "O'Neil", "Nguyen", "Garcia", "De La Cruz", "Smith"]
+CITIES = ["Victorville", "orange", "la habra", "Riverside", "Anaheim", "Fountain Valley", "San Bernardino",
+          "LOS ANGELES", "Irvine "]
+STATES = ["California", "california", "CA", "ca", " Calif. ", "CALIFORNIA", "Nevada", "NV", "Arizona", "TX",
+          "Texas", "New York", "", "", "Ontario", "Baja California"]
+STREETS = ["17827 Sunburst Road", "830 North Adele st", "651 mariposa st", "3572 Banbury Drive",
+           "225 East Parkridge Ave\nApt 4", "1616 West Cerritos Avenue", "9646 La Granada ave.", ""]
+EMAIL_DOMAINS = ["gmail.com", "yahoo.com", "westcoastaba.org", "Outlook.com"]
+TITLES = ["BT", "RBT", "BCBA", "System Admin", "Clinical Supervisor"]
+STATUSES = ["Active", "Active", "Active", "Inactive", "On Hold", "Discharged"]
+
+
+def messy_dob(rng: random.Random) -> str:
+    year = rng.randint(1950, 2023)
+    month = rng.randint(1, 12)
+    day = rng.randint(1, 28)
+    pick = rng.random()
+    if pick < 0.55:
+        return f"{month:02d}/{day:02d}/{year}"
+    if pick < 0.7:
+        return f"{month}/{day}/{year % 100:02d}"
+    if pick < 0.8:
+        return f"{month}/{day}/{year}"
+    if pick < 0.85:
+        return f"{year}-{month:02d}-{day:02d}"
+    if pick < 0.9:
+        return rng.choice(["unknown", "13/45/2001", "02/30/2019", "N/A"])
+    return ""
+
+
+def messy_phone(rng: random.Random) -> str:
+    area, prefix, line = rng.randint(200, 999), rng.randint(200, 999), rng.randint(0, 9999)
+    return rng.choice([
+        f"({area}) {prefix}-{line:04d} x___",
+        f"({area}) {prefix}-{line:04d}",
+        f"{area}.{prefix}.{line:04d}",
+        f"+1 {area} {prefix} {line:04d}",
+        f"001-{area}-{prefix}-{line:04d}",
+        f"{area}{prefix}{line:04d} ext. {rng.randint(1, 99)}",
+        "",
+    ])
+
+
+def email_for(rng: random.Random, first: str, last: str, serial: int) -> str:
+    pick = rng.random()
+    if pick < 0.25:
+        return ""
+    local = f"{first}.{last}".replace(" ", "").replace("'", "").lower()
+    if pick < 0.3:
+        # a shared family / office inbox
+        return f" {local}@{rng.choice(EMAIL_DOMAINS)} "
+    return f"{local}{serial % 997}@{rng.choice(EMAIL_DOMAINS)}"
+
+
+def client_rows(rng: random.Random, count: int) -> List[List[str]]:
+    rows = [[""] * len(CLIENT_HEADERS), CLIENT_HEADERS]
+    for serial in range(count):
+        if rng.random() < 0.002:
+            rows.append([""] * len(CLIENT_HEADERS))
+            continue
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        # ~2% of rows repeat an earlier client id
+        client_id = str(400000 + (rng.randrange(serial) if serial and rng.random() < 0.02 else serial))
+        rows.append([
+            "West Coast ABA", "25862", client_id, first if rng.random() > 0.01 else "", "",
+            last if rng.random() > 0.01 else "", "West Coast ABA", rng.choice(STATUSES), rng.choice(["Yes", "No"]),
+            messy_dob(rng), "", rng.choice(["Male", "Female", ""]), rng.choice(STREETS), rng.choice(CITIES),
+            rng.choice(STATES), f"{rng.randint(90000, 96199)}", f"U{rng.randint(10**9, 10**10 - 1)}",
+            rng.choice(["", f"{rng.randint(10**7, 10**8 - 1)}G"]), str(serial % 5 or ""), "", "",
+            rng.choice(["Intensive", "Focused", ""]), "", rng.choice(["", "", "Spanish speaking\nparent"]),
+            "Clinical, Scheduling, Billing", email_for(rng, first, last, serial),
+        ])
+    return rows
+
+
+def staff_rows(rng: random.Random, count: int) -> List[List[str]]:
+    preamble = [""] * len(STAFF_HEADERS)
+    preamble[9], preamble[10] = "Run Date and Time:", "11/21/2025 01:54 PM"
+    rows = [preamble, STAFF_HEADERS]
+    for serial in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        rows.append([
+            "West Coast ABA", "25862", str(800000 + serial), first, "", last, "West Coast ABA", "", "",
+            rng.choice(STATUSES), "Yes", messy_dob(rng), messy_phone(rng), rng.choice(STREETS), rng.choice(CITIES),
+            rng.choice(STATES), f"{rng.randint(90000, 96199)}", "Yes", "", "Yes", f"{first[0]}{last}".lower(),
+            "(UTC-08) Pacific Time (US & Canada)", "", rng.choice(TITLES), email_for(rng, first, last, serial),
+            rng.choice(["", str(rng.randint(10**9, 10**10 - 1))]), "No", "", "", rng.choice(["", "106S00000X"]),
+            "", "", "", "", "", rng.choice(["", "Spanish", "Vietnamese"]), "",
+        ])
+    return rows
+
+
+def auth_rows(rng: random.Random, count: int) -> List[List[object]]:
+    rows: List[List[object]] = [["Client Authorizations"] + [None] * 7, AUTH_HEADERS]
+    for _ in range(count):
+        if rng.random() < 0.02:
+            rows.append(["CO", None, None, None, None, None, None, None])
+            continue
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        hours = rng.choice([20, 25, 30, 40, 12.5])
+        month, year = rng.randint(1, 12), rng.choice([24, 25, 2025, 1925])
+        service = rng.choice([
+            f"H0032 {rng.randint(2, 8)} HRS, H0032 HO {rng.randint(1, 4)} HRS",
+            f"H0032HO {rng.randint(1, 4)}HR",
+            f"{rng.randint(1, 4)} hrs HO",
+            "",
+        ])
+        rows.append([
+            rng.choice([f"{first} {last}", f"{last}, {first}", f"  {first}   {last} "]),
+            rng.choice(["1to1", "1 to 1", "Supervision"]), rng.choice([f"{hours} hrs/month", hours, "TBD"]),
+            rng.choice(["IEHP", None]), service, rng.choice(CITIES), rng.choice(["BT", None]),
+            f"{month}/1/{year} - {month}/28/{year}",
+        ])
+    return rows
+
+
+def write_csv(path: Path, rows: List[List[str]]) -> None:
+    with path.open("w", encoding="utf-8", newline="") as dst:
+        csv.writer(dst).writerows(rows)
+
+
+def write_workbook(path: Path, rows: List[List[object]]) -> None:
+    try:
+        from openpyxl import Workbook
+    except ImportError as exc:  # pragma: no cover - depends on the environment
+        raise RuntimeError("--auth requires openpyxl (pip install openpyxl)") from exc
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Authorizations")
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+
+
+GENERATORS: List[tuple[str, Callable[[random.Random, int], List[List[str]]]]] = [
+    ("client_raw.csv", client_rows),
+    ("staff_raw.csv", staff_rows),
+]
+
+
+def generate(out_dir: Path, rows: int, seed: int, auth: bool = False) -> None:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for offset, (name, build) in enumerate(GENERATORS):
+        write_csv(out_dir / name, build(random.Random(seed + offset), rows))
+    if auth:
+        write_workbook(out_dir / "client authorization.xlsx", auth_rows(random.Random(seed + len(GENERATORS)), rows))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--auth", action="store_true", help="also write 'client authorization.xlsx' (openpyxl)")
+    args = parser.parse_args()
+    generate(args.out_dir, args.rows, args.seed, args.auth)
+
+
+if __name__ == "__main__":
+    main()
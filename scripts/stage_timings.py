@@ -0,0 +1,97 @@
+"""Opt-in phase timings and profiling for the CSV cleaners (``--timings``, ``--profile``).
+
+Phases record self-time: entering a phase pauses the one it interrupts, so a
+streaming pipeline (the writer pulling rows that are read, normalized and
+deduplicated on demand) splits into per-phase times that add up to the total.
+Phases must not be left open across a ``yield``.
+
+Normalizers are tracked through ``ColumnNormalizer.track()``, which counts
+values and accumulates time per ``normalize_column`` call.
+"""
+
+import cProfile
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import ContextManager, Dict, Iterator, List, Optional, Tuple
+
+from csv_normalize import ColumnNormalizer, NormalizerStats
+
+
+class _Phase:
+    __slots__ = ("_timings", "_name")
+
+    def __init__(self, timings: "StageTimings", name: str) -> None:
+        self._timings = timings
+        self._name = name
+
+    def __enter__(self) -> None:
+        self._timings._push(self._name)
+
+    def __exit__(self, *exc_info) -> None:
+        self._timings._pop()
+
+
+class StageTimings:
+    """Self-time per phase plus per-normalizer counters for one cleaner run."""
+
+    def __init__(self) -> None:
+        self.phases: Dict[str, float] = {}
+        self._stack: List[Tuple[str, float]] = []
+        self._normalizers: Dict[str, Tuple[ColumnNormalizer, NormalizerStats]] = {}
+        self._started = time.perf_counter()
+
+    def phase(self, name: str) -> ContextManager[None]:
+        return _Phase(self, name)
+
+    def _push(self, name: str) -> None:
+        now = time.perf_counter()
+        if self._stack:
+            parent, started = self._stack[-1]
+            self.phases[parent] = self.phases.get(parent, 0.0) + now - started
+        self._stack.append((name, now))
+
+    def _pop(self) -> None:
+        now = time.perf_counter()
+        name, started = self._stack.pop()
+        self.phases[name] = self.phases.get(name, 0.0) + now - started
+        if self._stack:
+            self._stack[-1] = (self._stack[-1][0], now)
+
+    def track(self, name: str, normalizer: ColumnNormalizer) -> None:
+        self._normalizers[name] = (normalizer, normalizer.track())
+
+    def as_dict(self) -> Dict[str, object]:
+        normalizers: Dict[str, Dict[str, object]] = {}
+        for name, (normalizer, stats) in self._normalizers.items():
+            entry: Dict[str, object] = {"calls": stats.calls, "seconds": round(stats.seconds, 6)}
+            cache = normalizer.cache_info()
+            if cache is not None:
+                entry["cache_hits"] = cache.hits
+                entry["cache_misses"] = cache.misses
+            normalizers[name] = entry
+        return {
+            "total_seconds": round(time.perf_counter() - self._started, 6),
+            "phases": {name: round(seconds, 6) for name, seconds in self.phases.items()},
+            "normalizers": normalizers,
+        }
+
+
+def phase(timings: Optional[StageTimings], name: str) -> ContextManager[None]:
+    """``timings.phase(name)``, or a no-op when timings are off."""
+    return timings.phase(name) if timings is not None else nullcontext()
+
+
+@contextmanager
+def profiled(path: Optional[Path]) -> Iterator[None]:
+    """Run the block under cProfile and dump pstats to ``path`` (no-op without a path)."""
+    if path is None:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(str(path))
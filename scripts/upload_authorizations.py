@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+"""Upload normalized authorization records to Postgres (or an HTTP endpoint) concurrently.
+
+Input is a batch directory from auth_batches.py (its manifest is verified
+first) or a JSON / JSON Lines file of records, chunked with ``--batch-size``.
+
+Each batch is one request. Against Postgres it is one transaction that writes
+the authorization fields (hours, units, auth date range) onto the org's
+matching ``clients`` rows. A record carrying ``client_id`` matches the roster
+client id; otherwise it matches on full name, and only when exactly one client
+has that name. When one client appears in several records, the last non-null
+value of each field wins, and existing values are never overwritten with null.
+With ``--http-url`` each batch is POSTed as
+``{"organization_id", "records"}`` instead, e.g. to an edge function or a stub
+server.
+
+Flow control:
+- ``--concurrency`` caps batches in flight (and pooled connections).
+- ``--rate`` caps batch starts per second.
+- The reader blocks while the queue is full.
+- When a batch takes longer than ``--slow-ms`` or fails, the in-flight limit
+  halves. It grows back by one with each fast batch.
+- A batch waits for the earlier batches that touch the same clients, so the
+  later record still wins when a client spans batches. Batches that share no
+  clients run in parallel. If an earlier batch failed, the later one is
+  skipped and reported as failed too; neither is recorded as finished, so a
+  rerun uploads both in order.
+- Transient failures (connection errors, serialization failures, HTTP 429 and
+  5xx) are retried with jittered exponential backoff.
+
+Finished batches are recorded in a state file, so a rerun skips them.
+
+Connection URL: ``--database-url``, ``SUPABASE_DB_URL`` / ``DATABASE_URL`` /
+``SUPABASE_DATABASE_URL``, else the local stack from supabase/config.toml.
+Postgres uploads require psycopg (v3) and psycopg_pool.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from auth_batches import MANIFEST_NAME, encode_record, iter_records, load_manifest, read_batch, verify_batch
+from load_cleaned_rows import resolve_database_url
+
+DEFAULT_BATCH_SIZE = 200
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 30.0
+# serialization_failure, deadlock_detected, too_many_connections, cannot_connect_now
+RETRYABLE_SQLSTATES = {"40001", "40P01", "53300", "57P03"}
+
+AuthRecord = Dict[str, object]
+
+CLIENT_AUTH_UPDATE = """
+with batch as (
+  select e.ord, r.*
+  from jsonb_array_elements(%(records)s::jsonb) with ordinality as e(record, ord)
+  cross join lateral jsonb_to_record(e.record) as r(
+    client_id text,
+    full_name text,
+    authorized_hours_per_month numeric,
+    auth_units numeric,
+    auth_start_date date,
+    auth_end_date date,
+    one_to_one_units numeric,
+    supervision_units numeric,
+    parent_consult_units numeric
+  )
+),
+candidates as (
+  select b.ord, c.id
+  from batch b
+  join public.clients c
+    on c.organization_id = %(organization_id)s
+   and c.deleted_at is null
+   and case
+         when nullif(b.client_id, '') is not null then c.client_id = b.client_id
+         else lower(c.full_name) = lower(b.full_name)
+       end
+),
+resolved as (
+  select ord, (array_agg(id))[1] as id
+  from candidates
+  group by ord
+  having count(*) = 1
+),
+merged as (
+  select
+    r.id,
+    (array_agg(b.authorized_hours_per_month order by b.ord desc) filter (where b.authorized_hours_per_month is not null))[1] as authorized_hours_per_month,
+    (array_agg(b.auth_units order by b.ord desc) filter (where b.auth_units is not null))[1] as auth_units,
+    (array_agg(b.auth_start_date order by b.ord desc) filter (where b.auth_start_date is not null))[1] as auth_start_date,
+    (array_agg(b.auth_end_date order by b.ord desc) filter (where b.auth_end_date is not null))[1] as auth_end_date,
+    (array_agg(b.one_to_one_units order by b.ord desc) filter (where b.one_to_one_units is not null))[1] as one_to_one_units,
+    (array_agg(b.supervision_units order by b.ord desc) filter (where b.supervision_units is not null))[1] as supervision_units,
+    (array_agg(b.parent_consult_units order by b.ord desc) filter (where b.parent_consult_units is not null))[1] as parent_consult_units
+  from resolved r
+  join batch b using (ord)
+  group by r.id
+),
+updated as (
+  update public.clients c set
+    authorized_hours_per_month = coalesce(m.authorized_hours_per_month, c.authorized_hours_per_month),
+    auth_units = coalesce(m.auth_units, c.auth_units),
+    auth_start_date = coalesce(m.auth_start_date, c.auth_start_date),
+    auth_end_date = coalesce(m.auth_end_date, c.auth_end_date),
+    one_to_one_units = coalesce(m.one_to_one_units, c.one_to_one_units),
+    supervision_units = coalesce(m.supervision_units, c.supervision_units),
+    parent_consult_units = coalesce(m.parent_consult_units, c.parent_consult_units),
+    updated_at = timezone('utc', now())
+  from merged m
+  where c.id = m.id
+  returning c.id
+)
+select
+  (select count(*) from updated) as clients_updated,
+  (select count(*) from batch) - (select count(*) from resolved) as records_unmatched
+"""
+
+
+@dataclass
+class Batch:
+    name: str
+    key: str
+    records: List[AuthRecord]
+
+
+class BatchDone:
+    """Set when a batch is finished; ``ok`` says whether it was uploaded."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.ok = False
+        self._event = asyncio.Event()
+
+    def set(self, ok: bool) -> None:
+        self.ok = ok
+        self._event.set()
+
+    def is_set(self) -> bool:
+        return self._event.is_set()
+
+    async def wait(self) -> None:
+        await self._event.wait()
+
+
+@dataclass
+class UploadStats:
+    batches: int = 0
+    records: int = 0
+    skipped_batches: int = 0
+    clients_updated: int = 0
+    records_unmatched: int = 0
+    retries: int = 0
+    failed_batches: List[str] = field(default_factory=list)
+    latencies: List[float] = field(default_factory=list)
+
+    def as_dict(self, elapsed: float) -> Dict[str, object]:
+        ordered = sorted(self.latencies)
+
+        def percentile(q: float) -> float:
+            if not ordered:
+                return 0.0
+            return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+        return {
+            "batches": self.batches,
+            "records": self.records,
+            "skipped_batches": self.skipped_batches,
+            "clients_updated": self.clients_updated,
+            "records_unmatched": self.records_unmatched,
+            "retries": self.retries,
+            "failed_batches": self.failed_batches,
+            "seconds": round(elapsed, 3),
+            "records_per_second": round(self.records / elapsed, 1) if elapsed else 0.0,
+            "batch_latency_p50_ms": round(percentile(0.50) * 1000, 1),
+            "batch_latency_p95_ms": round(percentile(0.95) * 1000, 1),
+            "batch_latency_max_ms": round(percentile(1.0) * 1000, 1),
+        }
+
+
+class RateLimiter:
+    """Spaces batch starts at least ``1 / rate`` seconds apart (no limit when rate is None)."""
+
+    def __init__(self, rate: Optional[float]) -> None:
+        self._interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self._interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+            self._next = max(now, self._next) + self._interval
+
+
+class AdaptiveLimit:
+    """In-flight batch limit: halves on slow or failed batches, grows by one on fast ones."""
+
+    def __init__(self, maximum: int, slow_seconds: float) -> None:
+        self.maximum = maximum
+        self.limit = maximum
+        self._slow = slow_seconds
+        self._in_flight = 0
+        self._changed = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._changed:
+            await self._changed.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+    async def release(self, latency: float, ok: bool) -> None:
+        async with self._changed:
+            self._in_flight -= 1
+            if not ok or latency > self._slow:
+                self.limit = max(1, self.limit // 2)
+            elif self.limit < self.maximum:
+                self.limit += 1
+            self._changed.notify_all()
+
+
+class UploadState:
+    """Keys of batches already uploaded for an organization, persisted after every batch."""
+
+    def __init__(self, path: Path, organization_id: str) -> None:
+        self.path = path
+        self._prefix = f"{organization_id}:"
+        self._done: Dict[str, str] = {}
+        if path.exists():
+            self._done = json.loads(path.read_text(encoding="utf-8")).get("done", {})
+
+    def is_done(self, batch: Batch) -> bool:
+        return self._prefix + batch.key in self._done
+
+    def mark_done(self, batch: Batch) -> None:
+        self._done[self._prefix + batch.key] = batch.name
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({"done": self._done}, indent=2), encoding="utf-8")
+        tmp_path.replace(self.path)
+
+
+class PostgresSink:
+    def __init__(self, database_url: str, organization_id: str, pool_size: int) -> None:
+        try:
+            import psycopg
+            from psycopg_pool import AsyncConnectionPool
+        except ImportError as exc:  # pragma: no cover - depends on the environment
+            raise RuntimeError(
+                "Uploading to Postgres requires psycopg and psycopg_pool (pip install 'psycopg[binary]' psycopg_pool)"
+            ) from exc
+        self._psycopg = psycopg
+        self._organization_id = organization_id
+        # no prepared statements, so the Supabase pooler's transaction mode works
+        self._pool = AsyncConnectionPool(
+            database_url,
+            min_size=1,
+            max_size=pool_size,
+            kwargs={"autocommit": True, "prepare_threshold": None},
+            open=False,
+        )
+
+    async def open(self) -> None:
+        await self._pool.open(wait=True)
+
+    async def close(self) -> None:
+        await self._pool.close()
+
+    async def upsert(self, records: List[AuthRecord]) -> Tuple[int, int]:
+        params = {"records": json.dumps(records, ensure_ascii=False), "organization_id": self._organization_id}
+        async with self._pool.connection() as conn:
+            async with conn.transaction():
+                cursor = await conn.execute(CLIENT_AUTH_UPDATE, params)
+                updated, unmatched = await cursor.fetchone()
+        return int(updated), int(unmatched)
+
+    def retryable(self, exc: BaseException) -> bool:
+        if getattr(exc, "sqlstate", None) in RETRYABLE_SQLSTATES:
+            return True
+        # connection-level failures (including pool timeouts) carry no SQLSTATE
+        return isinstance(exc, self._psycopg.OperationalError) and getattr(exc, "sqlstate", None) is None
+
+    def retry_after(self, exc: BaseException) -> float:
+        return 0.0
+
+
+class HttpSink:
+    def __init__(self, url: str, organization_id: str, token: Optional[str], timeout: float) -> None:
+        self._url = url
+        self._organization_id = organization_id
+        self._headers = {"Content-Type": "application/json"}
+        if token:
+            self._headers["Authorization"] = f"Bearer {token}"
+        self._timeout = timeout
+
+    async def open(self) -> None:
+        return None
+
+    async def close(self) -> None:
+        return None
+
+    def _post(self, body: bytes) -> Tuple[int, int]:
+        request = urllib.request.Request(self._url, data=body, headers=self._headers, method="POST")
+        with urllib.request.urlopen(request, timeout=self._timeout) as response:
+            payload = response.read()
+        result = json.loads(payload) if payload.strip() else {}
+        if not isinstance(result, dict):
+            result = {}
+        return int(result.get("clients_updated", 0)), int(result.get("records_unmatched", 0))
+
+    async def upsert(self, records: List[AuthRecord]) -> Tuple[int, int]:
+        body = json.dumps({"organization_id": self._organization_id, "records": records}).encode("utf-8")
+        return await asyncio.to_thread(self._post, body)
+
+    def retryable(self, exc: BaseException) -> bool:
+        if isinstance(exc, urllib.error.HTTPError):
+            return exc.code == 429 or exc.code >= 500
+        return isinstance(exc, (urllib.error.URLError, TimeoutError, ConnectionError))
+
+    def retry_after(self, exc: BaseException) -> float:
+        if isinstance(exc, urllib.error.HTTPError):
+            try:
+                return float(exc.headers.get("Retry-After", 0))
+            except (TypeError, ValueError):
+                return 0.0
+        return 0.0
+
+
+def iter_upload_batches(source: Path, batch_size: int) -> Iterator[Batch]:
+    """Batches from an auth_batches directory (checksums verified) or a records file."""
+    if source.is_dir():
+        for entry in load_manifest(source):
+            if not verify_batch(source, entry):
+                raise SystemExit(f"{source / entry.file} does not match {MANIFEST_NAME}; re-run auth_batches.py")
+            yield Batch(entry.file, entry.sha256, read_batch(source, entry))
+        return
+
+    chunk: List[AuthRecord] = []
+    start = 0
+    for record in iter_records(source):
+        chunk.append(record)
+        if len(chunk) >= batch_size:
+            yield _file_batch(source, start, chunk)
+            start += len(chunk)
+            chunk = []
+    if chunk:
+        yield _file_batch(source, start, chunk)
+
+
+def _file_batch(source: Path, start: int, records: List[AuthRecord]) -> Batch:
+    digest = hashlib.sha256()
+    for record in records:
+        digest.update(encode_record(record))
+    return Batch(f"{source.name}[{start}:{start + len(records)}]", digest.hexdigest(), records)
+
+
+def client_key(record: AuthRecord) -> str:
+    """How CLIENT_AUTH_UPDATE matches a record to a client: roster id first, else the name."""
+    client_id = record.get("client_id")
+    if client_id:
+        return f"id:{client_id}"
+    return f"name:{str(record.get('full_name') or '').lower()}"
+
+
+async def upload(
+    batches: Iterator[Batch],
+    sink,
+    state: UploadState,
+    concurrency: int,
+    rate: Optional[float],
+    retries: int,
+    slow_seconds: float,
+) -> UploadStats:
+    stats = UploadStats()
+    limit = AdaptiveLimit(concurrency, slow_seconds)
+    limiter = RateLimiter(rate)
+    queue: "asyncio.Queue[Optional[Tuple[Batch, List[BatchDone], BatchDone]]]" = asyncio.Queue(maxsize=concurrency)
+    # last batch (so far) touching each client, so later records still win across batches
+    last_touched: Dict[str, BatchDone] = {}
+
+    async def send(batch: Batch, after: List[BatchDone]) -> bool:
+        for earlier in after:
+            await earlier.wait()
+        failed = [earlier.name for earlier in after if not earlier.ok]
+        if failed:
+            # uploading now would let the failed batch's older records win when it is rerun
+            stats.failed_batches.append(f"{batch.name}: skipped, an earlier batch for its clients failed: {', '.join(failed)}")
+            return False
+        for attempt in range(retries + 1):
+            await limiter.wait()
+            await limit.acquire()
+            started = time.perf_counter()
+            try:
+                updated, unmatched = await sink.upsert(batch.records)
+            except Exception as exc:
+                await limit.release(time.perf_counter() - started, ok=False)
+                if attempt == retries or not sink.retryable(exc):
+                    message = str(exc).strip().splitlines()[0] if str(exc).strip() else ""
+                    stats.failed_batches.append(f"{batch.name}: {type(exc).__name__}: {message}")
+                    return False
+                stats.retries += 1
+                delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2**attempt) * random.uniform(0.5, 1.0)
+                await asyncio.sleep(max(delay, sink.retry_after(exc)))
+                continue
+            latency = time.perf_counter() - started
+            await limit.release(latency, ok=True)
+            stats.latencies.append(latency)
+            stats.batches += 1
+            stats.records += len(batch.records)
+            stats.clients_updated += updated
+            stats.records_unmatched += unmatched
+            state.mark_done(batch)
+            return True
+        return False
+
+    async def worker() -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            batch, after, finished = item
+            ok = False
+            try:
+                ok = await send(batch, after)
+            finally:
+                finished.set(ok)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        for batch in batches:
+            if state.is_done(batch):
+                stats.skipped_batches += 1
+                continue
+            finished = BatchDone(batch.name)
+            after: Dict[int, BatchDone] = {}
+            for key in {client_key(record) for record in batch.records}:
+                earlier = last_touched.get(key)
+                # a failed batch still blocks the later ones for its clients
+                if earlier is not None and not (earlier.is_set() and earlier.ok):
+                    after[id(earlier)] = earlier
+                last_touched[key] = finished
+            # blocks while every worker is busy and the queue is full
+            await queue.put((batch, list(after.values()), finished))
+    finally:
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    return stats
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Upload normalized authorization records with retry and backpressure.")
+    parser.add_argument("source", type=Path, help="auth_batches.py output directory, or a JSON / JSON Lines records file")
+    parser.add_argument("--organization-id", default=os.environ.get("DEFAULT_ORGANIZATION_ID"), help="organization uuid (default: $DEFAULT_ORGANIZATION_ID)")
+    parser.add_argument("--database-url", help="overrides the environment / supabase/config.toml")
+    parser.add_argument("--http-url", help="POST batches to this URL instead of writing to Postgres")
+    parser.add_argument("--http-token", default=os.environ.get("SUPABASE_SERVICE_ROLE_KEY"), help="bearer token for --http-url")
+    parser.add_argument("--http-timeout", type=float, default=30.0)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="records per batch for a records file")
+    parser.add_argument("--concurrency", type=int, default=4, help="batches (and pooled connections) in flight at most")
+    parser.add_argument("--rate", type=float, help="batch starts per second at most")
+    parser.add_argument("--retries", type=int, default=5, help="retries per batch for transient failures")
+    parser.add_argument("--slow-ms", type=float, default=2000.0, help="batch latency that counts as the target slowing down")
+    parser.add_argument("--state", type=Path, help="resume state file (default: next to the source)")
+    parser.add_argument("--report", type=Path, help="also write the summary to this JSON file")
+    args = parser.parse_args()
+    if not args.organization_id:
+        parser.error("--organization-id (or DEFAULT_ORGANIZATION_ID) is required")
+    if args.batch_size < 1 or args.concurrency < 1 or args.retries < 0:
+        parser.error("--batch-size and --concurrency must be positive and --retries non-negative")
+    if args.rate is not None and args.rate <= 0:
+        parser.error("--rate must be positive")
+    return args
+
+
+async def run(args: argparse.Namespace) -> Dict[str, object]:
+    if args.http_url:
+        sink = HttpSink(args.http_url, args.organization_id, args.http_token, args.http_timeout)
+    else:
+        sink = PostgresSink(resolve_database_url(args.database_url), args.organization_id, args.concurrency)
+    state_path = args.state or (
+        args.source / "upload_state.json" if args.source.is_dir() else args.source.with_suffix(".upload_state.json")
+    )
+    state = UploadState(state_path, args.organization_id)
+
+    await sink.open()
+    started = time.perf_counter()
+    try:
+        stats = await upload(
+            iter_upload_batches(args.source, args.batch_size),
+            sink,
+            state,
+            args.concurrency,
+            args.rate,
+            args.retries,
+            args.slow_ms / 1000,
+        )
+    finally:
+        await sink.close()
+    return stats.as_dict(time.perf_counter() - started)
+
+
+def main() -> None:
+    args = parse_args()
+    summary = asyncio.run(run(args))
+    print(
+        f"batches={summary['batches']} skipped={summary['skipped_batches']} records={summary['records']} "
+        f"clients_updated={summary['clients_updated']} unmatched={summary['records_unmatched']} "
+        f"retries={summary['retries']} failed={len(summary['failed_batches'])} "
+        f"{summary['records_per_second']} records/s p95={summary['batch_latency_p95_ms']}ms"
+    )
+    for failure in summary["failed_batches"]:
+        print(f"failed: {failure}")
+    if args.report:
+        args.report.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    if summary["failed_batches"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()